@@ -0,0 +1,130 @@
+"""
+Rows/sec and peak RSS of the product CSV cleaner on a synthetic catalog.
+
+Compares the streaming, vectorized cleaner in embeddings/cleaner.py with the
+previous row-wise implementation (reproduced below). Each mode runs in a fresh
+process so peak RSS is measured independently.
+
+Usage:
+    python benchmarks/bench_cleaner.py --rows 1000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Set project root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from synthetic_catalog import write_catalog
+
+
+def legacy_load_and_clean_data(csv_path: str) -> list[str]:
+    """The row-wise cleaner this benchmark replaced"""
+    df = pd.read_csv(csv_path)
+    df.dropna(subset=["title", "description", "price", "average_rating"], inplace=True)
+    df = df[
+        df["price"].apply(
+            lambda x: isinstance(x, (int, float))
+            or str(x).replace(".", "", 1).isdigit()
+        )
+    ]
+    df = df[
+        df["average_rating"].apply(
+            lambda x: isinstance(x, (int, float))
+            or str(x).replace(".", "", 1).isdigit()
+        )
+    ]
+    documents = []
+    for _, row in df.iterrows():
+        documents.append(
+            f"Category: {row.get('main_category', '')}\n"
+            f"Title: {row['title']}\n"
+            f"Features: {row.get('features', '')}\n"
+            f"Description: {row['description']}\n"
+            f"Price: ${row['price']}\n"
+            f"Average Rating: {row['average_rating']}\n"
+        )
+    return documents
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB"""
+    # VmHWM is reset by exec, unlike ru_maxrss which a spawned worker
+    # inherits from the parent process on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, csv_path: str, chunksize: int) -> dict:
+    from embeddings.cleaner import iter_documents
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        documents = legacy_load_and_clean_data(csv_path)
+        count = len(documents)
+    else:
+        count = sum(1 for _ in iter_documents(csv_path, chunksize))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "documents": count,
+        "seconds": elapsed,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(args):
+    csv_path = args.csv
+    if csv_path is None:
+        csv_path = os.path.join(tempfile.mkdtemp(), "catalog.csv")
+        start = time.perf_counter()
+        write_catalog(csv_path, args.rows)
+        print(
+            f"Generated {args.rows} rows in {time.perf_counter() - start:.1f}s "
+            f"({os.path.getsize(csv_path) / 2**20:.0f} MB)"
+        )
+    rows = args.rows
+
+    print(
+        f"{'mode':>10} {'docs':>10} {'seconds':>9} {'rows/s':>10} {'peak RSS MB':>12}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for mode in args.modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_mode, mode, csv_path, args.chunksize).result()
+        print(
+            f"{mode:>10} {result['documents']:>10} {result['seconds']:>9.1f} "
+            f"{rows / result['seconds']:>10.0f} {result['peak_rss_mb']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--csv", help="Existing catalog to clean instead of generating one"
+    )
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["streaming", "legacy"],
+        choices=["streaming", "legacy"],
+    )
+    main(parser.parse_args())
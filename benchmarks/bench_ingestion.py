@@ -0,0 +1,240 @@
+"""
+Wall time, rows/sec, peak memory and output size of every ingestion stage.
+
+Generates synthetic catalogs in the Product_Information_Dataset.csv schema and
+runs each stage against a fake embedder and the local vector store:
+
+    clean          load_and_clean_data
+    split          split_documents (fixed 1000/200-character chunks)
+    split_product  split_products with the product-aware splitter
+    embed_store    embed + upsert of the split chunks (IngestionEngine)
+    pipeline       the whole load_data.py path: clean -> split -> embed ->
+                   upsert as overlapping stages (ingest_delta)
+
+Every stage runs in a fresh process so peak RSS is measured independently.
+Stages after `clean` include its cost in their peak RSS but not in their time.
+Results are written to a JSON report; with --compare, stages that got slower
+than a previous report by more than --tolerance are listed and the exit code
+is 1.
+
+Usage:
+    python benchmarks/bench_ingestion.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Set project root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_cleaner import peak_rss_mb
+from synthetic_catalog import write_catalog
+
+STAGES = ["clean", "split", "split_product", "embed_store", "pipeline"]
+
+
+def fake_embeddings(dimension: int, latency_ms: float):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    class FakeEmbeddings(DeterministicFakeEmbedding):
+        """Deterministic vectors after a simulated request latency"""
+
+        async def aembed_documents(self, texts):
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000)
+            return self.embed_documents(texts)
+
+    return FakeEmbeddings(size=dimension)
+
+
+def run_stage(stage: str, csv_path: str, options: dict) -> dict:
+    from embeddings.cleaner import iter_products, load_and_clean_data
+    from embeddings.delta import ingest_delta
+    from embeddings.ingest import IngestionEngine
+    from embeddings.local_store import LocalVectorStore
+    from embeddings.splitter import split_documents, split_products
+
+    def engine(store):
+        return IngestionEngine(
+            fake_embeddings(options["dimension"], options["embed_latency_ms"]),
+            store,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            progress_every=10**9,
+        )
+
+    output = {}
+    if stage == "pipeline":
+        store = LocalVectorStore()
+        manifest = os.path.join(tempfile.mkdtemp(), "index_manifest.json")
+        start = time.perf_counter()
+        stats = asyncio.run(
+            ingest_delta(
+                iter_products(csv_path),
+                engine(store),
+                manifest,
+                processes=options["split_workers"],
+                queue_size=options["queue_size"],
+            )
+        )
+        elapsed = time.perf_counter() - start
+        output = {
+            "products": stats["added"],
+            "chunks": stats["chunks"],
+            "vector_mb": store.vectors.nbytes / 2**20,
+            "manifest_mb": os.path.getsize(manifest) / 2**20,
+        }
+        return {"seconds": elapsed, "peak_rss_mb": peak_rss_mb(), "output": output}
+
+    start = time.perf_counter()
+    documents = load_and_clean_data(csv_path)
+    elapsed = time.perf_counter() - start
+    output = {
+        "documents": len(documents),
+        "document_mb": sum(map(len, documents)) / 2**20,
+    }
+    if stage == "clean":
+        return {"seconds": elapsed, "peak_rss_mb": peak_rss_mb(), "output": output}
+
+    start = time.perf_counter()
+    if stage == "split_product":
+        products = ((str(i), document) for i, document in enumerate(documents))
+        chunks = [
+            chunk
+            for _, _, product_chunks in split_products(
+                products, processes=options["split_workers"]
+            )
+            for chunk in product_chunks
+        ]
+    else:
+        chunks = split_documents(documents)
+    if stage == "embed_store":
+        store = LocalVectorStore()
+        start = time.perf_counter()
+        asyncio.run(engine(store).run(chunks))
+        output["vector_mb"] = store.vectors.nbytes / 2**20
+    elapsed = time.perf_counter() - start
+    output.update(chunks=len(chunks), chunk_mb=sum(map(len, chunks)) / 2**20)
+    return {"seconds": elapsed, "peak_rss_mb": peak_rss_mb(), "output": output}
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    """Descriptions of stages slower than in the baseline report"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (result["rows"], result["stage"]): result
+            for result in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        before = baseline.get((result["rows"], result["stage"]))
+        if before and result["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result['stage']} @ {result['rows']} rows: "
+                f"{before['seconds']:.2f}s -> {result['seconds']:.2f}s"
+            )
+    return regressions
+
+
+def main(args) -> int:
+    options = {
+        "long_rate": args.long_rate,
+        "dimension": args.dimension,
+        "embed_latency_ms": args.embed_latency_ms,
+        "batch_size": args.batch_size,
+        "workers": args.workers,
+        "split_workers": args.split_workers,
+        "queue_size": args.queue_size,
+    }
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    os.makedirs(data_dir, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    print(
+        f"{'rows':>9} {'stage':>14} {'seconds':>9} {'rows/s':>10} "
+        f"{'peak RSS MB':>12}  output"
+    )
+    for rows in args.sizes:
+        csv_path = os.path.join(data_dir, f"catalog_{rows}_{args.long_rate}.csv")
+        if not os.path.exists(csv_path):
+            write_catalog(csv_path, rows, long_rate=args.long_rate)
+        for stage in args.stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_stage, stage, csv_path, options).result()
+            result = {
+                "rows": rows,
+                "stage": stage,
+                "csv_mb": os.path.getsize(csv_path) / 2**20,
+                "rows_per_sec": rows / max(result["seconds"], 1e-9),
+                **result,
+            }
+            results.append(result)
+            output = ", ".join(
+                f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in result["output"].items()
+            )
+            print(
+                f"{rows:>9} {stage:>14} {result['seconds']:>9.2f} "
+                f"{result['rows_per_sec']:>10.0f} {result['peak_rss_mb']:>12.0f}  "
+                f"{output}"
+            )
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": options,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument(
+        "--data-dir", help="Where to keep generated catalogs between runs"
+    )
+    parser.add_argument(
+        "--long-rate",
+        type=float,
+        default=0.1,
+        help="Fraction of products with long descriptions",
+    )
+    parser.add_argument("--output", default="ingestion_benchmark.json")
+    parser.add_argument("--compare", help="Previous report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--dimension", type=int, default=64)
+    parser.add_argument(
+        "--embed-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated latency of each embedding request",
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--split-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    sys.exit(main(parser.parse_args()))
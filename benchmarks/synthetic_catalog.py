@@ -0,0 +1,89 @@
+"""
+Synthetic product catalogs in the Product_Information_Dataset.csv schema.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = [
+    "Musical Instruments",
+    "Amazon Home",
+    "All Electronics",
+    "Industrial & Scientific",
+    "Toys & Games",
+]
+BRANDS = ["Yamaha", "Casio", "Roland", "Fender", "Gibson", "Korg", "Shure", "Boss"]
+ITEMS = ["Digital Piano", "Guitar", "Keyboard", "Microphone", "Amplifier", "Pedal"]
+WORDS = (
+    "compact lightweight portable professional studio stage weighted keys "
+    "sound quality durable beginner friendly bluetooth battery powered "
+    "adjustable premium warranty accessories included classic modern"
+).split()
+
+
+def generate_chunk(
+    start: int,
+    rows: int,
+    rng: np.random.Generator,
+    invalid_rate: float = 0.02,
+    long_rate: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Generate `rows` products numbered from `start`; a `long_rate` fraction of
+    them get ~300-word descriptions that need splitting.
+    """
+    ids = np.arange(start, start + rows)
+    titles = (
+        pd.Series(rng.choice(BRANDS, rows))
+        + " "
+        + pd.Series(rng.choice(ITEMS, rows))
+        + " "
+        + pd.Series(ids).astype(str)
+    )
+    words = rng.choice(WORDS, (rows, 30))
+    descriptions = pd.Series([" ".join(row) for row in words])
+    long = np.flatnonzero(rng.random(rows) < long_rate)
+    descriptions[long] = [" ".join(rng.choice(WORDS, 300)) for _ in long]
+    features = pd.Series(["['" + "', '".join(row[:4]) + "']" for row in words])
+    prices = pd.Series(np.round(rng.uniform(5, 2000, rows), 2)).astype(str)
+    ratings = pd.Series(np.round(rng.uniform(1, 5, rows), 1)).astype(str)
+
+    # Sprinkle in the kinds of bad values the cleaner has to drop
+    invalid = rng.random(rows) < invalid_rate
+    prices[invalid] = rng.choice(["None", "", "from 19.99"], invalid.sum())
+    descriptions[rng.random(rows) < invalid_rate] = np.nan
+
+    return pd.DataFrame(
+        {
+            "main_category": rng.choice(CATEGORIES, rows),
+            "title": titles,
+            "average_rating": ratings,
+            "rating_number": rng.integers(0, 5000, rows),
+            "features": features,
+            "description": descriptions,
+            "price": prices,
+            "store": rng.choice(BRANDS, rows),
+            "categories": "[]",
+            "details": "{}",
+            "parent_asin": "B" + pd.Series(ids).astype(str).str.zfill(9),
+        }
+    )
+
+
+def write_catalog(
+    path: str,
+    rows: int,
+    chunksize: int = 100_000,
+    seed: int = 0,
+    long_rate: float = 0.0,
+) -> str:
+    """Write a synthetic catalog of `rows` products to `path` in chunks."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunksize):
+        chunk = generate_chunk(
+            start, min(chunksize, rows - start), rng, long_rate=long_rate
+        )
+        chunk.to_csv(
+            path, mode="w" if start == 0 else "a", header=start == 0, index=False
+        )
+    return path
@@ -11,6 +11,9 @@ PINECONE_INDEX_NAME = os.environ.get("PINECONE_INDEX_NAME")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MOCK_API_URL = os.getenv("MOCK_API_URL", "http://127.0.0.1:4001")
 RAG_TOP_K = os.getenv("RAG_TOP_K")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+# Content-addressed cache of computed embeddings; set empty to disable
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "datasets/embedding_store")
 if not OPENAI_API_KEY:
     logging.warning("OPENAI_API_KEY not set. LLM functionality will be limited.")
 
@@ -1,32 +1,109 @@
+from typing import Iterator
+
 import pandas as pd
 
+# Columns used to build product documents, all read as strings: numeric fields
+# are validated explicitly below instead of letting pandas infer their type.
+CATALOG_DTYPES = {
+    "parent_asin": "string",
+    "main_category": "string",
+    "title": "string",
+    "features": "string",
+    "description": "string",
+    "price": "string",
+    "average_rating": "string",
+}
+REQUIRED_COLUMNS = ["title", "description", "price", "average_rating"]
+
+
+def _clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Validate one chunk of the catalog and build its document strings."""
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    price = pd.to_numeric(df["price"].str.strip(), errors="coerce")
+    rating = pd.to_numeric(df["average_rating"].str.strip(), errors="coerce")
+    df = df[(price >= 0) & (rating >= 0)]
+
+    def column(name: str) -> pd.Series:
+        if name in df.columns:
+            return df[name].fillna("")
+        return pd.Series("", index=df.index, dtype="string")
+
+    documents = (
+        "Category: "
+        + column("main_category")
+        + "\nTitle: "
+        + df["title"]
+        + "\nFeatures: "
+        + column("features")
+        + "\nDescription: "
+        + df["description"]
+        + "\nPrice: $"
+        + df["price"].str.strip()
+        + "\nAverage Rating: "
+        + df["average_rating"].str.strip()
+        + "\n"
+    )
+
+    product_ids = pd.Series(df.index.astype(str), index=df.index, dtype="string")
+    if "parent_asin" in df.columns:
+        product_ids = df["parent_asin"].fillna(product_ids)
+
+    return pd.DataFrame(
+        {
+            "product_id": product_ids.astype(str),
+            "title": df["title"].astype(str),
+            "document": documents.astype(str),
+        }
+    )
+
+
+def iter_product_chunks(
+    csv_path: str, chunksize: int = 50_000
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the cleaned product catalog in chunks.
+
+    Each chunk is a DataFrame with the columns `product_id` (the
+    `parent_asin`, or the row number when missing), `title` and `document`
+    (the text that gets embedded). Only `chunksize` rows are held in memory
+    at a time.
+    """
+    reader = pd.read_csv(
+        csv_path,
+        usecols=lambda name: name in CATALOG_DTYPES,
+        dtype=CATALOG_DTYPES,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        cleaned = _clean_chunk(chunk)
+        if not cleaned.empty:
+            yield cleaned
+
+
+def iter_products(csv_path: str, chunksize: int = 50_000) -> Iterator[tuple[str, str]]:
+    """Stream (product ID, document) pairs of the cleaned product catalog."""
+    for chunk in iter_product_chunks(csv_path, chunksize):
+        yield from zip(chunk["product_id"], chunk["document"])
+
+
+def iter_documents(csv_path: str, chunksize: int = 50_000) -> Iterator[str]:
+    """Stream the document strings of the cleaned product catalog."""
+    for chunk in iter_product_chunks(csv_path, chunksize):
+        yield from chunk["document"]
+
+
+def load_products(csv_path: str) -> pd.DataFrame:
+    """
+    Load and clean the whole product catalog.
+
+    Returns a DataFrame with the columns `product_id`, `title` and
+    `document`, see `iter_product_chunks`.
+    """
+    chunks = list(iter_product_chunks(csv_path))
+    if not chunks:
+        return pd.DataFrame(columns=["product_id", "title", "document"])
+    return pd.concat(chunks, ignore_index=True)
+
 
 def load_and_clean_data(csv_path: str) -> list[str]:
-    df = pd.read_csv(csv_path)
-    df.dropna(subset=["title", "description", "price", "average_rating"], inplace=True)
-    df = df[
-        df["price"].apply(
-            lambda x: isinstance(x, (int, float))
-            or str(x).replace(".", "", 1).isdigit()
-        )
-    ]
-    df = df[
-        df["average_rating"].apply(
-            lambda x: isinstance(x, (int, float))
-            or str(x).replace(".", "", 1).isdigit()
-        )
-    ]
-
-    documents = []
-    for _, row in df.iterrows():
-        doc_text = (
-            f"Category: {row.get('main_category', '')}\n"
-            f"Title: {row['title']}\n"
-            f"Features: {row.get('features', '')}\n"
-            f"Description: {row['description']}\n"
-            f"Price: ${row['price']}\n"
-            f"Average Rating: {row['average_rating']}\n"
-        )
-        documents.append(doc_text)
-
-    return documents
+    return list(iter_documents(csv_path))
@@ -0,0 +1,256 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+REDUCTIONS = ("pca", "random", "none")
+QUANTIZATIONS = ("none", "int8", "pq")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _kmeans(
+    points: np.ndarray, clusters: int, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Plain Lloyd's k-means, enough for PQ codebooks"""
+    clusters = min(clusters, len(points))
+    centroids = points[rng.choice(len(points), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        distances = (
+            (points**2).sum(1, keepdims=True)
+            - 2 * points @ centroids.T
+            + (centroids**2).sum(1)
+        )
+        labels = distances.argmin(1)
+        counts = np.bincount(labels, minlength=clusters)
+        assignment = np.zeros((len(points), clusters), dtype=np.float32)
+        assignment[np.arange(len(points)), labels] = 1
+        sums = assignment.T @ points
+        # Empty clusters keep their previous centroid
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class VectorCompressor:
+    """
+    Makes embedding vectors smaller: first reduces them to `dimension` by PCA
+    or Gaussian random projection (re-normalized, so cosine similarity is a
+    dot product), then optionally quantizes them, either to int8 per
+    dimension or with product quantization into `pq_subvectors` one-byte
+    codes.
+
+    Vector stores that hold floats (Pinecone) use `project`; the query must go
+    through the same projection. Local stores can keep the much smaller
+    `encode`d codes and score queries against them with `scores`.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        reduction: str = "pca",
+        quantization: str = "none",
+        pq_subvectors: int = 16,
+        seed: int = 0,
+    ):
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction!r}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization!r}")
+        if quantization == "pq" and dimension % pq_subvectors:
+            raise ValueError(
+                f"Dimension {dimension} is not divisible by {pq_subvectors} subvectors"
+            )
+        self.dimension = dimension
+        self.reduction = reduction
+        self.quantization = quantization
+        self.pq_subvectors = pq_subvectors
+        self.seed = seed
+        self.mean = None
+        self.components = None
+        self.scale = None
+        self.codebooks = None
+
+    @property
+    def name(self) -> str:
+        """Short description of the setting, e.g. pca256-int8"""
+        return f"{self.reduction}{self.dimension}-{self.quantization}"
+
+    @property
+    def bytes_per_vector(self) -> int:
+        if self.quantization == "int8":
+            return self.dimension
+        if self.quantization == "pq":
+            return self.pq_subvectors
+        return self.dimension * 4
+
+    def fit(
+        self,
+        vectors: np.ndarray,
+        sample: int = 50_000,
+        pq_sample: int = 10_000,
+        pq_iterations: int = 10,
+    ) -> "VectorCompressor":
+        """
+        Learn the projection from up to `sample` of `vectors` and the PQ
+        codebooks from up to `pq_sample` of them (~40 per centroid suffices)
+        """
+        rng = np.random.default_rng(self.seed)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(vectors) > sample:
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample, replace=False))]
+        full_dimension = vectors.shape[1]
+
+        if self.reduction == "pca":
+            self.mean = vectors.mean(0)
+            # Top eigenvectors of the covariance: a D x D problem however large
+            # the sample, much cheaper than an SVD of the sample itself
+            centered = vectors - self.mean
+            _, eigenvectors = np.linalg.eigh(centered.T @ centered)
+            self.components = eigenvectors[:, ::-1][:, : self.dimension].copy()
+            self.components = self.components.astype(np.float32)
+        elif self.reduction == "random":
+            self.mean = np.zeros(full_dimension, dtype=np.float32)
+            self.components = rng.standard_normal(
+                (full_dimension, self.dimension)
+            ).astype(np.float32) / np.sqrt(self.dimension)
+        else:
+            self.dimension = full_dimension
+            self.mean = np.zeros(full_dimension, dtype=np.float32)
+            self.components = None
+
+        projected = self.project(vectors)
+        if self.quantization == "int8":
+            self.scale = np.abs(projected).max(0) / 127
+            self.scale[self.scale == 0] = 1.0
+        elif self.quantization == "pq":
+            width = self.dimension // self.pq_subvectors
+            projected = projected[:pq_sample]
+            self.codebooks = np.stack(
+                [
+                    _kmeans(
+                        projected[:, i * width : (i + 1) * width],
+                        256,
+                        pq_iterations,
+                        rng,
+                    )
+                    for i in range(self.pq_subvectors)
+                ]
+            )
+        return self
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduce `vectors` to unit-length float32 vectors of `dimension`"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            return self.project(vectors[None])[0]
+        if self.components is not None:
+            vectors = (vectors - self.mean) @ self.components
+        return _normalize(vectors).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Projected and quantized codes of `vectors`"""
+        projected = self.project(vectors)
+        if self.quantization == "int8":
+            return np.clip(np.round(projected / self.scale), -127, 127).astype(np.int8)
+        if self.quantization == "pq":
+            width = self.dimension // self.pq_subvectors
+            codes = np.empty((len(projected), self.pq_subvectors), dtype=np.uint8)
+            for i, codebook in enumerate(self.codebooks):
+                part = projected[:, i * width : (i + 1) * width]
+                distances = (codebook**2).sum(1) - 2 * part @ codebook.T
+                codes[:, i] = distances.argmin(1)
+            return codes
+        return projected
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate projected vectors back from codes"""
+        if self.quantization == "int8":
+            return codes.astype(np.float32) * self.scale
+        if self.quantization == "pq":
+            return np.concatenate(
+                [self.codebooks[i][codes[:, i]] for i in range(self.pq_subvectors)],
+                axis=1,
+            )
+        return codes
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """
+        Approximate cosine similarity of a full-size `query` embedding to
+        every encoded vector, without decoding them
+        """
+        query = self.project(query)
+        if self.quantization == "int8":
+            return codes.astype(np.float32) @ (query * self.scale)
+        if self.quantization == "pq":
+            width = self.dimension // self.pq_subvectors
+            # Score of every centroid of every subspace, then sum per vector
+            table = np.einsum(
+                "mkw,mw->mk",
+                self.codebooks,
+                query.reshape(self.pq_subvectors, width),
+            )
+            return table[np.arange(self.pq_subvectors), codes].sum(1)
+        return codes @ query
+
+    def search(
+        self, codes: np.ndarray, query: np.ndarray, k: int = 10
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Rows and scores of the `k` codes most similar to `query`, best first"""
+        scores = self.scores(codes, query)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return best, scores[best]
+
+    def save(self, path: str):
+        arrays = {
+            "mean": self.mean,
+            "settings": np.array(
+                [self.dimension, self.pq_subvectors, self.seed], dtype=np.int64
+            ),
+            "methods": np.array([self.reduction, self.quantization]),
+        }
+        for name in ("components", "scale", "codebooks"):
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorCompressor":
+        with np.load(path) as data:
+            dimension, pq_subvectors, seed = (int(value) for value in data["settings"])
+            reduction, quantization = (str(value) for value in data["methods"])
+            compressor = cls(dimension, reduction, quantization, pq_subvectors, seed)
+            compressor.mean = data["mean"]
+            for name in ("components", "scale", "codebooks"):
+                if name in data:
+                    setattr(compressor, name, data[name])
+        return compressor
+
+
+class CompressedEmbeddings(Embeddings):
+    """
+    Embeddings whose vectors are reduced with `compressor.project`, for
+    writing to a float index of the compressed dimension
+    """
+
+    def __init__(self, embeddings: Embeddings, compressor: VectorCompressor):
+        self.embeddings = embeddings
+        self.compressor = compressor
+
+    def _project(self, vectors: list[list[float]]) -> list[list[float]]:
+        return self.compressor.project(np.asarray(vectors)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._project(self.embeddings.embed_documents(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._project([self.embeddings.embed_query(text)])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._project(await self.embeddings.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self._project([await self.embeddings.aembed_query(text)])[0]
@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Callable, Iterable, Iterator
+
+from embeddings.ingest import Stage
+from embeddings.splitter import split_product, split_products
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def vector_id(product_id: str, chunk: str) -> str:
+    """
+    Deterministic vector ID for a chunk of a product.
+
+    Re-ingesting the same chunk always upserts the same ID, so reruns never
+    create duplicates, and unchanged chunks of an edited product keep theirs.
+    """
+    return f"{product_id}-{content_hash(chunk)[:16]}"
+
+
+class IndexManifest:
+    """
+    Local record of what is in the vector index: for every product, the hash
+    of the document that was indexed and the IDs of its vectors.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.model = None
+        self.splitter = None
+        self.products: dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.model = state.get("model")
+            self.splitter = state.get("splitter")
+            self.products = state["products"]
+
+    def save(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "model": self.model,
+                    "splitter": self.splitter,
+                    "products": self.products,
+                },
+                f,
+            )
+        os.replace(temporary, self.path)
+
+
+class DeltaIngestion:
+    """
+    Works out which chunks must be embedded and which vectors deleted to bring
+    the index from the state in `manifest` to the given catalog.
+
+    Products whose document hash is unchanged are skipped entirely. For new or
+    changed products only chunks whose IDs are not already indexed are
+    embedded; vectors of chunks that disappeared, and of products no longer in
+    the catalog, are collected in `stale_ids`. With `full`, every chunk is
+    embedded again but stale vectors are still collected.
+
+    Documents are split by `split`, in `processes` worker processes if > 1.
+    """
+
+    def __init__(
+        self,
+        manifest: IndexManifest,
+        split: Callable[[str], list[str]] = split_product,
+        full: bool = False,
+        processes: int = 1,
+    ):
+        self.manifest = manifest
+        self.split = split
+        self.full = full
+        self.processes = processes
+        self.updated: dict[str, dict] = {}
+        self.removed: list[str] = []
+        self.stale_ids: list[str] = []
+        self.stats = {
+            "unchanged": 0,
+            "added": 0,
+            "changed": 0,
+            "removed": 0,
+            "duplicates": 0,
+        }
+
+    def iter_upserts(
+        self, products: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[str, str, dict]]:
+        """Yield (vector ID, chunk text, metadata) for every chunk to upsert."""
+        seen = set()
+        digests = {}
+
+        def pending():
+            """Products that have to be split, i.e. are new or changed"""
+            for product_id, document in products:
+                if product_id in seen:
+                    # The first row of a product wins, as in the manifest
+                    self.stats["duplicates"] += 1
+                    continue
+                seen.add(product_id)
+                digest = content_hash(document)
+                previous = self.manifest.products.get(product_id)
+                if previous and previous["hash"] == digest and not self.full:
+                    self.stats["unchanged"] += 1
+                    continue
+                digests[product_id] = digest
+                yield product_id, document
+
+        for product_id, _, chunks in split_products(
+            pending(), self.split, self.processes
+        ):
+            digest = digests.pop(product_id)
+            previous = self.manifest.products.get(product_id)
+            self.stats["changed" if previous else "added"] += 1
+            chunks = {vector_id(product_id, chunk): chunk for chunk in chunks}
+            indexed = set(previous["ids"]) if previous else set()
+            for chunk_id, chunk in chunks.items():
+                if self.full or chunk_id not in indexed:
+                    yield chunk_id, chunk, {"product_id": product_id}
+            self.stale_ids.extend(indexed.difference(chunks))
+            self.updated[product_id] = {"hash": digest, "ids": list(chunks)}
+
+        for product_id in self.manifest.products.keys() - seen:
+            self.removed.append(product_id)
+            self.stale_ids.extend(self.manifest.products[product_id]["ids"])
+        self.stats["removed"] = len(self.removed)
+
+    def commit(self):
+        """Record the applied changes in the manifest and save it."""
+        self.manifest.products.update(self.updated)
+        for product_id in self.removed:
+            del self.manifest.products[product_id]
+        self.manifest.save()
+
+
+async def ingest_delta(
+    products: Iterable[tuple[str, str]],
+    engine,
+    manifest_path: str,
+    model: str = None,
+    full: bool = False,
+    delete_batch_size: int = 1000,
+    split: Callable[[str], list[str]] = split_product,
+    processes: int = 1,
+    queue_size: int = 0,
+) -> dict:
+    """
+    Bring the index in line with `products`, an iterable of
+    (product ID, document), using `engine` (an IngestionEngine) to embed and
+    upsert and its vector store to delete stale vectors.
+
+    With `full`, every product is re-embedded, not just new or changed ones.
+    Switching the embedding model or the splitter requires `full`.
+
+    With `queue_size`, reading `products` and splitting them run as separate
+    stages in background threads, each buffering at most `queue_size` items,
+    so they overlap with embedding and upserting.
+
+    The manifest is only updated once everything has been applied; since
+    vector IDs are deterministic, an interrupted run can simply be rerun.
+    """
+    manifest = IndexManifest(manifest_path)
+    if model and manifest.model not in (None, model) and not full:
+        raise ValueError(
+            f"Manifest {manifest_path} was built with {manifest.model}, not {model}; "
+            "re-index into a fresh index with a new manifest"
+        )
+    splitter = getattr(split, "__name__", type(split).__name__)
+    if manifest.splitter not in (None, splitter) and not full:
+        raise ValueError(
+            f"Manifest {manifest_path} was built with the {manifest.splitter} "
+            f"splitter, not {splitter}; run a full re-index"
+        )
+    manifest.model = model or manifest.model
+    manifest.splitter = splitter
+    delta = DeltaIngestion(manifest, split, full, processes)
+
+    # The upsert plan depends on the manifest, so only resume a checkpoint
+    # written against the same manifest
+    run_key = content_hash(json.dumps([full, manifest.products], sort_keys=True))
+    stages = []
+    upserts = delta.iter_upserts(products)
+    if queue_size:
+        products = Stage("clean", products, queue_size, "products")
+        upserts = Stage("split", delta.iter_upserts(products), queue_size, "chunks")
+        stages = [products, upserts]
+    stats = await engine.run_items(upserts, run_key, stages)
+    stale_ids = delta.stale_ids
+    for start in range(0, len(stale_ids), delete_batch_size):
+        await asyncio.to_thread(
+            engine.vector_store.delete, stale_ids[start : start + delete_batch_size]
+        )
+    delta.commit()
+
+    return {
+        **stats,
+        **delta.stats,
+        "deleted_vectors": len(stale_ids),
+        "stages": [stage.report() for stage in stages],
+    }
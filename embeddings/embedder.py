@@ -1,16 +1,184 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from config import OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME
+from pinecone import Pinecone
+from config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_STORE_PATH,
+    OPENAI_API_KEY,
+    PINECONE_API_KEY,
+    PINECONE_INDEX_NAME,
+)
+from embeddings.compression import CompressedEmbeddings, VectorCompressor
+from embeddings.delta import ingest_delta
+from embeddings.embedding_store import CachedEmbeddings, EmbeddingStore
+from embeddings.ingest import IngestionEngine
+from embeddings.splitter import split_product
+
+
+def get_embeddings(
+    model: str = EMBEDDING_MODEL, store_path: str = EMBEDDING_STORE_PATH
+) -> Embeddings:
+    """
+    OpenAI embeddings for `model`. With `store_path`, documents are looked up
+    in the embedding store there first, so only text that was never embedded
+    by `model` is sent to OpenAI.
+    """
+    embeddings = OpenAIEmbeddings(model=model, openai_api_key=OPENAI_API_KEY)
+    if not store_path:
+        return embeddings
+    return CachedEmbeddings(embeddings, EmbeddingStore(store_path), model)
+
+
+def print_cache_stats(embeddings: Embeddings):
+    if isinstance(embeddings, CachedEmbeddings):
+        print(
+            f"ℹ️ Embedding store: {embeddings.hits} reused, "
+            f"{embeddings.misses} newly embedded."
+        )
+
+
+class PineconeUpserter:
+    """
+    Writes precomputed vectors to a Pinecone index, storing the chunk text
+    under the metadata key PineconeVectorStore reads it from.
+    """
+
+    def __init__(self, index_name: str = PINECONE_INDEX_NAME, text_key: str = "text"):
+        self.index = Pinecone(api_key=PINECONE_API_KEY).Index(index_name)
+        self.text_key = text_key
+
+    def upsert(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        texts: list[str],
+        metadatas: list[dict],
+    ):
+        self.index.upsert(
+            vectors=[
+                {
+                    "id": vector_id,
+                    "values": [float(value) for value in vector],
+                    "metadata": {**metadata, self.text_key: text},
+                }
+                for vector_id, vector, text, metadata in zip(
+                    ids, vectors, texts, metadatas
+                )
+            ]
+        )
+
+    def delete(self, ids: list[str]):
+        self.index.delete(ids=ids)
+
+    def records(self, batch_size: int = 100):
+        """Yield (id, vector, text, metadata) for every vector in the index"""
+        for ids in self.index.list(limit=batch_size):
+            vectors = self.index.fetch(ids=list(ids)).vectors
+            for vector_id in ids:
+                vector = vectors.get(vector_id)
+                if vector is None:
+                    # Deleted between listing and fetching
+                    continue
+                metadata = dict(vector.metadata or {})
+                text = metadata.pop(self.text_key, "")
+                yield vector_id, vector.values, text, metadata
 
 
 def embed_and_store_in_pinecone(
-    text_chunks: list[str], index_name: str = PINECONE_INDEX_NAME
+    text_chunks: list[str],
+    index_name: str = PINECONE_INDEX_NAME,
+    batch_size: int = 100,
+    workers: int = 4,
+    checkpoint_path: str = None,
+    embedding_store_path: str = EMBEDDING_STORE_PATH,
 ):
-    embeddings = OpenAIEmbeddings(
-        model="text-embedding-ada-002", openai_api_key=OPENAI_API_KEY
+    embeddings = get_embeddings(store_path=embedding_store_path)
+    engine = IngestionEngine(
+        embeddings,
+        PineconeUpserter(index_name),
+        batch_size=batch_size,
+        workers=workers,
+        checkpoint_path=checkpoint_path,
+    )
+    stats = asyncio.run(engine.run(text_chunks))
+    print(
+        f"✅ Successfully stored {stats['chunks']} chunks into Pinecone "
+        f"({stats['chunks_per_sec']:.0f} chunks/s, {stats['retries']} retries)."
+    )
+    print_cache_stats(embeddings)
+
+
+def embed_and_store_products(
+    products,
+    manifest_path: str,
+    delta: bool = True,
+    index_name: str = PINECONE_INDEX_NAME,
+    batch_size: int = 100,
+    workers: int = 4,
+    checkpoint_path: str = None,
+    embedding_store_path: str = EMBEDDING_STORE_PATH,
+    split=split_product,
+    split_workers: int = 1,
+    upsert_workers: int = None,
+    queue_size: int = 10_000,
+    compression_path: str = None,
+):
+    """
+    Index (product ID, document) pairs with deterministic vector IDs,
+    recording what was indexed in the manifest at `manifest_path`.
+
+    With `delta`, only new or changed products are embedded and upserted and
+    vectors of changed or removed products are deleted. Documents are split
+    with `split` in `split_workers` processes.
+
+    Cleaning, splitting, embedding and upserting run as overlapping stages
+    connected by bounded queues (`queue_size` items between the first
+    stages, a few batches before embedding and upserting).
+
+    With `compression_path`, a VectorCompressor saved by
+    scripts/fit_compression.py, vectors are reduced before upserting.
+    """
+    embeddings = get_embeddings(store_path=embedding_store_path)
+    model = EMBEDDING_MODEL
+    index_embeddings = embeddings
+    if compression_path:
+        compressor = VectorCompressor.load(compression_path)
+        index_embeddings = CompressedEmbeddings(embeddings, compressor)
+        # Reduced vectors are not interchangeable with the full ones
+        model = f"{EMBEDDING_MODEL}/{compressor.name}"
+    engine = IngestionEngine(
+        index_embeddings,
+        PineconeUpserter(index_name),
+        batch_size=batch_size,
+        workers=workers,
+        upsert_workers=upsert_workers,
+        checkpoint_path=checkpoint_path,
+    )
+    stats = asyncio.run(
+        ingest_delta(
+            products,
+            engine,
+            manifest_path,
+            model,
+            full=not delta,
+            split=split,
+            processes=split_workers,
+            queue_size=queue_size,
+        )
+    )
+    print(
+        f"✅ {stats['added']} new, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed products: "
+        f"upserted {stats['chunks']} chunks ({stats['chunks_per_sec']:.0f} chunks/s), "
+        f"deleted {stats['deleted_vectors']} vectors."
     )
-    vectorstore = PineconeVectorStore(
-        index_name=index_name, embedding=embeddings, pinecone_api_key=PINECONE_API_KEY
+    for report in stats["stages"]:
+        print(f"  {report}")
+    print(
+        f"  embed: {stats['embed_seconds']:.1f}s, "
+        f"upsert: {stats['upsert_seconds']:.1f}s, "
+        f"waiting on input: {stats['read_seconds']:.1f}s"
     )
-    vectorstore.add_texts(text_chunks)
-    print(f"✅ Successfully stored {len(text_chunks)} chunks into Pinecone.")
+    print_cache_stats(embeddings)
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+KEY_SIZE = 16
+KEY_DTYPE = f"S{KEY_SIZE}"
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Content address of the embedding of `text` by `model`"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()[:KEY_SIZE]
+
+
+class EmbeddingStore:
+    """
+    Append-only, content-addressed store of embedding vectors on disk.
+
+    The directory holds `vectors.f32`, the raw float32 vectors one row after
+    another, `keys.bin`, the 16-byte key of each row in the same order, and
+    `store.json` with the dimension. Vectors are memory-mapped and the keys are
+    kept as a sorted array searched in bulk, so opening a store of millions of
+    vectors costs ~24 bytes of RAM per entry. Files are only ever appended to,
+    which makes the directory safe to copy to other nodes while in use.
+    """
+
+    def __init__(self, path: str, dimension: Optional[int] = None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.bin")
+        self._meta_path = os.path.join(path, "store.json")
+        self.dimension = dimension
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                stored = json.load(f)["dimension"]
+            if dimension not in (None, stored):
+                raise ValueError(
+                    f"Embedding store {path} holds {stored}-d vectors, not {dimension}"
+                )
+            self.dimension = stored
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        exists = os.path.exists(self._keys_path) and os.path.exists(self._vectors_path)
+        keys = np.fromfile(self._keys_path, dtype=KEY_DTYPE) if exists else []
+        keys = np.asarray(keys, dtype=KEY_DTYPE)
+        rows = len(keys)
+        if exists and self.dimension:
+            # A crash between the two appends leaves one file longer; ignore the tail
+            rows = min(rows, os.path.getsize(self._vectors_path) // self._row_bytes)
+        self._count = rows
+        self._order = np.argsort(keys[:rows], kind="stable")
+        self._sorted_keys = keys[:rows][self._order]
+        # Rows appended since the sorted index was built
+        self._recent: dict[bytes, int] = {}
+        self._mapped = None
+        if rows:
+            self._truncate(rows)
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dimension * np.dtype(np.float32).itemsize
+
+    def _truncate(self, rows: int):
+        for path, size in (
+            (self._keys_path, rows * KEY_SIZE),
+            (self._vectors_path, rows * self._row_bytes),
+        ):
+            if os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _vectors(self) -> np.ndarray:
+        if self._mapped is None or len(self._mapped) < self._count:
+            self._mapped = np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._count, self.dimension),
+            )
+        return self._mapped
+
+    def vectors(self) -> np.ndarray:
+        """All stored vectors as a read-only memory-mapped (N, dimension) array"""
+        with self._lock:
+            if not self._count:
+                return np.empty((0, self.dimension or 0), dtype=np.float32)
+            return self._vectors()
+
+    def _find(self, keys: list[bytes]) -> np.ndarray:
+        """Row of every key, -1 where it is not stored"""
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not keys:
+            return rows
+        if len(self._sorted_keys):
+            wanted = np.asarray(keys, dtype=KEY_DTYPE)
+            positions = np.searchsorted(self._sorted_keys, wanted)
+            positions = np.minimum(positions, len(self._sorted_keys) - 1)
+            found = self._sorted_keys[positions] == wanted
+            rows[found] = self._order[positions[found]]
+        if self._recent:
+            for i, key in enumerate(keys):
+                if rows[i] < 0:
+                    rows[i] = self._recent.get(key, -1)
+        return rows
+
+    def get(self, keys: list[bytes]) -> list[Optional[list[float]]]:
+        """Stored vector of every key, or None where it is missing"""
+        with self._lock:
+            rows = self._find(keys)
+            if not (rows >= 0).any():
+                return [None] * len(keys)
+            vectors = self._vectors()
+            return [vectors[row].tolist() if row >= 0 else None for row in rows]
+
+    def add(self, keys: list[bytes], vectors: list[list[float]]):
+        """Append vectors for keys that are not stored yet"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dimension": self.dimension}, f)
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Expected {self.dimension}-d vectors, got {vectors.shape[1]}-d"
+                )
+            # Key -> index in `vectors` of the first occurrence of each new key
+            new = {}
+            for i, (key, row) in enumerate(zip(keys, self._find(keys))):
+                if row < 0 and key not in new:
+                    new[key] = i
+            if not new:
+                return
+            chosen = list(new.values())
+            # Vectors first: a key is only valid once its vector is on disk
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors[chosen].tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(new))
+            for offset, key in enumerate(new):
+                self._recent[key] = self._count + offset
+            self._count += len(new)
+            if len(self._recent) > max(4096, len(self._sorted_keys) // 8):
+                self._load()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that look documents up in an EmbeddingStore first and only send
+    text that was never embedded by `model` to the wrapped embeddings.
+    Queries are passed straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore, model: str):
+        self.embeddings = embeddings
+        self.store = store
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, texts: list[str]):
+        keys = [embedding_key(self.model, text) for text in texts]
+        vectors = self.store.get(keys)
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], texts[i])
+        self.hits += len(texts) - sum(vector is None for vector in vectors)
+        self.misses += len(missing)
+        return keys, vectors, missing
+
+    def _fill(self, keys, vectors, missing, embedded):
+        self.store.add(list(missing), embedded)
+        computed = dict(zip(missing, embedded))
+        return [
+            vector if vector is not None else computed[key]
+            for key, vector in zip(keys, vectors)
+        ]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        embedded = []
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+        return self._fill(keys, vectors, missing, embedded)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        embedded = []
+        if missing:
+            embedded = await self.embeddings.aembed_documents(list(missing.values()))
+        return self._fill(keys, vectors, missing, embedded)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.embeddings.aembed_query(text)
@@ -0,0 +1,365 @@
+import asyncio
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Iterable, Optional
+
+
+class Checkpoint:
+    """
+    Records which batches of an ingestion run have been stored, so a rerun
+    over the same input can skip them.
+
+    Batches are numbered in input order. The file keeps a watermark below which
+    every batch is done plus the few completed batches above it, so it stays
+    small however long the run.
+    """
+
+    def __init__(self, path: Optional[str], batch_size: int):
+        self.path = path
+        self.batch_size = batch_size
+        self.watermark = 0
+        self.done: set[int] = set()
+        self.run_key = None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state["batch_size"] != batch_size:
+                raise ValueError(
+                    f"Checkpoint {path} was written with batch size "
+                    f"{state['batch_size']}, not {batch_size}"
+                )
+            self.watermark = state["watermark"]
+            self.done = set(state["done"])
+            self.run_key = state.get("run_key")
+
+    def bind(self, run_key: Optional[str]):
+        """Discard recorded progress if it belongs to a different run."""
+        if run_key != self.run_key and (self.watermark or self.done):
+            print(f"ℹ️ Ignoring checkpoint {self.path} from a different run")
+            self.watermark = 0
+            self.done = set()
+        self.run_key = run_key
+
+    def __contains__(self, batch: int) -> bool:
+        return batch < self.watermark or batch in self.done
+
+    def mark_done(self, batch: int):
+        self.done.add(batch)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "batch_size": self.batch_size,
+                    "run_key": self.run_key,
+                    "watermark": self.watermark,
+                    "done": sorted(self.done),
+                },
+                f,
+            )
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return (
+        _status_code(error) == 429
+        or type(error).__name__ == "RateLimitError"
+        or "rate limit" in str(error).lower()
+    )
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Stage:
+    """
+    Runs `iterable` in a background thread and hands its items on through a
+    bounded queue, so producing them overlaps with consuming them while at
+    most `maxsize` items are buffered.
+    """
+
+    def __init__(
+        self, name: str, iterable: Iterable, maxsize: int, unit: str = "items"
+    ):
+        self.name = name
+        self.unit = unit
+        self.count = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._produce, args=(iterable,), name=f"stage-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self, iterable: Iterable):
+        try:
+            for item in iterable:
+                if not self._put((True, item)):
+                    return
+            self._put((False, None))
+        except BaseException as e:
+            self._put((False, e))
+
+    def __iter__(self):
+        try:
+            while True:
+                more, item = self._queue.get()
+                if not more:
+                    if item is not None:
+                        raise item
+                    return
+                self.count += 1
+                yield item
+        finally:
+            self._closed.set()
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self._started
+        return (
+            f"{self.name}: {self.count} {self.unit} "
+            f"({self.count / max(elapsed, 1e-9):.0f}/s, "
+            f"queue {self._queue.qsize()}/{self._queue.maxsize})"
+        )
+
+
+class IngestionEngine:
+    """
+    Embeds text chunks and upserts them into a vector store in batches, with
+    bounded concurrency, retry with backoff and checkpoint/resume.
+
+    Reading the input, embedding (`workers` concurrent batches) and upserting
+    (`upsert_workers` concurrent batches) are separate stages connected by
+    bounded queues, so they overlap and memory use does not grow with the
+    input.
+
+    `embeddings` is any langchain Embeddings. `vector_store` is anything with
+    `upsert(ids, vectors, texts, metadatas)`, e.g. `PineconeUpserter` or
+    `LocalVectorStore`; it is called from worker threads.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        vector_store,
+        batch_size: int = 100,
+        workers: int = 4,
+        upsert_workers: Optional[int] = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        checkpoint_path: Optional[str] = None,
+        progress_every: int = 50,
+    ):
+        self.embeddings = embeddings
+        self.vector_store = vector_store
+        self.batch_size = batch_size
+        self.workers = workers
+        self.upsert_workers = upsert_workers or workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint = Checkpoint(checkpoint_path, batch_size)
+        self.progress_every = progress_every
+        # When one worker is rate limited, every worker waits until this time
+        self._resume_at = 0.0
+        self.stats = {}
+        self._stages = []
+        self._queues = {}
+
+    async def _call(self, function, *args):
+        """Call `function` with retries, backing off harder on rate limits."""
+        for attempt in range(self.max_retries + 1):
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            try:
+                return await function(*args)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                delay = min(self.max_delay, self.base_delay * 2**attempt)
+                delay *= 1 + random.random()
+                if is_rate_limited(e):
+                    delay = _retry_after(e) or delay * 2
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                print(f"⚠️ {type(e).__name__}: {e} - retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _embed_batch(self, items: list[tuple[str, str, dict]]):
+        started = time.perf_counter()
+        texts = [item[1] for item in items]
+        vectors = await self._call(self.embeddings.aembed_documents, texts)
+        self.stats["embed_seconds"] += time.perf_counter() - started
+        return vectors
+
+    async def _store_batch(
+        self, batch: int, items: list[tuple[str, str, dict]], vectors
+    ):
+        started = time.perf_counter()
+        ids = [item[0] for item in items]
+        texts = [item[1] for item in items]
+        metadatas = [item[2] for item in items]
+        await self._call(
+            asyncio.to_thread, self.vector_store.upsert, ids, vectors, texts, metadatas
+        )
+        self.stats["upsert_seconds"] += time.perf_counter() - started
+        self.checkpoint.mark_done(batch)
+        self.stats["batches"] += 1
+        self.stats["chunks"] += len(items)
+        if self.stats["batches"] % self.progress_every == 0:
+            self._print_progress()
+
+    def _print_progress(self):
+        elapsed = time.perf_counter() - self._started
+        print(
+            f"Stored {self.stats['chunks']} chunks in {elapsed:.1f}s "
+            f"({self.stats['chunks'] / max(elapsed, 1e-9):.0f} chunks/s)"
+        )
+        for stage in self._stages:
+            print(f"  {stage.report()}")
+        for name, q in self._queues.items():
+            print(f"  {name}: queue {q.qsize()}/{q.maxsize}")
+
+    async def run(
+        self,
+        texts: Iterable[str],
+        ids: Optional[Iterable[str]] = None,
+        metadatas: Optional[Iterable[dict]] = None,
+    ) -> dict:
+        """
+        Embed and store `texts`, which may be a generator.
+
+        Batches recorded in the checkpoint are skipped, so rerunning with the
+        same input resumes an interrupted run. The checkpoint is removed once
+        every batch has been stored.
+
+        Returns ingestion statistics including chunks/sec.
+        """
+        if ids is None:
+            ids = (str(uuid.uuid4()) for _ in itertools.count())
+        if metadatas is None:
+            metadatas = itertools.repeat({})
+        return await self.run_items(zip(ids, texts, metadatas))
+
+    async def run_items(
+        self,
+        items: Iterable[tuple[str, str, dict]],
+        run_key: Optional[str] = None,
+        stages: Iterable["Stage"] = (),
+    ) -> dict:
+        """
+        Embed and store (id, text, metadata) items, see `run`.
+
+        `run_key` identifies the input; a checkpoint written for a different
+        key is not resumed from. `stages` are upstream stages whose
+        throughput and queue depth are reported with the progress.
+        """
+        self.checkpoint.bind(run_key)
+        self.stats = {
+            "chunks": 0,
+            "batches": 0,
+            "skipped_batches": 0,
+            "retries": 0,
+            # Time spent waiting on the input, embedding and upserting
+            "read_seconds": 0.0,
+            "embed_seconds": 0.0,
+            "upsert_seconds": 0.0,
+        }
+        self._started = time.perf_counter()
+        self._stages = list(stages)
+        items = iter(items)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=self.upsert_workers * 2)
+        self._queues = {"embed": embed_queue, "upsert": upsert_queue}
+
+        def next_chunk():
+            started = time.perf_counter()
+            chunk = list(itertools.islice(items, self.batch_size))
+            self.stats["read_seconds"] += time.perf_counter() - started
+            return chunk
+
+        async def produce():
+            for batch in itertools.count():
+                # Pulled in a thread so upstream stages never block the loop
+                chunk = await asyncio.to_thread(next_chunk)
+                if not chunk:
+                    break
+                if batch in self.checkpoint:
+                    self.stats["skipped_batches"] += 1
+                    continue
+                await embed_queue.put((batch, chunk))
+            for _ in range(self.workers):
+                await embed_queue.put(None)
+
+        async def embed():
+            while (job := await embed_queue.get()) is not None:
+                batch, chunk = job
+                await upsert_queue.put((batch, chunk, await self._embed_batch(chunk)))
+
+        async def upsert():
+            while (job := await upsert_queue.get()) is not None:
+                await self._store_batch(*job)
+
+        embedders = [asyncio.create_task(embed()) for _ in range(self.workers)]
+
+        async def finish_upserts():
+            await asyncio.gather(*embedders)
+            for _ in range(self.upsert_workers):
+                await upsert_queue.put(None)
+
+        tasks = [asyncio.create_task(produce()), *embedders]
+        tasks.append(asyncio.create_task(finish_upserts()))
+        tasks += [asyncio.create_task(upsert()) for _ in range(self.upsert_workers)]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if task.exception():
+                raise task.exception()
+
+        self.checkpoint.clear()
+        elapsed = time.perf_counter() - self._started
+        self.stats["seconds"] = elapsed
+        self.stats["chunks_per_sec"] = self.stats["chunks"] / max(elapsed, 1e-9)
+        return self.stats
@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+
+
+class LocalVectorStore:
+    """
+    In-memory vector store with the same upsert/delete interface as the
+    Pinecone upserter, for offline ingestion runs, tests and benchmarks.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.rows: dict[str, int] = {}
+        # Grown by doubling so appends are amortized O(1)
+        self._data = np.empty((0, 0), dtype=np.float32)
+        # Ingestion workers upsert from several threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All stored vectors as one (N, dim) float32 matrix"""
+        return self._data[: len(self.ids)]
+
+    def _reserve(self, size: int, dimension: int):
+        if self._data.shape[1] != dimension and len(self.ids) == 0:
+            self._data = np.empty((0, dimension), dtype=np.float32)
+        if size > len(self._data):
+            grown = np.empty((max(size, 2 * len(self._data)), dimension), np.float32)
+            grown[: len(self.ids)] = self.vectors
+            self._data = grown
+
+    def upsert(
+        self,
+        ids: list[str],
+        vectors: list[list[float]],
+        texts: list[str],
+        metadatas: list[dict],
+    ):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        with self._lock:
+            self._upsert(ids, vectors, texts, metadatas)
+
+    def _upsert(self, ids, vectors, texts, metadatas):
+        self._reserve(len(self.ids) + len(vectors), vectors.shape[1])
+        for vector_id, vector, text, metadata in zip(ids, vectors, texts, metadatas):
+            row = self.rows.get(vector_id)
+            if row is None:
+                row = self.rows[vector_id] = len(self.ids)
+                self.ids.append(vector_id)
+                self.texts.append(text)
+                self.metadatas.append(metadata)
+            else:
+                self.texts[row] = text
+                self.metadatas[row] = metadata
+            self._data[row] = vector
+
+    def delete(self, ids: list[str]):
+        with self._lock:
+            self._delete(ids)
+
+    def _delete(self, ids: list[str]):
+        doomed = {self.rows[vector_id] for vector_id in ids if vector_id in self.rows}
+        if not doomed:
+            return
+        keep = [row for row in range(len(self.ids)) if row not in doomed]
+        self._data = self.vectors[keep]
+        self.ids = [self.ids[row] for row in keep]
+        self.texts = [self.texts[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+
+    def records(self):
+        """Yield (id, vector, text, metadata) for every stored vector"""
+        for row, vector_id in enumerate(list(self.ids)):
+            yield vector_id, self._data[row], self.texts[row], self.metadatas[row]
+
+    def search(self, vector: list[float], k: int = 5) -> list[tuple[str, float]]:
+        """Return the `k` most cosine-similar (id, score) pairs"""
+        matrix = self.vectors
+        if not len(matrix):
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.ids[row], float(scores[row])) for row in best]
@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy as np
+
+NEIGHBOURS_FILE = "neighbours.npy"
+SCORES_FILE = "scores.npy"
+PRODUCTS_FILE = "products.json"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def compute_neighbours(
+    vectors: np.ndarray,
+    top_n: int = 10,
+    row_block: int = 1024,
+    column_block: int = 16384,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the `top_n` most cosine-similar rows for every row of `vectors`.
+
+    The similarity matrix is computed one (row_block x column_block) tile at a
+    time, keeping a running top-n per row, so peak memory is bounded by the
+    tile size rather than N x N.
+
+    Returns (indices, scores), both of shape (N, top_n) and sorted by
+    descending similarity. A row is never its own neighbour.
+    """
+    vectors = _normalize(vectors)
+    count = len(vectors)
+    top_n = min(top_n, count - 1)
+    indices = np.empty((count, top_n), dtype=np.int32)
+    scores = np.empty((count, top_n), dtype=np.float32)
+    if top_n <= 0:
+        return indices, scores
+
+    for row_start in range(0, count, row_block):
+        rows = vectors[row_start : row_start + row_block]
+        best_scores = np.full((len(rows), top_n), -np.inf, dtype=np.float32)
+        best_indices = np.zeros((len(rows), top_n), dtype=np.int32)
+        row_ids = np.arange(row_start, row_start + len(rows))
+
+        for column_start in range(0, count, column_block):
+            columns = vectors[column_start : column_start + column_block]
+            similarities = rows @ columns.T
+            column_ids = np.arange(column_start, column_start + len(columns))
+            # Exclude each product from its own neighbour list
+            self_rows, self_columns = np.nonzero(row_ids[:, None] == column_ids)
+            similarities[self_rows, self_columns] = -np.inf
+
+            candidate_scores = np.concatenate([best_scores, similarities], axis=1)
+            candidate_indices = np.concatenate(
+                [best_indices, np.broadcast_to(column_ids, similarities.shape)],
+                axis=1,
+            )
+            keep = np.argpartition(-candidate_scores, top_n - 1, axis=1)[:, :top_n]
+            best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+            best_indices = np.take_along_axis(candidate_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        scores[row_start : row_start + len(rows)] = np.take_along_axis(
+            best_scores, order, axis=1
+        )
+        indices[row_start : row_start + len(rows)] = np.take_along_axis(
+            best_indices, order, axis=1
+        )
+
+    return indices, scores
+
+
+def save_neighbour_table(
+    output_dir: str,
+    product_ids: list[str],
+    titles: list[str],
+    indices: np.ndarray,
+    scores: np.ndarray,
+    model: str = "",
+):
+    """
+    Write a neighbour table that product-service can memory-map.
+
+    The directory holds `neighbours.npy` (int32 row numbers), `scores.npy`
+    (float16 cosine similarities) and `products.json` with the product ID and
+    title of every row.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shape = indices.shape
+    neighbours = np.lib.format.open_memmap(
+        os.path.join(output_dir, NEIGHBOURS_FILE),
+        mode="w+",
+        dtype=np.int32,
+        shape=shape,
+    )
+    neighbours[:] = indices
+    neighbours.flush()
+    compact_scores = np.lib.format.open_memmap(
+        os.path.join(output_dir, SCORES_FILE), mode="w+", dtype=np.float16, shape=shape
+    )
+    compact_scores[:] = scores
+    compact_scores.flush()
+    with open(os.path.join(output_dir, PRODUCTS_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "model": model,
+                "top_n": shape[1],
+                "ids": list(product_ids),
+                "titles": list(titles),
+            },
+            f,
+        )
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import time
+from typing import Iterable, Iterator
+
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(
+    path: str,
+    records: Iterable[tuple[str, list[float], str, dict]],
+    model: str,
+    metric: str = "cosine",
+) -> dict:
+    """
+    Write (id, vector, text, metadata) records as a snapshot directory.
+
+    The snapshot holds `vectors.npy`, a float32 (N, dimension) array that can
+    be memory-mapped, `records.json` with the IDs, texts and metadata stored
+    column by column, and `manifest.json` with the format version, model,
+    dimension, count and a sha256 of each file. Vectors are streamed to disk,
+    so only the texts and metadata are held in memory.
+
+    Returns the manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    raw_path = os.path.join(path, "vectors.f32.tmp")
+    ids, texts, columns = [], [], {}
+    dimension = None
+    with open(raw_path, "wb") as raw:
+        for vector_id, vector, text, metadata in records:
+            vector = np.asarray(vector, dtype=np.float32)
+            if dimension is None:
+                dimension = len(vector)
+            elif len(vector) != dimension:
+                raise ValueError(
+                    f"Vector {vector_id} has {len(vector)} dimensions, not {dimension}"
+                )
+            raw.write(vector.tobytes())
+            for key, value in metadata.items():
+                # Records without the key get None in its column
+                columns.setdefault(key, [None] * len(ids)).append(value)
+            ids.append(vector_id)
+            texts.append(text)
+            for column in columns.values():
+                if len(column) < len(ids):
+                    column.append(None)
+
+    # Prepend the .npy header now that the shape is known
+    vectors_path = os.path.join(path, VECTORS_FILE)
+    header = {
+        "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+        "fortran_order": False,
+        "shape": (len(ids), dimension or 0),
+    }
+    with open(vectors_path, "wb") as out, open(raw_path, "rb") as raw:
+        np.lib.format.write_array_header_1_0(out, header)
+        while block := raw.read(1 << 20):
+            out.write(block)
+    os.remove(raw_path)
+
+    with open(os.path.join(path, RECORDS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "texts": texts, "metadata": columns}, f)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": model,
+        "metric": metric,
+        "dimension": dimension or 0,
+        "count": len(ids),
+        "checksums": {
+            name: file_sha256(os.path.join(path, name))
+            for name in (VECTORS_FILE, RECORDS_FILE)
+        },
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class Snapshot:
+    """A snapshot written by `write_snapshot`, with vectors memory-mapped"""
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Open the snapshot at `path`; with `verify`, check the files against
+        the manifest checksums first.
+        """
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] > SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Snapshot {path} has format version {self.manifest['version']}, "
+                f"this code reads up to {SNAPSHOT_VERSION}"
+            )
+        if verify:
+            for name, checksum in self.manifest["checksums"].items():
+                if file_sha256(os.path.join(path, name)) != checksum:
+                    raise ValueError(
+                        f"Snapshot file {name} does not match its checksum"
+                    )
+
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(path, RECORDS_FILE), encoding="utf-8") as f:
+            records = json.load(f)
+        self.ids = records["ids"]
+        self.texts = records["texts"]
+        self.metadata = records["metadata"]
+        if self.vectors.shape != (self.manifest["count"], self.manifest["dimension"]):
+            raise ValueError(f"Snapshot {path} vectors do not match its manifest")
+
+    @property
+    def model(self) -> str:
+        return self.manifest["model"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def metadata_at(self, row: int) -> dict:
+        return {
+            key: column[row]
+            for key, column in self.metadata.items()
+            if column[row] is not None
+        }
+
+    def records(self) -> Iterator[tuple[str, np.ndarray, str, dict]]:
+        """Yield (id, vector, text, metadata) for every record"""
+        for row, vector_id in enumerate(self.ids):
+            yield vector_id, self.vectors[row], self.texts[row], self.metadata_at(row)
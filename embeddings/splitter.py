@@ -1,13 +1,157 @@
+import itertools
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+# Field labels of the product documents built by embeddings/cleaner.py
+PRODUCT_FIELDS = (
+    "Category",
+    "Title",
+    "Features",
+    "Description",
+    "Price",
+    "Average Rating",
+)
+# Fields repeated at the top of every chunk of a product
+HEADER_FIELDS = ("Category", "Title")
+FIELD_PATTERN = re.compile(
+    r"^(?:" + "|".join(map(re.escape, PRODUCT_FIELDS)) + r"): ", re.MULTILINE
+)
+
+
+@lru_cache(maxsize=8)
+def _get_splitter(
+    chunk_size: int, chunk_overlap: int
+) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
 
 def split_documents(
     documents: list[str], chunk_size: int = 1000, chunk_overlap: int = 200
 ) -> list[str]:
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, chunk_overlap=chunk_overlap
-    )
+    splitter = _get_splitter(chunk_size, chunk_overlap)
     docs = [Document(page_content=text) for text in documents]
     chunks = splitter.split_documents(docs)
     return [chunk.page_content for chunk in chunks]
+
+
+def split_text(
+    document: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> list[str]:
+    """Split a single product document into chunks."""
+    return _get_splitter(chunk_size, chunk_overlap).split_text(document)
+
+
+def _product_fields(document: str) -> list[tuple[str, str]]:
+    """(label, text) of every field of a product document, in order."""
+    starts = [match.start() for match in FIELD_PATTERN.finditer(document)]
+    if not starts or starts[0] != 0:
+        return []
+    ends = starts[1:] + [len(document)]
+    fields = []
+    for start, end in zip(starts, ends):
+        text = document[start:end]
+        if not text.endswith("\n"):
+            text += "\n"
+        fields.append((text.split(": ", 1)[0], text))
+    return fields
+
+
+def split_product(
+    document: str, chunk_size: int = 1000, chunk_overlap: int = 200
+) -> list[str]:
+    """
+    Split a product document on field boundaries.
+
+    Documents up to `chunk_size` characters are kept whole. Longer ones are
+    cut between fields, each chunk starting with the product's category and
+    title lines; only a field that does not fit in a chunk by itself is split
+    further, with `chunk_overlap` and its label repeated on every piece.
+    Text that is not a product document is split like `split_text`.
+    """
+    if len(document) <= chunk_size:
+        return [document]
+    fields = _product_fields(document)
+    if not fields:
+        return split_text(document, chunk_size, chunk_overlap)
+
+    header = "".join(text for label, text in fields if label in HEADER_FIELDS)
+    header = header[: chunk_size // 2]
+    budget = chunk_size - len(header)
+
+    chunks = []
+    current = ""
+    for label, text in fields:
+        if label in HEADER_FIELDS:
+            continue
+        if len(current) + len(text) > budget and current and len(text) <= budget:
+            chunks.append(header + current)
+            current = ""
+        if len(current) + len(text) <= budget:
+            current += text
+            continue
+
+        # Too long for one chunk: fill chunks with pieces of the field, each
+        # overlapping the previous one and repeating the field label
+        prefix = f"{label}: "
+        content = text[len(prefix) :].rstrip("\n")
+        while content:
+            room = budget - len(current) - len(prefix) - 1
+            if room < budget // 4:
+                chunks.append(header + current)
+                current = ""
+                continue
+            if len(content) <= room:
+                current += f"{prefix}{content}\n"
+                break
+            overlap = min(chunk_overlap, room // 4)
+            part = split_text(content, room, overlap)[0]
+            end = content.find(part) + len(part)
+            chunks.append(f"{header}{current}{prefix}{part}\n")
+            current = ""
+            # Start the next piece at a word boundary inside the overlap
+            resume = content.find(" ", end - overlap, end)
+            content = content[resume + 1 if resume > 0 else end :].lstrip()
+    if current or not chunks:
+        chunks.append(header + current)
+    return chunks
+
+
+def split_products(
+    products: Iterable[tuple[str, str]],
+    split: Callable[[str], list[str]] = split_product,
+    processes: int = 1,
+    block_size: int = 4096,
+) -> Iterator[tuple[str, str, list[str]]]:
+    """
+    Yield (product ID, document, chunks) for (product ID, document) pairs,
+    in input order.
+
+    With `processes` > 1 documents are split in a process pool, `block_size`
+    products at a time so large catalogs are never held in memory at once;
+    `split` must then be picklable, e.g. a module-level function.
+    """
+    products = iter(products)
+    if processes <= 1:
+        for product_id, document in products:
+            yield product_id, document, split(document)
+        return
+
+    with ProcessPoolExecutor(processes) as pool:
+        while block := list(itertools.islice(products, block_size)):
+            documents = [document for _, document in block]
+            chunksize = max(1, len(block) // (processes * 4))
+            for (product_id, document), chunks in zip(
+                block, pool.map(split, documents, chunksize=chunksize)
+            ):
+                yield product_id, document, chunks
+
+
+# Splitters selectable by name, e.g. from the command line
+SPLITTERS = {"product": split_product, "recursive": split_text}
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -6,17 +7,28 @@ import uvicorn
 import logging.config
 import config
 from routers import order_router
-
+from services.mockapi_service import get_mock_api
 
 logging.config.dictConfig(config=config.LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
 logger.info("Starting order service")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled mock API client for the lifetime of the app"""
+    mock_api = get_mock_api()
+    await mock_api.start()
+    yield
+    await mock_api.close()
+
+
 app = FastAPI(
     title="E-Commerce Order Service",
     description="Order service that uses mockapi to provide order related user responses",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -0,0 +1,83 @@
+"""
+Latency of customer order lookups in the mock API: boolean scan vs. index.
+
+Builds synthetic order tables of each size and times looking up random
+customers with the former full-column scan (`df[df["Customer_Id"] == id]`)
+and with the CustomerIndex slice, both with and without converting the rows
+to the records returned by the API. Index lookups should stay flat as the
+table grows while the scan grows linearly.
+
+Usage:
+    python benchmarks/bench_customer_lookup.py --sizes 1000000 10000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Set service root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from services.order_index import CustomerIndex
+from synthetic_orders import generate_orders
+
+
+def median_ms(lookup, customer_ids) -> float:
+    timings = []
+    for customer_id in customer_ids:
+        start = time.perf_counter()
+        lookup(customer_id)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"{'rows':>10} {'customers':>10} {'build s':>8} {'scan ms':>9} "
+        f"{'index ms':>9} {'scan+dict ms':>13} {'index+dict ms':>14}"
+    )
+    for rows in args.sizes:
+        df = generate_orders(rows, seed=args.seed)
+        start = time.perf_counter()
+        index = CustomerIndex(df)
+        build = time.perf_counter() - start
+        df = index.df
+        customer_ids = rng.choice(list(index.ranges), args.lookups)
+        scan_ids = customer_ids[: args.scan_lookups]
+
+        def scan(customer_id):
+            return df[df["Customer_Id"] == customer_id]
+
+        scan_ms = median_ms(scan, scan_ids)
+        index_ms = median_ms(index.orders, customer_ids)
+        scan_dict_ms = median_ms(
+            lambda customer_id: scan(customer_id).to_dict(orient="records"), scan_ids
+        )
+        index_dict_ms = median_ms(
+            lambda customer_id: index.orders(customer_id).to_dict(orient="records"),
+            customer_ids,
+        )
+        print(
+            f"{rows:>10} {len(index):>10} {build:>8.1f} {scan_ms:>9.3f} "
+            f"{index_ms:>9.3f} {scan_dict_ms:>13.3f} {index_dict_ms:>14.3f}"
+        )
+        del df, index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument(
+        "--scan-lookups",
+        type=int,
+        default=50,
+        help="Lookups timed for the scan, which is much slower",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
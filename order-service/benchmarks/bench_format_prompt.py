@@ -0,0 +1,66 @@
+"""
+Size and build time of the order formatting prompt, with and without the
+token-budgeted data reduction.
+
+Generates the orders of customers with more and more orders, as the mock API
+returns them, and renders the formatting prompt from the full data (the
+former behaviour) and from the data reduced by DataReducer. The LLM call
+itself is not made; its latency grows with the prompt tokens reported here.
+
+Usage:
+    python benchmarks/bench_format_prompt.py --sizes 10 100 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Set service root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.data_reducer import DataReducer
+from services.order_pages import encode_records
+from services.prompt_helper_service import PromptHelperService
+from synthetic_orders import generate_orders
+
+QUERY = "Show me all my orders"
+
+
+def build_prompt(prompt, data, reducer=None) -> tuple[str, float]:
+    start = time.perf_counter()
+    if reducer is not None:
+        data = reducer.reduce(data, QUERY)
+    messages = prompt.format_messages(
+        query=QUERY, customer_id="10000", data=json.dumps(data, ensure_ascii=False)
+    )
+    text = "\n".join(message.content for message in messages)
+    return text, (time.perf_counter() - start) * 1000
+
+
+def main(args):
+    prompt = PromptHelperService().get_response_formatting_prompt()
+    reducer = DataReducer(token_budget=args.budget)
+    print(
+        f"{'orders':>8} {'tokens before':>14} {'ms before':>10} "
+        f"{'tokens after':>13} {'ms after':>9}"
+    )
+    for size in args.sizes:
+        orders = generate_orders(size, customers=1)
+        data = [json.loads(record) for record in encode_records(orders)]
+        before, before_ms = build_prompt(prompt, data)
+        after, after_ms = build_prompt(prompt, data, reducer)
+        print(
+            f"{size:>8} {reducer.count_tokens(before):>14} {before_ms:>10.1f} "
+            f"{reducer.count_tokens(after):>13} {after_ms:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--budget", type=int, default=2000)
+    main(parser.parse_args())
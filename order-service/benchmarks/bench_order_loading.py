@@ -0,0 +1,132 @@
+"""
+Startup time and memory of loading the orders dataset in the mock API.
+
+Compares the former loader (CSV parse, row-wise validation, object columns;
+reproduced below) with services/order_loader.py reading the CSV and reading
+its Parquet cache. Each mode runs in a fresh process so peak RSS is measured
+independently.
+
+Usage:
+    python benchmarks/bench_order_loading.py --rows 5000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Set service root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from synthetic_orders import write_orders
+
+MODES = ["legacy", "csv", "parquet"]
+
+
+def legacy_load_orders(csv_path: str) -> pd.DataFrame:
+    """The loader this benchmark replaced"""
+    df = pd.read_csv(csv_path)
+    df.dropna(subset=["Product", "Product_Category", "Sales", "Profit"], inplace=True)
+    df = df[
+        df["Sales"].apply(
+            lambda x: isinstance(x, (int, float))
+            or str(x).replace(".", "", 1).isdigit()
+        )
+    ]
+    df = df[
+        df["Profit"].apply(
+            lambda x: isinstance(x, (int, float))
+            or str(x).replace(".", "", 1).isdigit()
+        )
+    ].copy()
+    df["Sales"] = df["Sales"].astype(float)
+    df["Profit"] = df["Profit"].astype(float)
+    df["Order_Date"] = pd.to_datetime(df["Order_Date"], errors="coerce")
+    df.dropna(subset=["Order_Date"], inplace=True)
+    for col in [
+        "Product",
+        "Product_Category",
+        "Gender",
+        "Device_Type",
+        "Customer_Login_type",
+        "Order_Priority",
+        "Payment_method",
+    ]:
+        df[col] = df[col].astype(str).str.strip().str.lower()
+    df.fillna(value="", inplace=True)
+    return df
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, csv_path: str, cache_path: str) -> dict:
+    from services.order_loader import load_orders
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        df = legacy_load_orders(csv_path)
+    else:
+        df = load_orders(csv_path, cache_path if mode == "parquet" else "")
+    return {
+        "rows": len(df),
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+        "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+    }
+
+
+def main(args):
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    os.makedirs(data_dir, exist_ok=True)
+    csv_path = os.path.join(data_dir, f"orders_{args.rows}.csv")
+    if not os.path.exists(csv_path):
+        start = time.perf_counter()
+        write_orders(csv_path, args.rows)
+        print(
+            f"Generated {args.rows} orders in {time.perf_counter() - start:.1f}s "
+            f"({os.path.getsize(csv_path) / 2**20:.0f} MB)"
+        )
+    cache_path = os.path.join(data_dir, f"orders_{args.rows}.parquet")
+    if "parquet" in args.modes:
+        # Build the cache first, so the parquet mode measures a warm start
+        from services.order_loader import load_orders
+
+        load_orders(csv_path, cache_path)
+
+    print(
+        f"{'mode':>8} {'rows':>10} {'seconds':>9} {'peak RSS MB':>12} {'frame MB':>9}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for mode in args.modes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_mode, mode, csv_path, cache_path).result()
+        print(
+            f"{mode:>8} {result['rows']:>10} {result['seconds']:>9.1f} "
+            f"{result['peak_rss_mb']:>12.0f} {result['frame_mb']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument(
+        "--data-dir", help="Where to keep the generated orders between runs"
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    main(parser.parse_args())
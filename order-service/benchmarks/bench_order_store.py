@@ -0,0 +1,114 @@
+"""
+Latency and memory of the mock API backends: pandas vs. SQLite.
+
+Generates a dataset of each size, imports it into SQLite, then starts the
+mock API with each backend in a fresh process and times its endpoints for
+random customers. Peak RSS covers loading the dataset and serving the
+requests.
+
+Usage:
+    python benchmarks/bench_order_store.py --sizes 100000 1000000 5000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Set service root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_order_loading import peak_rss_mb
+from synthetic_orders import write_orders
+
+BACKENDS = ["pandas", "sqlite"]
+REQUESTS = {
+    "customer": "/data/customer/{customer_id}",
+    "most-recent": "/data/customer/{customer_id}/most-recent",
+    "customer-filter": "/data/customer/{customer_id}"
+    "?filter_by=Order_Priority,equals,high&sort_by=Sales&limit=3",
+    "priority-page": "/data/order-priority/critical?limit=100&offset={offset}",
+    "category-top": "/data/product-category/fashion"
+    "?filter_by=Sales,greater_than,200&sort_by=Profit&limit=20",
+    "aggregate": "/data/total-sales-by-category",
+}
+
+
+def run_backend(backend: str, csv_path: str, db_path: str, customers: list) -> dict:
+    os.environ.update(
+        ORDER_BACKEND=backend,
+        ORDER_DATASET_PATH=csv_path,
+        ORDER_DB_PATH=db_path,
+        ORDER_CACHE_PATH=os.path.splitext(csv_path)[0] + ".parquet",
+    )
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    import services.mock_api as mock_api
+
+    result = {"startup_s": time.perf_counter() - start}
+    client = TestClient(mock_api.app)
+    for name, url in REQUESTS.items():
+        timings = []
+        for i, customer_id in enumerate(customers):
+            request = url.format(customer_id=customer_id, offset=i * 100)
+            start = time.perf_counter()
+            response = client.get(request)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+        result[name] = statistics.median(timings) * 1000
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def main(args):
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    os.makedirs(data_dir, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'rows':>9} {'backend':>7} {'startup s':>9} {'RSS MB':>7} "
+        + " ".join(f"{name + ' ms':>18}" for name in REQUESTS)
+    )
+    for rows in args.sizes:
+        csv_path = os.path.join(data_dir, f"orders_{rows}.csv")
+        if not os.path.exists(csv_path):
+            write_orders(csv_path, rows)
+        db_path = os.path.join(data_dir, f"orders_{rows}.db")
+        if not os.path.exists(db_path):
+            from services.order_store import import_orders
+
+            import_orders(csv_path, db_path)
+        # Customer IDs of synthetic_orders
+        customers = list(range(10_000, 10_000 + args.lookups))
+
+        for backend in args.backends:
+            if backend == "pandas":
+                # Build the Parquet cache first, so startup is a warm start
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    pool.submit(run_backend, backend, csv_path, db_path, [10_000])
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(
+                    run_backend, backend, csv_path, db_path, customers
+                ).result()
+            print(
+                f"{rows:>9} {backend:>7} {result['startup_s']:>9.1f} "
+                f"{result['peak_rss_mb']:>7.0f} "
+                + " ".join(f"{result[name]:>18.2f}" for name in REQUESTS)
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[100_000, 1_000_000, 5_000_000]
+    )
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument(
+        "--data-dir", help="Where to keep the generated orders between runs"
+    )
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    main(parser.parse_args())
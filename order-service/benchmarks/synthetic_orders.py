@@ -0,0 +1,71 @@
+"""
+Synthetic orders in the Order_Data_Dataset.csv schema.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL = {
+    "Gender": ["male", "female"],
+    "Device_Type": ["web", "mobile"],
+    "Customer_Login_type": ["member", "guest", "new", "first signup"],
+    "Product_Category": [
+        "fashion",
+        "home & furniture",
+        "auto & accessories",
+        "electronic",
+    ],
+    "Product": [
+        "t-shirts",
+        "running shoes",
+        "sofa covers",
+        "car seat covers",
+        "tyre",
+        "fossil watch",
+        "samsung mobile",
+        "apple laptop",
+        "headphones",
+        "mouse",
+    ],
+    "Order_Priority": ["low", "medium", "high", "critical"],
+    "Payment_method": ["credit_card", "money_order", "e_wallet", "debit_card"],
+}
+
+
+def _choice(values: list[str], rows: int, rng: np.random.Generator) -> np.ndarray:
+    """Object column drawn from `values`, sharing one str object per value"""
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+
+def generate_orders(rows: int, customers: int = 0, seed: int = 0) -> pd.DataFrame:
+    """
+    `rows` cleaned orders (as loaded by services/mock_api.py) from
+    `customers` customers, rows // 10 by default, in random order
+    """
+    rng = np.random.default_rng(seed)
+    customers = customers or max(1, rows // 10)
+    sales = rng.integers(30, 250, rows).astype(float)
+    df = pd.DataFrame(
+        {
+            "Order_Date": pd.Timestamp("2018-01-01")
+            + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+            "Time": _choice([f"{h:02d}:00:00" for h in range(24)], rows, rng),
+            "Aging": rng.integers(1, 11, rows).astype(float),
+            "Customer_Id": rng.integers(10_000, 10_000 + customers, rows),
+            "Sales": sales,
+            "Quantity": rng.integers(1, 6, rows).astype(float),
+            "Discount": rng.integers(1, 6, rows) / 10,
+            "Profit": np.round(sales * rng.uniform(0.05, 0.5, rows), 1),
+            "Shipping_Cost": np.round(rng.uniform(1, 20, rows), 1),
+        }
+    )
+    for column, values in CATEGORICAL.items():
+        df[column] = _choice(values, rows, rng)
+    return df
+
+
+def write_orders(path: str, rows: int, customers: int = 0, seed: int = 0):
+    """Write `rows` synthetic orders to a CSV file"""
+    generate_orders(rows, customers, seed).to_csv(
+        path, index=False, date_format="%Y-%m-%d"
+    )
@@ -18,6 +18,18 @@ ORDER_LOOKUP_URL = os.getenv(
     "ORDER_SERVICE_URL", "http://order-service:8002/api/orders"
 )
 MOCK_API_URL = os.getenv("MOCK_API_URL", "http://mock-api:4000")
+# Pooled connections to the mock API
+MOCK_API_MAX_CONNECTIONS = int(os.getenv("MOCK_API_MAX_CONNECTIONS", "20"))
+# Mock API responses are cached for this many seconds; 0 entries disables it
+MOCK_API_CACHE_TTL = float(os.getenv("MOCK_API_CACHE_TTL", "60"))
+MOCK_API_CACHE_SIZE = int(os.getenv("MOCK_API_CACHE_SIZE", "256"))
+MOCK_API_CACHE_MAX_BYTES = int(os.getenv("MOCK_API_CACHE_MAX_BYTES", str(32 * 2**20)))
+# Query plans of LLM-analysed questions kept for reuse; 0 disables the cache
+QUERY_PLAN_CACHE_SIZE = int(os.getenv("QUERY_PLAN_CACHE_SIZE", "512"))
+# "template" answers common order queries from templates, "llm" always uses the LLM
+ORDER_RESPONSE_FORMATTER = os.getenv("ORDER_RESPONSE_FORMATTER", "template")
+# Tokens of order data passed to the formatting LLM; larger data is summarized
+ORDER_FORMAT_TOKEN_BUDGET = int(os.getenv("ORDER_FORMAT_TOKEN_BUDGET", "2000"))
 
 # LLM Configuration
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
@@ -3,7 +3,9 @@ from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 from services.prompt_helper_service import PromptHelperService
 from services.llm_service import LLMService
+from services.mockapi_service import MockAPI, get_mock_api
 from services.order_service import OrderService
+from services.query_planner import QueryPlanner, get_query_planner
 
 router = APIRouter(
     prefix="/orders", tags=["order"], responses={404: {"description": "Not found"}}
@@ -56,7 +58,10 @@ async def handle_order_query(
         print(f"Received query: {user_query}")
 
         # 1. Process the order query using order service
-        result = await order_service.process_order_query(customer_id, user_query)
+        # metadata.formatter selects "template" or "llm" formatting
+        result = await order_service.process_order_query(
+            customer_id, user_query, (request.metadata or {}).get("formatter")
+        )
         return OrderQueryResponse(**result)
 
     except Exception as e:
@@ -68,3 +73,23 @@ async def handle_order_query(
 async def health_check():
     """Simple health check endpoint"""
     return {"status": "ok"}
+
+
+@router.get("/mock-api/metrics")
+async def mock_api_metrics(mock_api: MockAPI = Depends(get_mock_api)):
+    """Hits, misses and size of the mock API response cache"""
+    return mock_api.metrics()
+
+
+@router.post("/mock-api/invalidate")
+async def invalidate_mock_api_cache(
+    customer_id: Optional[str] = None, mock_api: MockAPI = Depends(get_mock_api)
+):
+    """Drop cached mock API responses of one customer, or all of them"""
+    return {"invalidated": mock_api.invalidate(customer_id)}
+
+
+@router.get("/planner/metrics")
+async def query_planner_metrics(planner: QueryPlanner = Depends(get_query_planner)):
+    """How many order queries were planned without the LLM"""
+    return planner.metrics()
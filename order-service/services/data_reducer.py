@@ -0,0 +1,172 @@
+"""
+Reduction of order data to a token budget before the formatting prompt
+"""
+
+import itertools
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from config import LLM_MODEL, ORDER_FORMAT_TOKEN_BUDGET
+
+# Columns kept for the formatting LLM unless the query mentions others
+DEFAULT_COLUMNS = [
+    "Order_Date",
+    "Product",
+    "Product_Category",
+    "Sales",
+    "Profit",
+    "Quantity",
+    "Shipping_Cost",
+    "Order_Priority",
+]
+TOTAL_COLUMNS = ["Sales", "Profit", "Shipping_Cost", "Quantity"]
+COUNT_COLUMNS = ["Product_Category", "Product", "Order_Priority"]
+# Values counted per column in a summary
+TOP_VALUES = 10
+# Parts of column names too common to tell whether a query mentions a column
+_GENERIC_NAME_PARTS = {"customer", "order", "type", "id"}
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The tiktoken encoding of LLM_MODEL, or None if it cannot be loaded"""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(LLM_MODEL)
+    except Exception as e:
+        print(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Tokens of `text` for LLM_MODEL, estimated at four characters each"""
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class DataReducer:
+    """
+    Shrinks the processed data of an order query to fit the formatting prompt
+
+    Data within the budget is passed through. Larger lists of orders lose the
+    columns the query does not need and, if still too large, are replaced by
+    a summary: the row count, date range, totals and most frequent values,
+    with as many of the rows, in their requested order, as the budget allows.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = ORDER_FORMAT_TOKEN_BUDGET,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Initialize the reducer
+
+        Args:
+            token_budget: Maximum number of data tokens passed to the LLM
+            count_tokens: Optional token counting function
+        """
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens or _count_tokens
+
+    def tokens(self, data: Any) -> int:
+        """The tokens of `data` as JSON in the prompt"""
+        return self.count_tokens(json.dumps(data, ensure_ascii=False, default=str))
+
+    @staticmethod
+    def _columns(data: list[dict], query: str) -> list[str]:
+        """The default columns, plus those the query mentions"""
+        words = set(re.findall(r"[a-z]+", query.lower()))
+        all_columns = list(dict.fromkeys(itertools.chain.from_iterable(data)))
+        columns = []
+        for column in all_columns:
+            parts = set(column.lower().split("_")) - _GENERIC_NAME_PARTS
+            if column in DEFAULT_COLUMNS or parts & words:
+                columns.append(column)
+        return columns or all_columns
+
+    @staticmethod
+    def _summary(data: list[dict], columns: list[str]) -> dict[str, Any]:
+        summary: dict[str, Any] = {"row_count": len(data)}
+        df = pd.DataFrame(
+            {
+                column: [row.get(column) for row in data]
+                for column in columns
+                if column in ["Order_Date", *TOTAL_COLUMNS, *COUNT_COLUMNS]
+            }
+        )
+        if "Order_Date" in df.columns:
+            dates = pd.to_datetime(df["Order_Date"], errors="coerce").dropna()
+            if len(dates):
+                summary["date_range"] = {
+                    "first": f"{dates.min():%Y-%m-%d}",
+                    "last": f"{dates.max():%Y-%m-%d}",
+                }
+        totals = {}
+        for column in TOTAL_COLUMNS:
+            if column in df.columns:
+                values = pd.to_numeric(df[column], errors="coerce")
+                if values.notna().any():
+                    totals[column] = round(float(values.sum()), 2)
+        if totals:
+            summary["totals"] = totals
+        counts = {}
+        for column in COUNT_COLUMNS:
+            if column in df.columns:
+                top = df[column].astype(str).value_counts().head(TOP_VALUES)
+                counts[column] = {value: int(count) for value, count in top.items()}
+        if counts:
+            summary["counts"] = counts
+        return summary
+
+    def reduce(self, data: Any, query: str = "") -> Any:
+        """
+        Fit the data of an order query in the token budget
+
+        Args:
+            data: The processed data
+            query: The question, whose mentioned columns are kept
+
+        Returns:
+            The data itself, its rows with fewer columns, or a summary
+        """
+        if not isinstance(data, list) or not data:
+            return data
+        if not all(isinstance(row, dict) for row in data):
+            return data
+        # Every row takes at least a token, so long lists are not counted
+        fits = len(data) <= self.token_budget
+        if fits and self.tokens(data) <= self.token_budget:
+            return data
+
+        columns = self._columns(data, query)
+        # Only the rows that can fit are projected
+        records = [
+            {column: row.get(column) for column in columns}
+            for row in (data if fits else data[: self.token_budget])
+        ]
+        if fits and self.tokens(records) <= self.token_budget:
+            return records
+
+        summary = self._summary(data, columns)
+        summary["note"] = (
+            f"Summary of {len(data)} orders; rows lists the first of them "
+            "in the requested order"
+        )
+        # The most rows that fit next to the summary
+        low, high = 0, len(records)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.tokens({**summary, "rows": records[:middle]}) <= self.token_budget:
+                low = middle
+            else:
+                high = middle - 1
+        summary["rows"] = records[:low]
+        return summary
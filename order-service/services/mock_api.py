@@ -1,55 +1,103 @@
-from fastapi import FastAPI
+import copy
+import os
+import secrets
+import threading
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+import numpy as np
 import pandas as pd
 
+from services.order_aggregates import OrderAggregates
+from services.order_index import CustomerIndex
+from services.order_loader import clean_orders, concat_orders, load_orders
+from services.order_pages import RowQuery, encode_records, rows_response
+from services.order_store import SQLiteOrderStore
+
 # Load dataset
 # data\Order_Data_Dataset.csv
-DATASET_PATH = "/app/datasets/Order_Data_Dataset.csv"
-try:
-    df = pd.read_csv(DATASET_PATH)
-except Exception as e:
-    print(f"Error reading dataset: {str(e)}")
-df.dropna(subset=["Product", "Product_Category", "Sales", "Profit"], inplace=True)
-
-# Ensure Sales and Profit are numeric
-df = df[
-    df["Sales"].apply(
-        lambda x: isinstance(x, (int, float)) or str(x).replace(".", "", 1).isdigit()
-    )
-]
-df = df[
-    df["Profit"].apply(
-        lambda x: isinstance(x, (int, float)) or str(x).replace(".", "", 1).isdigit()
-    )
-]
-
-# Convert Sales and Profit to float
-df["Sales"] = df["Sales"].astype(float)
-df["Profit"] = df["Profit"].astype(float)
-
-# Optional: Convert Order_Date to datetime
-df["Order_Date"] = pd.to_datetime(df["Order_Date"], errors="coerce")
-
-# Drop rows with invalid dates
-df.dropna(subset=["Order_Date"], inplace=True)
-
-# Strip and lowercase string columns (optional cleanup)
-for col in [
-    "Product",
-    "Product_Category",
-    "Gender",
-    "Device_Type",
-    "Customer_Login_type",
-    "Order_Priority",
-    "Payment_method",
-]:
-    df[col] = df[col].astype(str).str.strip().str.lower()
+DATASET_PATH = os.getenv("ORDER_DATASET_PATH", "/app/datasets/Order_Data_Dataset.csv")
+
+# Typed Parquet copy of the cleaned dataset, reused while the CSV is unchanged
+CACHE_PATH = os.getenv(
+    "ORDER_CACHE_PATH", os.path.splitext(DATASET_PATH)[0] + ".parquet"
+)
+
+# "pandas" holds the dataset in memory, "sqlite" serves it from ORDER_DB_PATH,
+# created with `python -m services.order_store <csv> <db>`
+BACKEND = os.getenv("ORDER_BACKEND", "pandas")
+DB_PATH = os.getenv("ORDER_DB_PATH", os.path.splitext(DATASET_PATH)[0] + ".db")
+# Token required in X-Admin-Token by POST /data/orders; unset disables writes
+ADMIN_TOKEN = os.getenv("MOCK_API_ADMIN_TOKEN", "")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="E-commerce Dataset API", description="API for querying e-commerce sales data"
 )
 
-# Clean data (e.g., handle NaN values) at the start
-df.fillna(value="", inplace=True)
+
+class Dataset(NamedTuple):
+    """
+    The in-memory orders with their index and aggregates, replaced as a whole
+    by append_orders: a request reads `dataset` once and serves everything
+    from that snapshot
+    """
+
+    index: CustomerIndex
+    aggregates: OrderAggregates
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.index.df
+
+
+store = None
+dataset = None
+if BACKEND == "sqlite":
+    store = SQLiteOrderStore(DB_PATH)
+else:
+    try:
+        df = load_orders(DATASET_PATH, CACHE_PATH)
+    except Exception as e:
+        print(f"Error reading dataset: {str(e)}")
+
+    # Sort by customer and date once, so customer lookups are a slice;
+    # aggregate endpoints are served from running totals
+    index = CustomerIndex(df)
+    dataset = Dataset(index, OrderAggregates(index.df))
+    del df, index
+append_lock = threading.Lock()
+
+
+def aggregates() -> OrderAggregates:
+    return store.aggregates if store is not None else dataset.aggregates
+
+
+def append_orders(orders: pd.DataFrame) -> int:
+    """Clean and add orders to the dataset, returning how many were kept."""
+    global dataset
+    if store is not None:
+        return store.append(orders)
+    with append_lock:
+        current = dataset
+        orders = clean_orders(orders[current.df.columns])
+        totals = copy.deepcopy(current.aggregates)
+        totals.add(orders)
+        # Rebuilt aside and published at once; requests keep the old snapshot
+        dataset = Dataset(CustomerIndex(concat_orders(current.df, orders)), totals)
+    return len(orders)
+
+
+def check_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Writes need MOCK_API_ADMIN_TOKEN, and are disabled without it"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Writes are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
 
 
 # Endpoint to get all data
@@ -60,78 +108,111 @@ def get_status():
 
 
 @app.get("/data")
-def get_all_data():
-    """Retrieve all records in the dataset."""
-    return df.to_dict(orient="records")
+def get_all_data(query: RowQuery = Depends()):
+    """Retrieve all records in the dataset, a page at a time if requested."""
+    if store is not None:
+        return store.all_rows(query)
+    df = dataset.df
+    return rows_response(df, range(len(df)), query)
 
 
 # Endpoint to filter data by Customer ID
 @app.get("/data/customer/{customer_id}")
-def get_customer_data(customer_id: int):
-    """Retrieve all records for a specific Customer ID."""
-    filtered_data = df[df["Customer_Id"] == customer_id]
+def get_customer_data(customer_id: int, query: RowQuery = Depends()):
+    """Retrieve all records for a specific Customer ID, oldest first."""
+    if store is not None:
+        return store.customer_rows(customer_id, query)
+    index = dataset.index
+    positions = index.positions(customer_id)
+    if not len(positions):
+        return {"error": f"No data found for Customer ID {customer_id}"}
+    return rows_response(index.df, positions, query)
+
+
+# Endpoint to get the latest order of a Customer ID
+@app.get("/data/customer/{customer_id}/most-recent")
+def get_customer_most_recent(customer_id: int):
+    """Retrieve the most recent record for a specific Customer ID."""
+    if store is not None:
+        return store.most_recent(customer_id)
+    filtered_data = dataset.index.most_recent(customer_id)
     if filtered_data.empty:
         return {"error": f"No data found for Customer ID {customer_id}"}
-    return filtered_data.to_dict(orient="records")
+    # Encoded like the listings, so missing numbers are served as ""
+    return json_response(("[" + encode_records(filtered_data)[0] + "]").encode())
 
 
 # Endpoint to filter data by Product Category
 @app.get("/data/product-category/{category}")
-def get_product_category_data(category: str):
+def get_product_category_data(category: str, query: RowQuery = Depends()):
     """Retrieve all records for a specific Product Category."""
-    filtered_data = df[
+    if store is not None:
+        return store.category_rows(category, query)
+    df = dataset.df
+    positions = np.flatnonzero(
         df["Product_Category"].str.contains(category, case=False, na=False)
-    ]
-    if filtered_data.empty:
+    )
+    if not len(positions):
         return {"error": f"No data found for Product Category '{category}'"}
-    return filtered_data.to_dict(orient="records")
+    return rows_response(df, positions, query)
 
 
 # Endpoint to get orders with specific priorities
 @app.get("/data/order-priority/{priority}")
-def get_orders_by_priority(priority: str):
+def get_orders_by_priority(priority: str, query: RowQuery = Depends()):
     """Retrieve all orders with the given priority."""
-    filtered_data = df[
+    if store is not None:
+        return store.priority_rows(priority, query)
+    df = dataset.df
+    positions = np.flatnonzero(
         df["Order_Priority"].str.contains(priority, case=False, na=False)
-    ]
-    if filtered_data.empty:
+    )
+    if not len(positions):
         return {"error": f"No data found for Order Priority '{priority}'"}
-    return filtered_data.to_dict(orient="records")
+    return rows_response(df, positions, query)
 
 
 # Endpoint to calculate total sales by Product Category
 @app.get("/data/total-sales-by-category")
 def total_sales_by_category():
     """Calculate total sales by Product Category."""
-    sales_summary = df.groupby("Product_Category")["Sales"].sum().reset_index()
-    return sales_summary.to_dict(orient="records")
+    return json_response(aggregates().json("total_sales_by_category"))
 
 
 # Endpoint to get high-profit products
 @app.get("/data/high-profit-products")
-def high_profit_products(min_profit: float = 100.0):
+def high_profit_products(min_profit: float = 100.0, query: RowQuery = Depends()):
     """Retrieve products with profit greater than the specified value."""
-    filtered_data = df[df["Profit"] > min_profit]
-    if filtered_data.empty:
+    if store is not None:
+        return store.high_profit_rows(min_profit, query)
+    df = dataset.df
+    positions = np.flatnonzero(df["Profit"] > min_profit)
+    if not len(positions):
         return {"error": f"No products found with profit greater than {min_profit}"}
-    return filtered_data.to_dict(orient="records")
+    return rows_response(df, positions, query)
 
 
 # Endpoint to get shipping cost summary
 @app.get("/data/shipping-cost-summary")
 def shipping_cost_summary():
     """Retrieve the average, minimum, and maximum shipping cost."""
-    summary = {
-        "average_shipping_cost": df["Shipping_Cost"].mean(),
-        "min_shipping_cost": df["Shipping_Cost"].min(),
-        "max_shipping_cost": df["Shipping_Cost"].max(),
-    }
-    return summary
+    return json_response(aggregates().json("shipping_cost_summary"))
 
 
 # Endpoint to calculate total profit by Gender
 @app.get("/data/profit-by-gender")
 def profit_by_gender():
     """Calculate total profit by customer gender."""
-    profit_summary = df.groupby("Gender")["Profit"].sum().reset_index()
-    return profit_summary.to_dict(orient="records")
+    return json_response(aggregates().json("profit_by_gender"))
+
+
+# Endpoint to add orders
+@app.post("/data/orders", dependencies=[Depends(check_admin_token)])
+def add_orders(orders: list[dict]):
+    """Append orders to the dataset and update the aggregates."""
+    columns = store.columns if store is not None else dataset.df.columns
+    missing = [col for col in columns if any(col not in order for order in orders)]
+    if missing:
+        return {"error": f"Orders are missing columns: {', '.join(missing)}"}
+    added = append_orders(pd.DataFrame(orders))
+    return {"added": added, "total": len(store if store is not None else dataset.df)}
@@ -1,44 +1,208 @@
-from config import MOCK_API_URL
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
 import httpx
 
+from config import (
+    HTTP_TIMEOUT,
+    MOCK_API_CACHE_MAX_BYTES,
+    MOCK_API_CACHE_SIZE,
+    MOCK_API_CACHE_TTL,
+    MOCK_API_MAX_CONNECTIONS,
+    MOCK_API_URL,
+)
+
+# List endpoints filtering, sorting and limiting their rows on request
+PUSHDOWN_ENDPOINTS = {
+    "/data/customer/{customer_id}",
+    "/data/product-category/{category}",
+    "/data/order-priority/{priority}",
+    "/data/high-profit-products",
+}
+
+
+class ResponseCache:
+    """LRU cache of response bodies that expire after `ttl` seconds"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, body: bytes):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + self.ttl, body)
+        self.bytes += len(body)
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, body = self.entries.pop(key)
+        self.bytes -= len(body)
+
+    def invalidate(self, predicate=None) -> int:
+        """Drop the entries whose key matches `predicate`, or all of them"""
+        keys = [key for key in self.entries if predicate is None or predicate(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+        }
+
 
 class MockAPI:
     """Service that calls the mockapi and returns the responses"""
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, client: Optional[httpx.AsyncClient] = None) -> None:
+        """
+        `client` defaults to a pooled client for MOCK_API_URL, opened by
+        `start` (or the first call) and closed by `close`.
+        """
+        self.client = client
+        self.cache = ResponseCache(
+            MOCK_API_CACHE_SIZE, MOCK_API_CACHE_MAX_BYTES, MOCK_API_CACHE_TTL
+        )
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=MOCK_API_URL,
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=MOCK_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=MOCK_API_MAX_CONNECTIONS,
+                ),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @staticmethod
+    def _path(endpoint, parameters):
+        """The request path for an endpoint and its path parameters"""
+        if "/data/customer/" in endpoint:
+            path = f"/data/customer/{parameters.get('customer_id')}"
+            if endpoint.endswith("/most-recent"):
+                path += "/most-recent"
+            return path
+        if "/data/product-category/" in endpoint:
+            return f"/data/product-category/{parameters.get('category')}"
+        if "/data/order-priority/" in endpoint:
+            return f"/data/order-priority/{parameters.get('priority')}"
+        # For endpoints without path parameters
+        return endpoint
+
+    @staticmethod
+    def _pushdown(endpoint, post_processing) -> dict:
+        """Query parameters applying a plan's post-processing in the mock API"""
+        if not post_processing or endpoint not in PUSHDOWN_ENDPOINTS:
+            return {}
+        params = {}
+        filter_by = post_processing.get("filter_by")
+        if filter_by and len(filter_by) == 3:
+            params["filter_by"] = ",".join(str(value) for value in filter_by)
+        if post_processing.get("sort_by"):
+            params["sort_by"] = post_processing["sort_by"]
+            params["sort_order"] = str(post_processing.get("sort_order", "desc"))
+        limit = post_processing.get("limit")
+        if limit and isinstance(limit, int) and limit > 0:
+            params["limit"] = limit
+        return params
+
+    async def call_mock_api(
+        self, endpoint, parameters, params=None, post_processing=None
+    ):
+        """
+        Call a mock API endpoint
 
-    async def call_mock_api(self, endpoint, parameters):
+        `params` are sent as query parameters, e.g. {"limit": 10,
+        "fields": "Order_Date,Product"} to fetch only the rows and columns
+        needed from the list endpoints. The filter, sort and limit of a plan's
+        `post_processing` are sent along for the list endpoints, so only the
+        final rows are transferred; applying them again locally is a no-op.
+        Successful responses are cached for MOCK_API_CACHE_TTL seconds, so
+        the turns of a conversation about the same customer fetch their
+        orders once.
+        """
         try:
-            async with httpx.AsyncClient() as client:
-                # Construct the URL based on the endpoint and parameters
-                url = f"{MOCK_API_URL}{endpoint}"
-
-                # Handle different endpoint types
-                if "/data/customer/" in endpoint:
-                    url = (
-                        f"{MOCK_API_URL}/data/customer/{parameters.get('customer_id')}"
-                    )
-                elif "/data/product-category/" in endpoint:
-                    url = f"{MOCK_API_URL}/data/product-category/{parameters.get('category')}"
-                elif "/data/order-priority/" in endpoint:
-                    url = f"{MOCK_API_URL}/data/order-priority/{parameters.get('priority')}"
-                else:
-                    # For endpoints without path parameters
-                    url = f"{MOCK_API_URL}{endpoint}"
-                print(url)
-                # Make the API call
-                response = await client.get(url)
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
+            path = self._path(endpoint, parameters or {})
+            params = {**self._pushdown(endpoint, post_processing), **(params or {})}
+            key = (path, tuple(sorted(params.items())))
+            body = self.cache.get(key)
+            if body is None:
+                await self.start()
+                print(f"{MOCK_API_URL}{path}")
+                response = await self.client.get(path, params=params or None)
+                if response.status_code != 200:
                     print(f"Mock API error: {response.status_code} - {response.text}")
                     return None
+                body = response.content
+                self.cache.set(key, body)
+            # Decoded per call, callers may modify the result
+            return json.loads(body)
 
         except Exception as e:
             print(f"Error calling mock API: {str(e)}")
             return None
 
+    def invalidate(self, customer_id=None) -> int:
+        """
+        Drop cached responses: those of one customer, or all of them
+
+        Returns:
+            The number of responses dropped
+        """
+        if customer_id is None:
+            return self.cache.invalidate()
+        prefix = f"/data/customer/{customer_id}"
+        return self.cache.invalidate(
+            lambda key: key[0] == prefix or key[0].startswith(prefix + "/")
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        """Response cache hits, misses and size"""
+        return self.cache.stats()
+
     def get_mockapi_service(self):
         return self
+
+
+@lru_cache(maxsize=1)
+def get_mock_api() -> MockAPI:
+    """The MockAPI client shared by all requests"""
+    return MockAPI()
@@ -0,0 +1,152 @@
+"""
+Aggregates of the orders dataset served by the mock API, maintained incrementally
+"""
+
+import json
+import math
+from collections.abc import Iterable
+
+import pandas as pd
+
+
+def _dumps(value) -> bytes:
+    """Serialize like FastAPI's JSONResponse"""
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _exact_sum(values: Iterable[float]) -> list[float]:
+    """
+    Floats whose sum is exactly that of `values`, largest first
+
+    Each is the correctly rounded remainder left by the previous ones, so
+    summing them with math.fsum gives the correctly rounded total however the
+    values were split up.
+    """
+    values = list(values)
+    partials: list[float] = []
+    while True:
+        remainder = math.fsum(values + [-partial for partial in partials])
+        if remainder == 0 or not math.isfinite(remainder):
+            return partials if remainder == 0 else [remainder]
+        partials.append(remainder)
+
+
+class OrderAggregates:
+    """
+    Running totals behind the aggregate endpoints of the mock API, updated as
+    orders are added and kept serialized, so requests are served without
+    touching the DataFrame
+
+    Sums are kept exact, as lists of partials, so they do not depend on how
+    the orders were split into batches.
+    """
+
+    def __init__(self, df: pd.DataFrame = None):
+        """
+        Initialize the aggregates
+
+        Args:
+            df: Optional cleaned orders to aggregate
+        """
+        self.sales_by_category: dict[str, list[float]] = {}
+        self.profit_by_gender: dict[str, list[float]] = {}
+        self.shipping_count = 0
+        self.shipping_total: list[float] = []
+        self.shipping_min = None
+        self.shipping_max = None
+        self._json: dict[str, bytes] = {}
+        if df is not None:
+            self.add(df)
+        else:
+            self._serialize()
+
+    @staticmethod
+    def _add_sums(totals: dict, groups):
+        for key, values in groups:
+            totals[key] = _exact_sum([*totals.get(key, []), *values.tolist()])
+
+    def add(self, df: pd.DataFrame):
+        """
+        Fold cleaned orders into the aggregates
+
+        Args:
+            df: The added orders
+        """
+        self._add_sums(
+            self.sales_by_category,
+            df.groupby("Product_Category", observed=True)["Sales"],
+        )
+        self._add_sums(
+            self.profit_by_gender, df.groupby("Gender", observed=True)["Profit"]
+        )
+
+        shipping = pd.to_numeric(df["Shipping_Cost"], errors="coerce").dropna()
+        if len(shipping):
+            self.shipping_count += len(shipping)
+            self.shipping_total = _exact_sum([*self.shipping_total, *shipping.tolist()])
+            low, high = float(shipping.min()), float(shipping.max())
+            if self.shipping_min is not None:
+                low = min(low, self.shipping_min)
+                high = max(high, self.shipping_max)
+            self.shipping_min, self.shipping_max = low, high
+        self._serialize()
+
+    def _serialize(self):
+        """Render every aggregate to the JSON body of its endpoint"""
+        self._json = {
+            "total_sales_by_category": _dumps(
+                [
+                    {"Product_Category": category, "Sales": math.fsum(sales)}
+                    for category, sales in sorted(self.sales_by_category.items())
+                ]
+            ),
+            "profit_by_gender": _dumps(
+                [
+                    {"Gender": gender, "Profit": math.fsum(profit)}
+                    for gender, profit in sorted(self.profit_by_gender.items())
+                ]
+            ),
+            "shipping_cost_summary": _dumps(
+                {
+                    "average_shipping_cost": (
+                        math.fsum(self.shipping_total) / self.shipping_count
+                        if self.shipping_count
+                        else None
+                    ),
+                    "min_shipping_cost": self.shipping_min,
+                    "max_shipping_cost": self.shipping_max,
+                }
+            ),
+        }
+
+    def state(self) -> dict:
+        """The running totals, to persist and restore with `from_state`"""
+        return {
+            "sales_by_category": self.sales_by_category,
+            "profit_by_gender": self.profit_by_gender,
+            "shipping_count": self.shipping_count,
+            "shipping_total": self.shipping_total,
+            "shipping_min": self.shipping_min,
+            "shipping_max": self.shipping_max,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "OrderAggregates":
+        aggregates = cls()
+        for name, value in state.items():
+            setattr(aggregates, name, value)
+        # States saved before the sums were kept exact hold plain floats
+        if isinstance(aggregates.shipping_total, float):
+            aggregates.shipping_total = [aggregates.shipping_total]
+        for totals in (aggregates.sales_by_category, aggregates.profit_by_gender):
+            for key, total in totals.items():
+                if isinstance(total, float):
+                    totals[key] = [total]
+        aggregates._serialize()
+        return aggregates
+
+    def json(self, name: str) -> bytes:
+        """The serialized aggregate `name`, e.g. "total_sales_by_category" """
+        return self._json[name]
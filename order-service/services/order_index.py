@@ -0,0 +1,55 @@
+"""
+Customer-keyed index over the orders dataset served by the mock API
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CustomerIndex:
+    """
+    Orders sorted by customer and `Order_Date`, with the row range of every
+    customer, so a customer's orders are one contiguous slice and their most
+    recent order is the last row of it
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Build the index
+
+        Args:
+            df: Orders with `Customer_Id` and `Order_Date` columns
+        """
+        self.df = df.sort_values(
+            ["Customer_Id", "Order_Date"], kind="stable"
+        ).reset_index(drop=True)
+        ids = self.df["Customer_Id"].to_numpy()
+        # Customer ID -> (first row, end row) of their orders
+        self.ranges: dict = {}
+        if len(ids):
+            starts = np.r_[0, np.flatnonzero(ids[1:] != ids[:-1]) + 1]
+            ends = np.r_[starts[1:], len(ids)]
+            self.ranges = dict(
+                zip(ids[starts].tolist(), zip(starts.tolist(), ends.tolist()))
+            )
+
+    def __len__(self) -> int:
+        """Number of customers"""
+        return len(self.ranges)
+
+    def __contains__(self, customer_id) -> bool:
+        return customer_id in self.ranges
+
+    def positions(self, customer_id) -> range:
+        """The row positions of a customer's orders, oldest first"""
+        return range(*self.ranges.get(customer_id, (0, 0)))
+
+    def orders(self, customer_id) -> pd.DataFrame:
+        """All orders of a customer, oldest first; empty if there are none"""
+        positions = self.positions(customer_id)
+        return self.df.iloc[positions.start : positions.stop]
+
+    def most_recent(self, customer_id) -> pd.DataFrame:
+        """The latest order of a customer as a one-row frame; empty if none"""
+        start, end = self.ranges.get(customer_id, (0, 0))
+        return self.df.iloc[max(start, end - 1) : end]
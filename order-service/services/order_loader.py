@@ -0,0 +1,150 @@
+"""
+Loading and cleaning of the orders dataset, with a typed Parquet cache
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+
+REQUIRED_COLUMNS = ["Product", "Product_Category", "Sales", "Profit"]
+# Lowercased string columns, stored as categoricals
+CATEGORICAL_COLUMNS = [
+    "Product",
+    "Product_Category",
+    "Gender",
+    "Device_Type",
+    "Customer_Login_type",
+    "Order_Priority",
+    "Payment_method",
+]
+# Bumped when the cleaning changes, invalidating existing caches
+CACHE_VERSION = 1
+
+
+def _normalize_categorical(column: pd.Series) -> pd.Series:
+    """Strip and lowercase a string column, as a categorical"""
+    codes, uniques = pd.factorize(column.fillna(""))
+    labels = pd.Index(uniques.astype(str)).str.strip().str.lower()
+    # Labels that only differed in case or whitespace become one category
+    label_codes, categories = pd.factorize(labels)
+    return pd.Series(
+        pd.Categorical.from_codes(label_codes[codes], categories),
+        index=column.index,
+        name=column.name,
+    )
+
+
+def clean_orders(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop invalid orders and normalize the columns of the rest."""
+    df = df.dropna(subset=REQUIRED_COLUMNS).copy()
+
+    # Sales and Profit must be numeric
+    df["Sales"] = pd.to_numeric(df["Sales"], errors="coerce").astype(float)
+    df["Profit"] = pd.to_numeric(df["Profit"], errors="coerce").astype(float)
+    df["Order_Date"] = pd.to_datetime(df["Order_Date"], errors="coerce")
+    df.dropna(subset=["Sales", "Profit", "Order_Date"], inplace=True)
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = _normalize_categorical(df[col])
+    # Missing text is served as "", numeric columns keep their dtype
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        df[col] = df[col].fillna("")
+    return df.reset_index(drop=True)
+
+
+def concat_orders(df: pd.DataFrame, orders: pd.DataFrame) -> pd.DataFrame:
+    """Append cleaned orders, keeping the categorical columns categorical"""
+    # Posted numbers may arrive as strings, which would not match on lookup
+    numeric = df.select_dtypes(include="number").columns
+    orders = orders.astype({col: df[col].dtype for col in numeric})
+    combined = pd.concat([df, orders], ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if combined[col].dtype != "category":
+            combined[col] = pd.Categorical(
+                combined[col],
+                categories=df[col].cat.categories.union(
+                    orders[col].cat.categories, sort=False
+                ),
+            )
+    return combined
+
+
+def _source_fingerprint(csv_path: str) -> str:
+    stat = os.stat(csv_path)
+    return json.dumps(
+        {"version": CACHE_VERSION, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+    )
+
+
+def _read_cache(cache_path: str, fingerprint: str):
+    """The cached frame, or None if it is missing or stale"""
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(cache_path):
+        return None
+    metadata = pq.read_schema(cache_path).metadata or {}
+    if metadata.get(b"source", b"").decode() != fingerprint:
+        return None
+    return pq.read_table(cache_path).to_pandas()
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str, fingerprint: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"source": fingerprint.encode()}
+    )
+    # Written aside and renamed, so a crash never leaves a torn cache
+    pq.write_table(table, f"{cache_path}.tmp")
+    os.replace(f"{cache_path}.tmp", cache_path)
+
+
+def load_orders(csv_path: str, cache_path: str = "") -> pd.DataFrame:
+    """
+    Load the cleaned orders dataset
+
+    The first load parses and cleans the CSV and, when `cache_path` is set,
+    writes the result to a Parquet file there. Later loads read that file
+    instead, as long as the CSV has not changed.
+
+    Args:
+        csv_path: The Order_Data_Dataset.csv file
+        cache_path: Optional Parquet cache; requires pyarrow
+
+    Returns:
+        The cleaned orders
+    """
+    start = time.perf_counter()
+    fingerprint = _source_fingerprint(csv_path)
+    if cache_path:
+        try:
+            df = _read_cache(cache_path, fingerprint)
+        except ImportError:
+            print("pyarrow is not installed, the order cache is disabled")
+            cache_path = ""
+            df = None
+        except Exception as e:
+            print(f"Error reading order cache {cache_path}: {str(e)}")
+            df = None
+        if df is not None:
+            print(
+                f"Loaded {len(df)} orders from {cache_path} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+            return df
+
+    df = clean_orders(pd.read_csv(csv_path))
+    print(
+        f"Loaded {len(df)} orders from {csv_path} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    if cache_path:
+        try:
+            _write_cache(df, cache_path, fingerprint)
+        except Exception as e:
+            print(f"Error writing order cache {cache_path}: {str(e)}")
+    return df
@@ -0,0 +1,186 @@
+"""
+Filtering, sorting, pagination, field projection and chunked encoding of mock
+API row listings
+"""
+
+import bisect
+import json
+from datetime import date, datetime
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+# Rows converted and encoded at a time, bounding the memory of a response
+CHUNK_ROWS = 1000
+
+
+# Conditions of `filter_by`, as applied by PostProcessingService
+FILTER_CONDITIONS = {"equals", "contains", "greater_than", "less_than"}
+
+
+class RowQuery:
+    """
+    Filter, sort, paging, projection and format query parameters of the list
+    endpoints
+    """
+
+    def __init__(
+        self,
+        filter_by: Optional[str] = Query(
+            None,
+            description='"field,condition,value", condition one of equals, '
+            "contains, greater_than or less_than",
+        ),
+        sort_by: Optional[str] = Query(None, description="Column to sort by"),
+        sort_order: str = Query("desc", pattern="(?i)^(asc|desc)$"),
+        offset: int = Query(0, ge=0, description="Matching rows to skip"),
+        limit: Optional[int] = Query(None, ge=1, description="Rows to return"),
+        cursor: Optional[int] = Query(
+            None, ge=0, description="X-Next-Cursor of the previous page"
+        ),
+        fields: Optional[str] = Query(
+            None, description="Comma-separated columns to return"
+        ),
+        format: str = Query("json", pattern="^(json|ndjson)$"),
+    ):
+        self.filter_by = filter_by.split(",", 2) if filter_by else []
+        self.sort_by = sort_by
+        self.ascending = sort_order.lower() == "asc"
+        self.offset = offset
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = [field.strip() for field in fields.split(",")] if fields else []
+        self.format = format
+
+
+def _default(value):
+    """Encode the values FastAPI's encoder would, for rows from `to_dict`"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_records(rows: pd.DataFrame) -> list[str]:
+    """The JSON text of every row, with missing values as "" """
+    if rows.isna().to_numpy().any():
+        rows = rows.astype(object).where(rows.notna(), "")
+    return [
+        json.dumps(
+            record,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+        for record in rows.to_dict(orient="records")
+    ]
+
+
+def _stream(
+    df: pd.DataFrame, positions: Sequence[int], columns: list, ndjson: bool
+) -> Iterator[str]:
+    if not ndjson:
+        yield "["
+    for start in range(0, len(positions), CHUNK_ROWS):
+        records = encode_records(
+            df.iloc[positions[start : start + CHUNK_ROWS]][columns]
+        )
+        if ndjson:
+            yield "".join(f"{record}\n" for record in records)
+        else:
+            yield ("," if start else "") + ",".join(records)
+    if not ndjson:
+        yield "]"
+
+
+def _filter(df: pd.DataFrame, positions: Sequence[int], filter_by: list[str]):
+    """The positions of the rows matching `filter_by`"""
+    field, condition, value = filter_by
+    column = df[field].iloc[positions]
+    if condition == "contains":
+        mask = column.astype(str).str.contains(value, case=False, na=False)
+    else:
+        if pd.api.types.is_numeric_dtype(column):
+            value = float(value)
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            value = pd.Timestamp(value)
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(str)
+        if condition == "equals":
+            mask = column == value
+        elif condition == "greater_than":
+            mask = column > value
+        else:
+            mask = column < value
+    return np.asarray(positions)[mask.to_numpy(dtype=bool, na_value=False)]
+
+
+def _sort(df: pd.DataFrame, positions: Sequence[int], sort_by: str, ascending: bool):
+    """The positions reordered by the values of `sort_by`"""
+    column = df[sort_by].iloc[positions]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # By label, as the JSON rows would sort, not by category order
+        column = column.astype(str)
+    order = column.reset_index(drop=True).sort_values(
+        ascending=ascending, kind="stable"
+    )
+    return np.asarray(positions)[order.index.to_numpy()]
+
+
+def rows_response(df: pd.DataFrame, positions: Sequence[int], query: RowQuery):
+    """
+    Stream a page of rows
+
+    Args:
+        df: The dataset
+        positions: Ascending row positions of the matching rows, e.g. a range
+        query: Filter, sort, paging, projection and format parameters
+
+    Returns:
+        A JSON array or NDJSON response of the requested rows and columns,
+        with the number of rows matching the filter in `X-Total-Count` and,
+        when more rows follow, the cursor of the next page in
+        `X-Next-Cursor`; or an error for unknown fields and invalid filters.
+        Like PostProcessingService, filters and sorts on columns the dataset
+        does not have are ignored.
+    """
+    unknown = [field for field in query.fields if field not in df.columns]
+    if unknown:
+        return {"error": f"Unknown fields: {', '.join(unknown)}"}
+    columns = query.fields or list(df.columns)
+
+    if query.filter_by:
+        if len(query.filter_by) != 3 or query.filter_by[1] not in FILTER_CONDITIONS:
+            return {"error": f"Invalid filter: {','.join(query.filter_by)}"}
+        if query.filter_by[0] in df.columns:
+            try:
+                positions = _filter(df, positions, query.filter_by)
+            except (TypeError, ValueError) as e:
+                return {"error": f"Invalid filter: {str(e)}"}
+    sorted_rows = query.sort_by in df.columns
+    if sorted_rows:
+        if query.cursor is not None:
+            return {"error": "cursor cannot be combined with sort_by, use offset"}
+        positions = _sort(df, positions, query.sort_by, query.ascending)
+
+    headers = {"X-Total-Count": str(len(positions))}
+    # The cursor is the row position to continue from
+    start = query.offset
+    if query.cursor is not None:
+        start += bisect.bisect_left(positions, query.cursor)
+    end = len(positions) if query.limit is None else start + query.limit
+    if end < len(positions) and not sorted_rows:
+        headers["X-Next-Cursor"] = str(positions[end])
+    page = positions[start:end]
+
+    ndjson = query.format == "ndjson"
+    return StreamingResponse(
+        _stream(df, page, columns, ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json",
+        headers=headers,
+    )
@@ -7,8 +7,9 @@ from datetime import datetime
 from fastapi import HTTPException
 from .llm_service import LLMService
 from .prompt_helper_service import PromptHelperService
-from .mockapi_service import MockAPI
+from .mockapi_service import get_mock_api
 from .post_processing_service import PostProcessingService
+from .query_planner import get_query_planner
 from .response_formatter_service import ResponseFormatterService
 
 
@@ -21,37 +22,57 @@ class OrderService:
         self.response_formatting_prompt = (
             PromptHelperService().get_response_formatting_prompt()
         )
-        self.mockapi_service = MockAPI()
+        self.mockapi_service = get_mock_api()
+        self.query_planner = get_query_planner()
         self.post_processing_service = PostProcessingService()
         self.response_formatter_service = ResponseFormatterService()
 
-    async def process_order_query(self, customer_id, user_query):
-        try:
+    async def process_order_query(self, customer_id, user_query, formatter=None):
+        """
+        Answer an order query
 
-            analysis_chain = self.order_query_analysis_prompt | self.llm
-            analysis_result = analysis_chain.invoke(
-                {"customer_id": customer_id, "query": user_query}
-            )
-            print(f"Analysis result: {analysis_result.content}")
+        Args:
+            customer_id: The customer asking
+            user_query: The question
+            formatter: "template" or "llm", defaults to ORDER_RESPONSE_FORMATTER
+        """
+        try:
 
-            try:
-                analysis_data = json.loads(analysis_result.content)
-                print(f"Query analysis: {analysis_data}")
-            except json.JSONDecodeError:
-                print("JSON Decording error")
-                return {  # Return dict instead of HTTPException
-                    "response": "Failed to understand your request",
-                    "metadata": {"error": "JSON parsing failed"},
-                }
-            except Exception as e:
-                print(f"Error handling order query: {str(e)}")
-                raise HTTPException(  # RAISE instead of return
-                    status_code=500, detail=f"Error handling order query: {str(e)}"
+            # Common and previously analysed questions skip the LLM
+            analysis_data = self.query_planner.plan(customer_id, user_query)
+            if analysis_data is not None:
+                print(f"Query plan: {analysis_data}")
+            else:
+                analysis_chain = self.order_query_analysis_prompt | self.llm
+                analysis_result = analysis_chain.invoke(
+                    {"customer_id": customer_id, "query": user_query}
                 )
+                print(f"Analysis result: {analysis_result.content}")
+
+                try:
+                    analysis_data = json.loads(analysis_result.content)
+                    print(f"Query analysis: {analysis_data}")
+                except json.JSONDecodeError:
+                    print("JSON Decording error")
+                    return {  # Return dict instead of HTTPException
+                        "response": "Failed to understand your request",
+                        "metadata": {"error": "JSON parsing failed"},
+                    }
+                except Exception as e:
+                    print(f"Error handling order query: {str(e)}")
+                    raise HTTPException(  # RAISE instead of return
+                        status_code=500, detail=f"Error handling order query: {str(e)}"
+                    )
+                self.query_planner.remember(customer_id, user_query, analysis_data)
 
             endpoint = analysis_data.get("endpoint", "")
             parameters = analysis_data.get("parameters", {})
-            api_data = await self.mockapi_service.call_mock_api(endpoint, parameters)
+            # The filter, sort and limit run in the mock API where possible
+            api_data = await self.mockapi_service.call_mock_api(
+                endpoint,
+                parameters,
+                post_processing=analysis_data.get("post_processing", {}),
+            )
             if not api_data or (isinstance(api_data, list) and len(api_data) == 0):
                 return {
                     "response": f"I couldn't find any order information...",
@@ -69,13 +90,15 @@ class OrderService:
                     detail=f"Error occured during post processing: {str(e)}",
                 )
             print(processed_data)
-            # Format the response using the LLM
+            # Format the response from a template or using the LLM
             formatted_response = await self.response_formatter_service.format_response(
                 user_query,
                 customer_id,
                 processed_data,
                 self.response_formatting_prompt,
                 self.llm,
+                query_type=analysis_data.get("query_type", ""),
+                formatter=formatter,
             )
 
             return {
@@ -0,0 +1,462 @@
+"""
+SQLite storage of the orders dataset for the mock API, for datasets larger
+than memory
+
+Usage (import the CSV before starting the mock API with ORDER_BACKEND=sqlite):
+    python -m services.order_store /app/datasets/Order_Data_Dataset.csv \
+        /app/datasets/Order_Data_Dataset.db
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import pandas as pd
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from services.order_aggregates import OrderAggregates
+from services.order_loader import clean_orders
+from services.order_pages import CHUNK_ROWS, FILTER_CONDITIONS, RowQuery
+
+# CSV rows cleaned and inserted at a time by import_orders
+IMPORT_CHUNK_ROWS = 200_000
+# Single-column indexes, besides the (Customer_Id, Order_Date) one
+INDEXED_COLUMNS = ["Order_Priority", "Product_Category"]
+# Columns whose distinct values are stored, so the "contains" lookups of the
+# category and priority endpoints become index lookups of the matching values
+LOOKUP_COLUMNS = ["Product_Category", "Order_Priority"]
+_OPERATORS = {"equals": "=", "greater_than": ">", "less_than": "<"}
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _sql_rows(df: pd.DataFrame) -> list[tuple]:
+    """Cleaned orders as rows of Python values, dates as ISO text"""
+    columns = []
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.map(lambda value: value.isoformat())
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(str)
+        # NaN is stored as NULL
+        columns.append(values.astype(object).where(values.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+def _contains(value, pattern) -> bool:
+    """`str.contains(pattern, case=False)` of the pandas backend, for SQL"""
+    return value is not None and re.search(pattern, str(value), re.I) is not None
+
+
+def import_orders(
+    csv_path: str, db_path: str, chunk_rows: int = IMPORT_CHUNK_ROWS
+) -> int:
+    """
+    Import the orders CSV into a SQLite database
+
+    The CSV is cleaned a chunk at a time, like the pandas backend loads it,
+    and the rows are stored sorted by customer and order date, so they are
+    listed in the order of the pandas backend. The database is written aside
+    and renamed over `db_path` when complete.
+
+    Args:
+        csv_path: The Order_Data_Dataset.csv file
+        db_path: The database to create or replace
+        chunk_rows: CSV rows held in memory at a time
+
+    Returns:
+        The number of orders imported
+    """
+    start = time.perf_counter()
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    con = sqlite3.connect(tmp_path)
+    con.execute("PRAGMA journal_mode=OFF")
+    con.execute("PRAGMA synchronous=OFF")
+    # Unsorted rows go to a temporary database, sorted into the main one
+    con.execute("ATTACH DATABASE '' AS staging")
+
+    aggregates = OrderAggregates()
+    lookup = {column: set() for column in LOOKUP_COLUMNS}
+    columns = None
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        chunk = clean_orders(chunk)
+        if columns is None:
+            columns = list(chunk.columns)
+            schema = ", ".join(
+                f"{_quote(column)} {_sql_type(chunk[column].dtype)}"
+                for column in columns
+            )
+            con.execute(f"CREATE TABLE staging.orders ({schema})")
+            con.execute(f"CREATE TABLE main.orders ({schema})")
+        chunk = chunk[columns]
+        con.executemany(
+            f"INSERT INTO staging.orders VALUES ({', '.join('?' * len(columns))})",
+            _sql_rows(chunk),
+        )
+        aggregates.add(chunk)
+        for column in LOOKUP_COLUMNS:
+            lookup[column].update(chunk[column].astype(str))
+    if columns is None:
+        raise ValueError(f"No orders in {csv_path}")
+
+    con.execute(
+        "INSERT INTO main.orders SELECT * FROM staging.orders "
+        "ORDER BY Customer_Id, Order_Date, rowid"
+    )
+    con.commit()
+    con.execute("DETACH DATABASE staging")
+    con.execute("CREATE INDEX orders_customer ON orders (Customer_Id, Order_Date)")
+    for column in INDEXED_COLUMNS:
+        con.execute(
+            f"CREATE INDEX orders_{column.lower()} ON orders ({_quote(column)})"
+        )
+    con.execute(
+        "CREATE TABLE lookup (name TEXT, value TEXT, PRIMARY KEY (name, value))"
+    )
+    con.executemany(
+        "INSERT INTO lookup VALUES (?, ?)",
+        [(column, value) for column, values in lookup.items() for value in values],
+    )
+    # Statistics, so lookups by customer do not pick the priority index
+    con.execute("ANALYZE")
+    con.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+    con.execute(
+        "INSERT INTO meta VALUES ('aggregates', ?)", (json.dumps(aggregates.state()),)
+    )
+    con.commit()
+    (count,) = con.execute("SELECT COUNT(*) FROM orders").fetchone()
+    con.close()
+    os.replace(tmp_path, db_path)
+    print(
+        f"Imported {count} orders from {csv_path} into {db_path} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return count
+
+
+def _encode(columns: list[str], rows: list[tuple]) -> list[str]:
+    """The JSON text of every row, as the pandas backend encodes it"""
+    return [
+        json.dumps(
+            {
+                column: "" if value is None else value
+                for column, value in zip(columns, row)
+            },
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+        for row in rows
+    ]
+
+
+class SQLiteOrderStore:
+    """
+    The mock API endpoints served from a database created by import_orders
+
+    Responses have the same bodies as the pandas backend. Rows are identified
+    by their rowid, so `cursor`/`X-Next-Cursor` are positions in the
+    imported order; customer listings are ordered by date and page by offset.
+    Appended orders get the next rowids: they come last in the unfiltered
+    and endpoint listings, where the pandas backend sorts them in by customer
+    and date. Customer listings and aggregates still match.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open the store
+
+        Args:
+            db_path: A database created by import_orders
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(
+                f"{db_path} not found, import the orders with "
+                "`python -m services.order_store <csv> <db>`"
+            )
+        self.db_path = db_path
+        self.write_lock = threading.Lock()
+        con = self._connect()
+        try:
+            info = con.execute("PRAGMA table_info(orders)").fetchall()
+            self.columns = [row[1] for row in info]
+            self.types = {row[1]: row[2] for row in info}
+            self.lookup = {column: [] for column in LOOKUP_COLUMNS}
+            for column, value in con.execute("SELECT name, value FROM lookup"):
+                self.lookup[column].append(value)
+            (state,) = con.execute(
+                "SELECT value FROM meta WHERE name = 'aggregates'"
+            ).fetchone()
+        finally:
+            con.close()
+        self.aggregates = OrderAggregates.from_state(json.loads(state))
+
+    def _connect(self) -> sqlite3.Connection:
+        # Responses are streamed from worker threads, one connection each
+        con = sqlite3.connect(self.db_path, check_same_thread=False)
+        con.create_function("contains", 2, _contains, deterministic=True)
+        return con
+
+    def __len__(self) -> int:
+        con = self._connect()
+        try:
+            return con.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+        finally:
+            con.close()
+
+    def _filter(self, filter_by: list[str]) -> tuple[str, list]:
+        """The SQL condition of `filter_by`, as the pandas backend applies it"""
+        field, condition, value = filter_by
+        if condition == "contains":
+            return f"contains({_quote(field)}, ?)", [value]
+        if self.types[field] in ("INTEGER", "REAL"):
+            value = float(value)
+        elif field == "Order_Date":
+            value = pd.Timestamp(value).isoformat()
+        return f"{_quote(field)} {_OPERATORS[condition]} ?", [value]
+
+    def _stream(self, con, sql: str, args: list, columns: list, ndjson: bool):
+        try:
+            rows = con.execute(sql, args)
+            if not ndjson:
+                yield "["
+            first = True
+            while True:
+                chunk = rows.fetchmany(CHUNK_ROWS)
+                if not chunk:
+                    break
+                records = _encode(columns, chunk)
+                if ndjson:
+                    yield "".join(f"{record}\n" for record in records)
+                else:
+                    yield ("" if first else ",") + ",".join(records)
+                first = False
+            if not ndjson:
+                yield "]"
+        finally:
+            con.close()
+
+    def _listing(self, con, where: str, args: list, query: RowQuery, order: str):
+        """
+        The SQL of a listing page and its headers, or an error
+
+        Returns:
+            (error, None, None, None) or (None, select, args, headers)
+        """
+        unknown = [field for field in query.fields if field not in self.columns]
+        if unknown:
+            return {"error": f"Unknown fields: {', '.join(unknown)}"}, None, None, None
+        columns = query.fields or self.columns
+
+        args = list(args)
+        if query.filter_by:
+            if len(query.filter_by) != 3 or query.filter_by[1] not in FILTER_CONDITIONS:
+                error = {"error": f"Invalid filter: {','.join(query.filter_by)}"}
+                return error, None, None, None
+            if query.filter_by[0] in self.columns:
+                try:
+                    condition, filter_args = self._filter(query.filter_by)
+                except (TypeError, ValueError) as e:
+                    return {"error": f"Invalid filter: {str(e)}"}, None, None, None
+                where = f"({where}) AND {condition}"
+                args += filter_args
+        sorted_rows = query.sort_by in self.columns
+        if sorted_rows:
+            if query.cursor is not None:
+                error = {"error": "cursor cannot be combined with sort_by, use offset"}
+                return error, None, None, None
+            # Missing values last, ties in listing order, as pandas sorts
+            column = _quote(query.sort_by)
+            direction = "ASC" if query.ascending else "DESC"
+            order = f"{column} IS NULL, {column} {direction}, {order}"
+        elif query.cursor is not None and order != "rowid":
+            error = {"error": "cursor is not supported here, use offset"}
+            return error, None, None, None
+
+        (total,) = con.execute(
+            f"SELECT COUNT(*) FROM orders WHERE {where}", args
+        ).fetchone()
+        headers = {"X-Total-Count": str(total)}
+        # The cursor is the row position (rowid - 1) to continue from
+        if query.cursor is not None:
+            where = f"({where}) AND rowid > ?"
+            args.append(query.cursor)
+        if query.limit is not None and order == "rowid":
+            following = con.execute(
+                f"SELECT rowid FROM orders WHERE {where} ORDER BY rowid "
+                "LIMIT 1 OFFSET ?",
+                [*args, query.offset + query.limit],
+            ).fetchone()
+            if following is not None:
+                headers["X-Next-Cursor"] = str(following[0] - 1)
+
+        select = (
+            f"SELECT {', '.join(_quote(column) for column in columns)} FROM orders "
+            f"WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        limit = -1 if query.limit is None else query.limit
+        return None, select, [*args, limit, query.offset], (columns, headers)
+
+    def rows(
+        self,
+        where: str,
+        args: list,
+        query: RowQuery,
+        error: Optional[dict],
+        order: str = "rowid",
+    ):
+        """
+        Stream a page of the rows matching `where`, like rows_response
+
+        Args:
+            where: SQL condition of the endpoint
+            args: Its parameters
+            query: Filter, sort, paging, projection and format parameters
+            error: Returned when no row matches `where`, if set
+            order: Order of the listing; cursors need the rowid order
+        """
+        con = self._connect()
+        try:
+            exists = f"SELECT EXISTS (SELECT 1 FROM orders WHERE {where})"
+            if error is None or con.execute(exists, args).fetchone()[0]:
+                error, select, args, page = self._listing(
+                    con, where, args, query, order
+                )
+        except Exception:
+            con.close()
+            raise
+        if error is not None:
+            con.close()
+            return error
+
+        columns, headers = page
+        ndjson = query.format == "ndjson"
+        # The connection is closed by the stream
+        return StreamingResponse(
+            self._stream(con, select, args, columns, ndjson),
+            media_type="application/x-ndjson" if ndjson else "application/json",
+            headers=headers,
+        )
+
+    def _in_lookup(self, column: str, pattern: str) -> tuple[str, list]:
+        """SQL condition matching `column` values that contain `pattern`"""
+        values = [value for value in self.lookup[column] if _contains(value, pattern)]
+        if not values:
+            return "0", []
+        return f"{_quote(column)} IN ({', '.join('?' * len(values))})", values
+
+    def all_rows(self, query: RowQuery):
+        return self.rows("1", [], query, None)
+
+    def customer_rows(self, customer_id: int, query: RowQuery):
+        return self.rows(
+            "Customer_Id = ?",
+            [customer_id],
+            query,
+            {"error": f"No data found for Customer ID {customer_id}"},
+            order="Order_Date, rowid",
+        )
+
+    def most_recent(self, customer_id: int):
+        con = self._connect()
+        try:
+            row = con.execute(
+                "SELECT * FROM orders WHERE Customer_Id = ? "
+                "ORDER BY Order_Date DESC, rowid DESC LIMIT 1",
+                [customer_id],
+            ).fetchone()
+        finally:
+            con.close()
+        if row is None:
+            return {"error": f"No data found for Customer ID {customer_id}"}
+        body = "[" + _encode(self.columns, [row])[0] + "]"
+        return Response(content=body.encode("utf-8"), media_type="application/json")
+
+    def category_rows(self, category: str, query: RowQuery):
+        where, args = self._in_lookup("Product_Category", category)
+        return self.rows(
+            where,
+            args,
+            query,
+            {"error": f"No data found for Product Category '{category}'"},
+        )
+
+    def priority_rows(self, priority: str, query: RowQuery):
+        where, args = self._in_lookup("Order_Priority", priority)
+        return self.rows(
+            where,
+            args,
+            query,
+            {"error": f"No data found for Order Priority '{priority}'"},
+        )
+
+    def high_profit_rows(self, min_profit: float, query: RowQuery):
+        return self.rows(
+            "Profit > ?",
+            [min_profit],
+            query,
+            {"error": f"No products found with profit greater than {min_profit}"},
+        )
+
+    def append(self, orders: pd.DataFrame) -> int:
+        """Clean and add orders, returning how many were kept."""
+        orders = clean_orders(orders[self.columns])
+        with self.write_lock:
+            con = self._connect()
+            try:
+                con.executemany(
+                    f"INSERT INTO orders VALUES "
+                    f"({', '.join('?' * len(self.columns))})",
+                    _sql_rows(orders),
+                )
+                # The new state is only published once it is committed
+                aggregates = copy.deepcopy(self.aggregates)
+                aggregates.add(orders)
+                lookup = {}
+                for column, values in self.lookup.items():
+                    new = set(orders[column].astype(str)) - set(values)
+                    con.executemany(
+                        "INSERT INTO lookup VALUES (?, ?)",
+                        [(column, value) for value in new],
+                    )
+                    lookup[column] = values + sorted(new)
+                con.execute(
+                    "UPDATE meta SET value = ? WHERE name = 'aggregates'",
+                    (json.dumps(aggregates.state()),),
+                )
+                con.commit()
+            finally:
+                con.close()
+            self.aggregates, self.lookup = aggregates, lookup
+        return len(orders)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import the orders CSV into a SQLite database for the mock API"
+    )
+    parser.add_argument("csv_path")
+    parser.add_argument("db_path")
+    parser.add_argument("--chunk-rows", type=int, default=IMPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+    import_orders(args.csv_path, args.db_path, args.chunk_rows)
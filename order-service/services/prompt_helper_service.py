@@ -13,13 +13,14 @@ class PromptHelperService:
             Your task is to analyze customer queries about their orders and determine which API endpoint to call.
 
             Available API endpoints:
-            1. /data/customer/{{customer_id}} - Get all orders for a specific customer
-            2. /data/product-category/{{category}} - Get all orders for a specific product category
-            3. /data/order-priority/{{priority}} - Get orders with a specific priority (Low, Medium, High, Critical)
-            4. /data/total-sales-by-category - Get total sales by product category
-            5. /data/high-profit-products - Get high-profit products (default threshold: $100)
-            6. /data/shipping-cost-summary - Get shipping cost statistics
-            7. /data/profit-by-gender - Get total profit by customer gender
+            1. /data/customer/{{customer_id}} - Get all orders for a specific customer, oldest first
+            2. /data/customer/{{customer_id}}/most-recent - Get the most recent order of a specific customer
+            3. /data/product-category/{{category}} - Get all orders for a specific product category
+            4. /data/order-priority/{{priority}} - Get orders with a specific priority (Low, Medium, High, Critical)
+            5. /data/total-sales-by-category - Get total sales by product category
+            6. /data/high-profit-products - Get high-profit products (default threshold: $100)
+            7. /data/shipping-cost-summary - Get shipping cost statistics
+            8. /data/profit-by-gender - Get total profit by customer gender
 
             Analyze the query to determine:
             1. Which API endpoint to call
@@ -0,0 +1,227 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from config import QUERY_PLAN_CACHE_SIZE
+
+# Endpoints a plan may call, as listed in the order query analysis prompt
+ENDPOINTS = {
+    "/data/customer/{customer_id}",
+    "/data/customer/{customer_id}/most-recent",
+    "/data/product-category/{category}",
+    "/data/order-priority/{priority}",
+    "/data/total-sales-by-category",
+    "/data/high-profit-products",
+    "/data/shipping-cost-summary",
+    "/data/profit-by-gender",
+}
+
+_PERSONAL = re.compile(r"\b(my|mine|i|me|i've|i'm|customer|customers)\b")
+
+
+def _intent(pattern: str) -> re.Pattern:
+    """A whole question, with optional politeness around `pattern`"""
+    return re.compile(rf"(?:please |(?:can|could) you )?(?:{pattern})(?: please)?")
+
+
+# Whole questions the rules answer; anything else (totals, counts, payment,
+# delivery, products, dates...) goes to the LLM
+_MOST_RECENT = _intent(
+    r"(?:(?:what|which) (?:was|is) |what's |show (?:me )?|get (?:me )?|see |view )?"
+    r"my (?:last|latest|most recent|newest) (?:order|purchase)"
+)
+_ALL_ORDERS = _intent(
+    r"(?:(?:show|list|get|give|see|view)(?: me)? (?:all )?(?:of )?"
+    r"|(?:what|which) (?:are|were) (?:all )?)?"
+    r"my (?:(?:recent |past |previous )?(?:orders|purchases)"
+    r"|(?:order|purchase) history)"
+)
+_PRIORITY_ORDERS = _intent(
+    r"(?:(?:show|list)(?: me)? |any |are there (?:any )?"
+    r"|(?P<have>do i have )(?:any )?|(?:what|which) are )?"
+    r"(?:all )?(?:(?P<my>my )|the )?"
+    r"(?P<priority>low|medium|high|critical)[- ]priority (?:orders|purchases)"
+)
+
+
+def _customer_plan(customer_id, query_type: str, most_recent: bool = False):
+    endpoint = "/data/customer/{customer_id}"
+    if most_recent:
+        endpoint += "/most-recent"
+    return {
+        "endpoint": endpoint,
+        "parameters": {"customer_id": customer_id},
+        "post_processing": {},
+        "query_type": query_type,
+    }
+
+
+def _aggregate_plan(endpoint: str, query_type: str = "aggregate"):
+    return {
+        "endpoint": endpoint,
+        "parameters": {},
+        "post_processing": {},
+        "query_type": query_type,
+    }
+
+
+def _normalize(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s'-]", " ", query.lower()).split())
+
+
+def query_intent(query: str) -> Optional[str]:
+    """The query type of a common question the rules plan, or None"""
+    plan = QueryPlanner._rule_plan(None, _normalize(query))
+    return plan["query_type"] if plan else None
+
+
+class QueryPlanner:
+    """
+    Produces the order query analysis plan without the LLM where possible
+
+    Common questions, asked plainly ("show my last order", "list my orders",
+    "any high priority orders?", "sales by category", "shipping costs"), are
+    mapped to plans by rules. Plans the LLM produced for other questions are
+    cached under the question's template, with the customer ID and numbers as
+    placeholders, so the same question from any customer is only analysed once.
+    """
+
+    def __init__(self, cache_size: int = QUERY_PLAN_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.plans: OrderedDict[str, dict] = OrderedDict()
+        self.rule_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _rule_plan(customer_id, query: str) -> Optional[dict]:
+        """The plan of a common question, or None"""
+        personal = _PERSONAL.search(query)
+        # Aggregates over all orders, unless asked about the customer's own
+        if not personal:
+            if re.search(r"\bshipping (?:costs?|fees?|charges?)\b", query):
+                return _aggregate_plan("/data/shipping-cost-summary")
+            if re.search(
+                r"\bsales\b.*\b(?:by|per|each|every) (?:product )?categor", query
+            ):
+                return _aggregate_plan("/data/total-sales-by-category")
+            if re.search(r"\bprofit\b.*\b(?:by|per) gender\b", query):
+                return _aggregate_plan("/data/profit-by-gender")
+
+        priority = _PRIORITY_ORDERS.fullmatch(query)
+        if priority:
+            if priority["have"] or priority["my"]:
+                plan = _customer_plan(customer_id, "priority_orders")
+                plan["post_processing"] = {
+                    "filter_by": ["Order_Priority", "equals", priority["priority"]]
+                }
+                return plan
+            return {
+                "endpoint": "/data/order-priority/{priority}",
+                "parameters": {"priority": priority["priority"]},
+                "post_processing": {},
+                "query_type": "priority_orders",
+            }
+        if _MOST_RECENT.fullmatch(query):
+            return _customer_plan(customer_id, "most_recent", most_recent=True)
+        if _ALL_ORDERS.fullmatch(query):
+            return _customer_plan(customer_id, "all_orders")
+        return None
+
+    @staticmethod
+    def _template(customer_id, query: str) -> tuple[str, list[str]]:
+        """The query with the customer ID and numbers as placeholders"""
+        if customer_id is not None:
+            query = re.sub(
+                rf"\b{re.escape(str(customer_id))}\b", "<customer_id>", query
+            )
+        numbers = re.findall(r"\d+(?:\.\d+)?", query)
+        return re.sub(r"\d+(?:\.\d+)?", "<number>", query), numbers
+
+    @staticmethod
+    def _to_slots(value: Any, slots: dict[str, str]) -> Any:
+        """Replace plan values taken from the query by typed placeholders"""
+        if isinstance(value, dict):
+            return {k: QueryPlanner._to_slots(v, slots) for k, v in value.items()}
+        if isinstance(value, list):
+            return [QueryPlanner._to_slots(v, slots) for v in value]
+        if isinstance(value, (str, int, float)) and str(value) in slots:
+            return f"<{slots[str(value)]}:{type(value).__name__}>"
+        return value
+
+    @staticmethod
+    def _from_slots(value: Any, values: dict[str, str]) -> Any:
+        """Fill the placeholders of a cached plan with this query's values"""
+        if isinstance(value, dict):
+            return {k: QueryPlanner._from_slots(v, values) for k, v in value.items()}
+        if isinstance(value, list):
+            return [QueryPlanner._from_slots(v, values) for v in value]
+        slot = (
+            re.fullmatch(r"<(\w+):(int|float|str)>", value)
+            if isinstance(value, str)
+            else None
+        )
+        if slot and slot.group(1) in values:
+            cast = {"int": int, "float": float, "str": str}[slot.group(2)]
+            return cast(values[slot.group(1)])
+        return value
+
+    def plan(self, customer_id, query: str) -> Optional[dict]:
+        """
+        Plan a query from the rules or the cache
+
+        Args:
+            customer_id: The customer asking
+            query: The question
+
+        Returns:
+            A plan like the analysis LLM returns, or None if the LLM is needed
+        """
+        normalized = _normalize(query)
+        plan = self._rule_plan(customer_id, normalized)
+        if plan is not None:
+            self.rule_hits += 1
+            return plan
+
+        template, numbers = self._template(customer_id, normalized)
+        cached = self.plans.get(template)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.plans.move_to_end(template)
+        self.cache_hits += 1
+        values = {f"number{i}": number for i, number in enumerate(numbers)}
+        values["customer_id"] = str(customer_id)
+        return self._from_slots(cached, values)
+
+    def remember(self, customer_id, query: str, plan: dict):
+        """Cache a plan the LLM produced for `query`"""
+        if self.cache_size <= 0 or plan.get("endpoint") not in ENDPOINTS:
+            return
+        template, numbers = self._template(customer_id, _normalize(query))
+        # Values taken from the query become placeholders
+        slots = {number: f"number{i}" for i, number in enumerate(numbers)}
+        if customer_id is not None:
+            slots[str(customer_id)] = "customer_id"
+        self.plans[template] = self._to_slots(plan, slots)
+        self.plans.move_to_end(template)
+        while len(self.plans) > self.cache_size:
+            self.plans.popitem(last=False)
+
+    def metrics(self) -> dict[str, Any]:
+        """How often queries were planned without the LLM"""
+        total = self.rule_hits + self.cache_hits + self.misses
+        return {
+            "rule_hits": self.rule_hits,
+            "cache_hits": self.cache_hits,
+            "llm_calls": self.misses,
+            "hit_rate": (self.rule_hits + self.cache_hits) / total if total else 0.0,
+            "cached_plans": len(self.plans),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_query_planner() -> QueryPlanner:
+    """The query planner shared by all requests"""
+    return QueryPlanner()
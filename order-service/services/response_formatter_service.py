@@ -1,12 +1,135 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 import json
 import numpy as np
+import pandas as pd
+
+from config import ORDER_RESPONSE_FORMATTER
+from .data_reducer import DataReducer
+from .query_planner import query_intent
+
+# Orders listed by the order list template, the rest are counted
+MAX_LISTED_ORDERS = 10
+
+
+def format_date(value) -> str:
+    """A date as "Month Day, Year", or as given if it is not a date"""
+    if isinstance(value, datetime):
+        date = value
+    else:
+        try:
+            date = datetime.fromisoformat(str(value))
+        except ValueError:
+            return str(value)
+    return f"{date:%B} {date.day}, {date.year}"
+
+
+def format_money(value) -> str:
+    """An amount as currency, e.g. "$1,234.50" """
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return f"-${-amount:,.2f}" if amount < 0 else f"${amount:,.2f}"
+
+
+def _order_summary(order: dict) -> str:
+    """The product, category and amount of an order, from the fields it has"""
+    summary = str(order.get("Product") or "an order")
+    if order.get("Product_Category"):
+        summary += f" ({order['Product_Category']})"
+    if order.get("Sales") not in (None, ""):
+        summary += f" for {format_money(order['Sales'])}"
+    return summary
 
 
 class ResponseFormatterService:
     def __init__(self) -> None:
-        pass
+        # Templates per query type, rendering the answer without the LLM
+        self.templates = {
+            "most_recent": self._most_recent_template,
+            "all_orders": self._order_list_template,
+            "priority_orders": self._order_list_template,
+            "aggregate": self._aggregate_template,
+        }
+        self.data_reducer = DataReducer()
+
+    def _most_recent_template(self, data: Any) -> Optional[str]:
+        if isinstance(data, list) and len(data) == 1:
+            data = data[0]
+        if not isinstance(data, dict) or "Order_Date" not in data:
+            return None
+        response = (
+            f"Your most recent order was placed on {format_date(data['Order_Date'])}: "
+            f"{_order_summary(data)}."
+        )
+        details = []
+        if data.get("Quantity") not in (None, ""):
+            details.append(f"Quantity: {int(float(data['Quantity']))}")
+        if data.get("Shipping_Cost") not in (None, ""):
+            details.append(f"Shipping: {format_money(data['Shipping_Cost'])}")
+        if data.get("Order_Priority"):
+            details.append(f"Priority: {data['Order_Priority']}")
+        if details:
+            response += " " + ", ".join(details) + "."
+        return response
+
+    def _order_list_template(self, data: Any) -> Optional[str]:
+        if not isinstance(data, list) or not data:
+            return None
+        if not all(isinstance(order, dict) and "Order_Date" in order for order in data):
+            return None
+        count = len(data)
+        lines = [f"I found {count} order{'s' if count != 1 else ''}:"]
+        lines += [
+            f"- {format_date(order['Order_Date'])}: {_order_summary(order)}"
+            for order in data[:MAX_LISTED_ORDERS]
+        ]
+        if count > MAX_LISTED_ORDERS:
+            lines.append(f"...and {count - MAX_LISTED_ORDERS} more.")
+        return "\n".join(lines)
+
+    def _aggregate_template(self, data: Any) -> Optional[str]:
+        if isinstance(data, dict) and "average_shipping_cost" in data:
+            if data["average_shipping_cost"] is None:
+                return None
+            average = format_money(data["average_shipping_cost"])
+            return (
+                f"Shipping costs average {average}, "
+                f"ranging from {format_money(data.get('min_shipping_cost'))} "
+                f"to {format_money(data.get('max_shipping_cost'))}."
+            )
+        if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+            return None
+        for key, value, title in [
+            ("Product_Category", "Sales", "Total sales by category"),
+            ("Gender", "Profit", "Total profit by gender"),
+        ]:
+            if set(data[0]) == {key, value}:
+                lines = [f"{title}:"]
+                lines += [
+                    f"- {row[key]}: {format_money(row[value])}"
+                    for row in data
+                    if key in row and value in row
+                ]
+                return "\n".join(lines)
+        return None
+
+    def format_template(self, query_type: str, data: Any) -> Optional[str]:
+        """
+        Render the answer from the template of `query_type`
+
+        Returns:
+            The response, or None if no template fits the query type and data
+        """
+        template = self.templates.get(query_type)
+        if template is None:
+            return None
+        try:
+            return template(data)
+        except Exception as e:
+            print(f"Error rendering {query_type} template: {str(e)}")
+            return None
 
     async def format_response(
         self,
@@ -15,10 +138,23 @@ class ResponseFormatterService:
         data: Any,
         response_formatting_prompt: Any,
         llm: Any,
+        query_type: str = "",
+        formatter: Optional[str] = None,
     ) -> str:
         """
         Format the API response data into a user-friendly message
+
+        With the "template" formatter (ORDER_RESPONSE_FORMATTER by default),
+        plain common questions whose intent matches the query type are
+        rendered from templates and the rest by the LLM; the "llm" formatter
+        always uses the LLM.
         """
+        if (formatter or ORDER_RESPONSE_FORMATTER) == "template" and (
+            query_intent(query) == query_type
+        ):
+            response = self.format_template(query_type, data)
+            if response is not None:
+                return response
         try:
             # Custom JSON encoder to handle various data types
             class CustomJSONEncoder(json.JSONEncoder):
@@ -42,8 +178,12 @@ class ResponseFormatterService:
                     # Let the base class default method handle other types
                     return super().default(obj)
 
-            # Serialize the data to JSON with custom encoder
-            json_data = json.dumps(data, cls=CustomJSONEncoder, ensure_ascii=False)
+            # Serialize the data, reduced to the token budget, with custom encoder
+            json_data = json.dumps(
+                self.data_reducer.reduce(data, query),
+                cls=CustomJSONEncoder,
+                ensure_ascii=False,
+            )
 
             # Use LLM to format the response
             formatting_chain = response_formatting_prompt | llm
@@ -60,9 +200,7 @@ class ResponseFormatterService:
                     item = data[0]
                     details = []
                     if "Order_Date" in item:
-                        details.append(
-                            f"ordered on {datetime.strptime(item['Order_Date'], '%Y-%m-%d').strftime('%B %d, %Y')}"
-                        )
+                        details.append(f"ordered on {format_date(item['Order_Date'])}")
                     if "Product_Category" in item:
                         details.append(f"category: {item['Product_Category']}")
                     if "Sales" in item:
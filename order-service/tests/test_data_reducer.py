@@ -0,0 +1,52 @@
+from services.data_reducer import DataReducer
+
+
+def orders(count):
+    return [
+        {
+            "Order_Date": f"2018-01-{day % 28 + 1:02d}T00:00:00",
+            "Customer_Id": 37077,
+            "Product": "mouse" if day % 2 else "tyre",
+            "Product_Category": "electronic",
+            "Sales": 10.0,
+            "Payment_method": "e_wallet",
+            "Device_Type": "web",
+        }
+        for day in range(count)
+    ]
+
+
+def test_small_data_is_passed_through():
+    reducer = DataReducer(token_budget=2000, count_tokens=len)
+    data = orders(3)
+    assert reducer.reduce(data) is data
+    assert reducer.reduce({"average_shipping_cost": 7.5}) == {
+        "average_shipping_cost": 7.5
+    }
+
+
+def test_unneeded_columns_are_dropped_first():
+    reducer = DataReducer(token_budget=1200, count_tokens=len)
+    reduced = reducer.reduce(orders(8), "Which payment method did I use?")
+    assert len(reduced) == 8
+    assert list(reduced[0]) == [
+        "Order_Date",
+        "Product",
+        "Product_Category",
+        "Sales",
+        "Payment_method",
+    ]
+
+
+def test_large_data_is_summarized_within_the_budget():
+    reducer = DataReducer(token_budget=1500, count_tokens=len)
+    data = orders(500)
+    reduced = reducer.reduce(data, "Show me all my orders")
+
+    assert reducer.tokens(reduced) <= 1500
+    assert reduced["row_count"] == 500
+    assert reduced["date_range"] == {"first": "2018-01-01", "last": "2018-01-28"}
+    assert reduced["totals"] == {"Sales": 5000.0}
+    assert reduced["counts"]["Product"] == {"tyre": 250, "mouse": 250}
+    assert 0 < len(reduced["rows"]) < 500
+    assert reduced["rows"][0]["Order_Date"] == data[0]["Order_Date"]
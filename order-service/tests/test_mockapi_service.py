@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+
+from services.mockapi_service import MockAPI
+
+
+def make_mock_api(requests):
+    def handler(request):
+        requests.append(str(request.url))
+        if request.url.path == "/data/customer/404":
+            return httpx.Response(404, text="not found")
+        return httpx.Response(200, json=[{"Customer_Id": 7, "Product": "tyre"}])
+
+    client = httpx.AsyncClient(
+        base_url="http://mock-api", transport=httpx.MockTransport(handler)
+    )
+    return MockAPI(client=client)
+
+
+def test_responses_are_cached_per_endpoint_and_parameters():
+    requests = []
+    mock_api = make_mock_api(requests)
+    customer = ("/data/customer/{customer_id}", {"customer_id": 7})
+
+    async def run():
+        first = await mock_api.call_mock_api(*customer)
+        first[0]["Product"] = "changed by post-processing"
+        second = await mock_api.call_mock_api(*customer)
+        await mock_api.call_mock_api(*customer, params={"limit": 1})
+        await mock_api.call_mock_api(
+            *customer,
+            post_processing={
+                "filter_by": ["Order_Priority", "equals", "high"],
+                "sort_by": "Sales",
+                "limit": 2,
+            },
+        )
+        await mock_api.call_mock_api(
+            "/data/customer/{customer_id}", {"customer_id": 404}
+        )
+        await mock_api.call_mock_api(
+            "/data/customer/{customer_id}", {"customer_id": 404}
+        )
+        assert mock_api.invalidate(customer_id=7) == 3
+        await mock_api.call_mock_api(*customer)
+        await mock_api.close()
+        return second
+
+    second = asyncio.run(run())
+
+    assert second == [{"Customer_Id": 7, "Product": "tyre"}]
+    assert requests == [
+        "http://mock-api/data/customer/7",
+        "http://mock-api/data/customer/7?limit=1",
+        "http://mock-api/data/customer/7?filter_by=Order_Priority%2Cequals%2Chigh"
+        "&sort_by=Sales&sort_order=desc&limit=2",
+        "http://mock-api/data/customer/404",
+        "http://mock-api/data/customer/404",
+        "http://mock-api/data/customer/7",
+    ]
+    metrics = mock_api.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (1, 6, 1)
@@ -0,0 +1,56 @@
+import json
+import math
+
+import pandas as pd
+
+from services.order_aggregates import OrderAggregates
+
+
+def test_incremental_aggregates_match_full_recompute():
+    df = pd.DataFrame(
+        {
+            "Product_Category": ["fashion", "electronic", "fashion", "electronic"],
+            "Gender": ["male", "female", "female", "male"],
+            "Sales": [100.0, 250.0, 40.0, 10.0],
+            "Profit": [20.0, 75.5, 8.0, 1.5],
+            "Shipping_Cost": [4.5, 12.0, 1.0, 7.5],
+        }
+    )
+    aggregates = OrderAggregates(df.iloc[:2])
+    aggregates.add(df.iloc[2:])
+
+    assert json.loads(aggregates.json("total_sales_by_category")) == (
+        df.groupby("Product_Category")["Sales"].sum().reset_index().to_dict("records")
+    )
+    assert json.loads(aggregates.json("profit_by_gender")) == (
+        df.groupby("Gender")["Profit"].sum().reset_index().to_dict("records")
+    )
+    assert json.loads(aggregates.json("shipping_cost_summary")) == {
+        "average_shipping_cost": 6.25,
+        "min_shipping_cost": 1.0,
+        "max_shipping_cost": 12.0,
+    }
+
+
+def test_sums_do_not_depend_on_how_orders_are_batched():
+    values = [0.1, 0.7, 1e16, 0.3, -1e16, 10.506, 3.3, 2.2]
+    df = pd.DataFrame(
+        {
+            "Product_Category": ["fashion"] * len(values),
+            "Gender": ["male"] * len(values),
+            "Sales": values,
+            "Profit": values,
+            "Shipping_Cost": values,
+        }
+    )
+    whole = OrderAggregates(df)
+    batched = OrderAggregates()
+    for start in range(0, len(df), 3):
+        batched.add(df.iloc[start : start + 3])
+
+    for name in ["total_sales_by_category", "profit_by_gender"]:
+        assert batched.json(name) == whole.json(name)
+    assert json.loads(whole.json("total_sales_by_category"))[0]["Sales"] == (
+        math.fsum(values)
+    )
+    assert batched.json("shipping_cost_summary") == whole.json("shipping_cost_summary")
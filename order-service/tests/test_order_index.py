@@ -0,0 +1,29 @@
+import pandas as pd
+
+from services.order_index import CustomerIndex
+
+
+def test_customer_index_slices_orders_by_customer_and_date():
+    df = pd.DataFrame(
+        {
+            "Customer_Id": [7, 3, 7, 3, 7],
+            "Order_Date": pd.to_datetime(
+                ["2018-03-01", "2018-05-02", "2018-01-15", "2018-02-01", "2018-06-30"]
+            ),
+            "Product": ["tyre", "mouse", "sofa covers", "t-shirts", "headphones"],
+        }
+    )
+    index = CustomerIndex(df)
+
+    assert len(index) == 2
+    assert list(index.orders(7)["Product"]) == ["sofa covers", "tyre", "headphones"]
+    assert list(index.orders(3)["Product"]) == ["t-shirts", "mouse"]
+    assert index.most_recent(7).to_dict(orient="records") == [
+        {
+            "Customer_Id": 7,
+            "Order_Date": pd.Timestamp("2018-06-30"),
+            "Product": "headphones",
+        }
+    ]
+    assert index.orders(42).empty and index.most_recent(42).empty
+    assert 42 not in index
@@ -0,0 +1,77 @@
+import importlib
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from services.order_loader import clean_orders, load_orders
+
+CSV_COLUMNS = [
+    "Order_Date",
+    "Customer_Id",
+    "Gender",
+    "Device_Type",
+    "Customer_Login_type",
+    "Product_Category",
+    "Product",
+    "Sales",
+    "Profit",
+    "Shipping_Cost",
+    "Order_Priority",
+    "Payment_method",
+]
+CSV_ROWS = [
+    "2018-01-02,37077,Female,Web,Member,Auto & Accessories,"
+    "Car Media Players,140,46,4.6,Medium,credit_card",
+    "2018-07-24,59173,Female , Web,Member,Auto & Accessories ,"
+    "Car Speakers,211,112.6,11.3,Medium,credit_card",
+    "2018-11-08,41066,Male,Web,Member,Auto & Accessories,"
+    "Car Body Covers,n/a,31.2,3.1,Critical,e_wallet",
+    "not a date,50741,Male,Mobile,Guest,Fashion,Sneakers,150,40,,High,money_order",
+    "2018-04-21,50741,Male,Mobile,Guest,Fashion,Sneakers,250,-12.5,,High,money_order",
+]
+CSV = "\n".join([",".join(CSV_COLUMNS), *CSV_ROWS]) + "\n"
+
+
+def test_clean_orders_validates_and_types_columns(tmp_path):
+    csv_path = tmp_path / "orders.csv"
+    csv_path.write_text(CSV)
+
+    df = clean_orders(pd.read_csv(csv_path))
+
+    assert list(df["Customer_Id"]) == [37077, 59173, 50741]
+    assert df["Gender"].dtype == "category"
+    assert list(df["Gender"].cat.categories) == ["female", "male"]
+    assert list(df["Product_Category"]) == ["auto & accessories"] * 2 + ["fashion"]
+    assert df["Profit"].dtype == float and df["Shipping_Cost"].dtype == float
+    assert df["Order_Date"].iloc[-1] == pd.Timestamp("2018-04-21")
+
+
+def test_load_orders_reuses_the_parquet_cache_until_the_csv_changes(tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path, cache_path = tmp_path / "orders.csv", tmp_path / "orders.parquet"
+    csv_path.write_text(CSV)
+
+    first = load_orders(str(csv_path), str(cache_path))
+    assert cache_path.exists()
+    cached = load_orders(str(csv_path), str(cache_path))
+    pd.testing.assert_frame_equal(cached, first)
+
+    csv_path.write_text(CSV.replace("140,46", "1500,46"))
+    reloaded = load_orders(str(csv_path), str(cache_path))
+    assert reloaded["Sales"].iloc[0] == 1500
+
+
+def test_missing_numbers_are_served_as_empty_strings(tmp_path, monkeypatch):
+    csv_path = tmp_path / "orders.csv"
+    csv_path.write_text(CSV)
+    monkeypatch.setenv("ORDER_BACKEND", "pandas")
+    monkeypatch.setenv("ORDER_DATASET_PATH", str(csv_path))
+    monkeypatch.setenv("ORDER_CACHE_PATH", "")
+    import services.mock_api as mock_api
+
+    client = TestClient(importlib.reload(mock_api).app)
+    # The latest order of the customer has no shipping cost
+    response = client.get("/data/customer/50741/most-recent")
+    assert response.status_code == 200
+    assert response.json()[0]["Shipping_Cost"] == ""
@@ -0,0 +1,82 @@
+import json
+
+import pandas as pd
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from services.order_pages import CHUNK_ROWS, RowQuery, rows_response
+
+df = pd.DataFrame(
+    {
+        "Customer_Id": range(2500),
+        "Order_Date": pd.Timestamp("2018-01-01"),
+        "Profit": [float(i % 7) for i in range(2500)],
+    }
+)
+app = FastAPI()
+
+
+@app.get("/rows")
+def get_rows(query: RowQuery = Depends()):
+    return rows_response(df, range(0, len(df), 2), query)
+
+
+client = TestClient(app)
+
+
+def test_rows_are_streamed_in_chunks_and_paged():
+    full = client.get("/rows")
+    assert full.headers["x-total-count"] == "1250"
+    assert full.json()[-1] == {
+        "Customer_Id": 2498,
+        "Order_Date": "2018-01-01T00:00:00",
+        "Profit": 6.0,
+    }
+    assert len(full.json()) == 1250 > CHUNK_ROWS
+
+    rows, cursor = [], None
+    while True:
+        params = {"limit": 400, "fields": "Customer_Id", "format": "ndjson"}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = client.get("/rows", params=params)
+        rows += [json.loads(line) for line in page.text.splitlines()]
+        cursor = page.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert rows == [{"Customer_Id": row["Customer_Id"]} for row in full.json()]
+
+    offset = client.get("/rows", params={"offset": 1249, "limit": 5})
+    assert offset.json() == full.json()[-1:]
+    assert client.get("/rows", params={"fields": "Nope"}).json() == {
+        "error": "Unknown fields: Nope"
+    }
+
+
+def test_rows_are_filtered_and_sorted_before_paging():
+    page = client.get(
+        "/rows",
+        params={
+            "filter_by": "Profit,greater_than,4",
+            "sort_by": "Profit",
+            "sort_order": "desc",
+            "limit": 3,
+            "fields": "Customer_Id,Profit",
+        },
+    )
+    assert page.headers["x-total-count"] == str(
+        sum(1 for i in range(0, 2500, 2) if i % 7 > 4)
+    )
+    assert "x-next-cursor" not in page.headers
+    assert page.json() == [
+        {"Customer_Id": 6, "Profit": 6.0},
+        {"Customer_Id": 20, "Profit": 6.0},
+        {"Customer_Id": 34, "Profit": 6.0},
+    ]
+    # Unknown columns are ignored, like in post-processing
+    assert (
+        len(client.get("/rows", params={"filter_by": "Nope,equals,1"}).json()) == 1250
+    )
+    assert client.get("/rows", params={"filter_by": "Profit,above,1"}).json() == {
+        "error": "Invalid filter: Profit,above,1"
+    }
@@ -0,0 +1,124 @@
+import importlib
+
+from fastapi.testclient import TestClient
+
+from services.order_aggregates import OrderAggregates
+from services.order_loader import load_orders
+from services.order_store import SQLiteOrderStore, import_orders
+
+CSV_COLUMNS = [
+    "Order_Date",
+    "Time",
+    "Customer_Id",
+    "Gender",
+    "Device_Type",
+    "Customer_Login_type",
+    "Product_Category",
+    "Product",
+    "Sales",
+    "Quantity",
+    "Profit",
+    "Shipping_Cost",
+    "Order_Priority",
+    "Payment_method",
+]
+CSV_ROWS = [
+    "2018-07-24,10:00:00,59173,Female , Web,Member,Auto & Accessories ,"
+    "Car Speakers,211,1,112.6,11.3,Medium,credit_card",
+    "2018-01-02,11:00:00,37077,Female,Web,Member,Auto & Accessories,"
+    "Car Media Players,140,2,46,4.6,Medium,credit_card",
+    "2018-11-08,12:00:00,41066,Male,Web,Member,Auto & Accessories,"
+    "Car Body Covers,n/a,1,31.2,3.1,Critical,e_wallet",
+    "2018-04-21,13:00:00,50741,Male,Mobile,Guest,Fashion,"
+    "Sneakers,250,3,-12.5,,High,money_order",
+    "2018-03-02,14:00:00,37077,Female,Web,Member,Fashion,"
+    "Sneakers,150,1,40,5.2,High,e_wallet",
+    "2018-01-02,15:00:00,37077,Female,Mobile,Member,Electronic,"
+    "Mouse,30,1,6.1,1.9,Low,debit_card",
+]
+CSV = "\n".join([",".join(CSV_COLUMNS), *CSV_ROWS]) + "\n"
+URLS = [
+    "/data",
+    "/data?limit=2&offset=1&fields=Customer_Id,Product",
+    "/data?limit=2&cursor=2&format=ndjson",
+    "/data?filter_by=Product,contains,SNEAK&sort_by=Sales&sort_order=asc",
+    "/data?filter_by=Sales,greater_than,abc",
+    "/data/customer/37077",
+    "/data/customer/37077/most-recent",
+    # Its order has no shipping cost
+    "/data/customer/50741/most-recent",
+    "/data/customer/1",
+    "/data/product-category/auto",
+    "/data/order-priority/high",
+    "/data/high-profit-products?min_profit=40",
+    "/data/total-sales-by-category",
+    "/data/shipping-cost-summary",
+]
+
+
+def mock_api_client(monkeypatch, backend):
+    monkeypatch.setenv("ORDER_BACKEND", backend)
+    import services.mock_api as mock_api
+
+    return TestClient(importlib.reload(mock_api).app)
+
+
+def test_sqlite_backend_serves_the_responses_of_the_pandas_backend(
+    tmp_path, monkeypatch
+):
+    csv_path, db_path = tmp_path / "orders.csv", tmp_path / "orders.db"
+    csv_path.write_text(CSV)
+    # Chunks smaller than the file, to import and sort across chunks
+    assert import_orders(str(csv_path), str(db_path), chunk_rows=2) == 5
+    monkeypatch.setenv("ORDER_DATASET_PATH", str(csv_path))
+    monkeypatch.setenv("ORDER_CACHE_PATH", "")
+    monkeypatch.setenv("ORDER_DB_PATH", str(db_path))
+    monkeypatch.setenv("MOCK_API_ADMIN_TOKEN", "secret")
+
+    responses = {}
+    for backend in ["pandas", "sqlite"]:
+        client = mock_api_client(monkeypatch, backend)
+        responses[backend] = [
+            (response.content, response.headers.get("x-next-cursor"))
+            for response in map(client.get, URLS)
+        ]
+    assert responses["sqlite"] == responses["pandas"]
+
+    order = dict(zip(CSV.splitlines()[0].split(","), CSV.splitlines()[2].split(",")))
+    orders = [{**order, "Order_Date": "2018-01-01"}]
+    assert client.post("/data/orders", json=orders).status_code == 401
+    added = client.post(
+        "/data/orders", json=orders, headers={"X-Admin-Token": "secret"}
+    )
+    assert added.json() == {"added": 1, "total": 6}
+    orders = client.get("/data/customer/37077").json()
+    assert [order["Order_Date"][:10] for order in orders] == [
+        "2018-01-01",
+        "2018-01-02",
+        "2018-01-02",
+        "2018-03-02",
+    ]
+    # Persisted for the next start
+    restarted = mock_api_client(monkeypatch, "sqlite")
+    assert len(restarted.get("/data").json()) == 6
+
+
+def test_imported_aggregates_do_not_depend_on_the_chunk_size(tmp_path):
+    header, first, *_ = CSV.splitlines()
+    csv_path, db_path = tmp_path / "orders.csv", tmp_path / "orders.db"
+    # Amounts whose float sum depends on how they are grouped
+    amounts = [0.1, 0.7, 1e16, 0.3, -1e16, 10.506, 3.3, 2.2]
+    rows = [
+        first.replace(",211,1,112.6,11.3,", f",{amount!r},1,{amount!r},{amount!r},")
+        for amount in amounts
+    ]
+    csv_path.write_text("\n".join([header, *rows]) + "\n")
+
+    import_orders(str(csv_path), str(db_path), chunk_rows=3)
+    store = SQLiteOrderStore(str(db_path))
+    expected = OrderAggregates(load_orders(str(csv_path)))
+    for name in ["total_sales_by_category", "profit_by_gender"]:
+        assert store.aggregates.json(name) == expected.json(name)
+    assert store.aggregates.json("shipping_cost_summary") == expected.json(
+        "shipping_cost_summary"
+    )
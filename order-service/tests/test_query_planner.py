@@ -0,0 +1,64 @@
+from services.query_planner import QueryPlanner
+
+
+def test_common_questions_are_planned_by_rules():
+    planner = QueryPlanner(cache_size=8)
+
+    assert planner.plan("37077", "What was my last order?") == {
+        "endpoint": "/data/customer/{customer_id}/most-recent",
+        "parameters": {"customer_id": "37077"},
+        "post_processing": {},
+        "query_type": "most_recent",
+    }
+    assert planner.plan("37077", "Show me all my orders")["query_type"] == "all_orders"
+    assert planner.plan("37077", "Any high priority orders?")["parameters"] == {
+        "priority": "high"
+    }
+    assert planner.plan("37077", "Do I have critical priority orders?")[
+        "post_processing"
+    ] == {"filter_by": ["Order_Priority", "equals", "critical"]}
+    assert (
+        planner.plan(None, "Total sales by category")["endpoint"]
+        == "/data/total-sales-by-category"
+    )
+    # Qualified questions need the LLM
+    assert planner.plan("37077", "My last order of headphones in 2018") is None
+    assert planner.plan("37077", "Show my most expensive orders") is None
+    for query in [
+        "How much have I spent on all my orders?",
+        "What is the total of all my orders?",
+        "Show me all my orders from Apple",
+        "Where is my last order?",
+        "Did I pay for my last order with a credit card?",
+        "Was my last order high priority?",
+        "What were my shipping costs?",
+    ]:
+        assert planner.plan("37077", query) is None, query
+
+
+def test_llm_plans_are_reused_across_customers_and_numbers():
+    planner = QueryPlanner(cache_size=8)
+    query = "Show my 3 most expensive orders"
+    assert planner.plan(37077, query) is None
+    planner.remember(
+        37077,
+        query,
+        {
+            "endpoint": "/data/customer/{customer_id}",
+            "parameters": {"customer_id": 37077},
+            "post_processing": {"sort_by": "Sales", "sort_order": "desc", "limit": 3},
+            "query_type": "specific",
+        },
+    )
+
+    plan = planner.plan(41562, "show my 5 most expensive orders!")
+    assert plan["parameters"] == {"customer_id": 41562}
+    assert plan["post_processing"]["limit"] == 5
+    assert planner.plan(41562, "show my 5 cheapest orders") is None
+    assert planner.metrics() == {
+        "rule_hits": 0,
+        "cache_hits": 1,
+        "llm_calls": 2,
+        "hit_rate": 1 / 3,
+        "cached_plans": 1,
+    }
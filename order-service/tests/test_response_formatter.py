@@ -0,0 +1,78 @@
+import asyncio
+
+from langchain_core.runnables import RunnableLambda
+
+from services.response_formatter_service import ResponseFormatterService
+
+ORDER = {
+    "Order_Date": "2018-01-05T00:00:00",
+    "Product": "headphones",
+    "Product_Category": "electronic",
+    "Sales": 1234.5,
+    "Quantity": 2.0,
+    "Shipping_Cost": 4.2,
+    "Order_Priority": "high",
+}
+
+
+def test_common_query_types_are_rendered_from_templates():
+    formatter = ResponseFormatterService()
+
+    assert formatter.format_template("most_recent", [ORDER]) == (
+        "Your most recent order was placed on January 5, 2018: headphones "
+        "(electronic) for $1,234.50. Quantity: 2, Shipping: $4.20, Priority: high."
+    )
+    orders = formatter.format_template("all_orders", [ORDER] * 12)
+    assert orders.splitlines()[0] == "I found 12 orders:"
+    assert orders.splitlines()[-1] == "...and 2 more."
+    assert (
+        formatter.format_template(
+            "aggregate", [{"Product_Category": "fashion", "Sales": 10.0}]
+        )
+        == "Total sales by category:\n- fashion: $10.00"
+    )
+    assert (
+        formatter.format_template(
+            "aggregate",
+            {
+                "average_shipping_cost": 7.5,
+                "min_shipping_cost": 1.0,
+                "max_shipping_cost": 20.0,
+            },
+        )
+        == "Shipping costs average $7.50, ranging from $1.00 to $20.00."
+    )
+    assert formatter.format_template("specific_product", [ORDER]) is None
+
+
+def test_llm_formats_unrecognized_query_types_and_on_request():
+    formatter = ResponseFormatterService()
+    calls = []
+
+    def llm(prompt):
+        calls.append(prompt)
+        return type("Result", (), {"content": "From the LLM"})()
+
+    def format_response(
+        query_type, formatter_name=None, query="What was my last order?"
+    ):
+        return asyncio.run(
+            formatter.format_response(
+                query,
+                "37077",
+                [ORDER],
+                RunnableLambda(lambda values: values),
+                RunnableLambda(llm),
+                query_type=query_type,
+                formatter=formatter_name,
+            )
+        )
+
+    assert format_response("most_recent").startswith("Your most recent order")
+    assert not calls
+    assert format_response("specific_product") == "From the LLM"
+    assert format_response("most_recent", "llm") == "From the LLM"
+    # The question asks more than the template answers
+    query = "Where is my last order?"
+    assert format_response("most_recent", query=query) == "From the LLM"
+    assert len(calls) == 3
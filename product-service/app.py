@@ -3,8 +3,14 @@ Main FastAPI application entry point
 """
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from routers.product_router import router as product_router
+from config import VECTOR_BACKEND
+from routers.product_router import (
+    get_neighbour_service,
+    get_product_service,
+    router as product_router,
+)
 from fastapi.responses import JSONResponse
 
 # Configure logging
@@ -13,9 +19,20 @@ logger = logging.getLogger(__name__)
 
 logger.info("Starting Product Service...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the similar-product table and a local index snapshot before serving"""
+    get_neighbour_service()
+    if VECTOR_BACKEND == "snapshot":
+        get_product_service()
+    yield
+
+
 app = FastAPI(
     title="E-commerce Product Service",
     description="Product service that handles product-related queries",
+    lifespan=lifespan,
 )
 
 # Include routers
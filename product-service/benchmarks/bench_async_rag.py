@@ -0,0 +1,124 @@
+"""
+Throughput of the product RAG chain: threadpool mode versus native async mode.
+
+The chain is built by RAGService exactly as in production, but with a local
+fake retriever and chat model that sleep for a configurable embedding, vector
+search and generation latency, so the numbers reflect request scheduling and
+not the network.
+
+Usage:
+    python benchmarks/bench_async_rag.py --concurrency 1 10 50 100 200 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Set service root (parent of 'benchmarks') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.concurrency import run_in_threadpool
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+
+from services.product_service import ProductService
+from services.rag_service import RAGService
+
+
+class FakeRetriever(BaseRetriever):
+    """Retriever that simulates an embedding call followed by a vector search"""
+
+    embed_latency: float = 0.05
+    search_latency: float = 0.03
+    k: int = 5
+
+    def _documents(self, query: str) -> list[Document]:
+        return [
+            Document(page_content=f"Title: Product {i}\nDescription: {query}")
+            for i in range(self.k)
+        ]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        time.sleep(self.embed_latency)
+        time.sleep(self.search_latency)
+        return self._documents(query)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        await asyncio.sleep(self.embed_latency)
+        await asyncio.sleep(self.search_latency)
+        return self._documents(query)
+
+
+def fake_llm(latency: float) -> RunnableLambda:
+    """Chat model stand-in with a fixed generation latency"""
+
+    def generate(prompt):
+        time.sleep(latency)
+        return AIMessage(content="A great product.")
+
+    async def agenerate(prompt):
+        await asyncio.sleep(latency)
+        return AIMessage(content="A great product.")
+
+    return RunnableLambda(generate, afunc=agenerate)
+
+
+async def run_level(service: ProductService, mode: str, concurrency: int, rounds: int):
+    """Run `rounds` waves of `concurrency` simultaneous queries, return req/s"""
+    messages = [{"role": "user", "message": "Which keyboard is best for beginners?"}]
+
+    async def one():
+        if mode == "async":
+            return await service.ahandle_query(messages)
+        return await run_in_threadpool(service.handle_query, messages)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return concurrency * rounds / elapsed, elapsed
+
+
+async def main(args):
+    retriever = FakeRetriever(
+        embed_latency=args.embed_latency, search_latency=args.search_latency
+    )
+    rag_service = RAGService(retriever=retriever, llm=fake_llm(args.llm_latency))
+    service = ProductService(rag_service=rag_service, max_concurrency=args.limit)
+
+    request_latency = args.embed_latency + args.search_latency + args.llm_latency
+    print(f"Simulated request latency: {request_latency * 1000:.0f} ms")
+    print(f"{'concurrency':>12} {'threadpool req/s':>18} {'async req/s':>14}")
+    for concurrency in args.concurrency:
+        row = []
+        for mode in ("threadpool", "async"):
+            throughput, _ = await run_level(service, mode, concurrency, args.rounds)
+            row.append(throughput)
+        print(f"{concurrency:>12} {row[0]:>18.1f} {row[1]:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50, 100, 200, 500]
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.03)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument(
+        "--limit", type=int, default=512, help="async mode concurrency limit"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -10,10 +10,29 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     logging.warning("OPENAI_API_KEY not set. LLM functionality will be limited.")
 RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+# Run the RAG chain natively on the event loop instead of in the threadpool
+RAG_ASYNC = os.getenv("RAG_ASYNC", "true").lower() in ("1", "true", "yes")
+# Maximum number of RAG chain invocations in flight per worker
+RAG_MAX_CONCURRENCY = int(os.getenv("RAG_MAX_CONCURRENCY", "512"))
+# Maximum concurrent LLM generations for a single batch query request
+RAG_BATCH_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", "16"))
+# Maximum number of context tokens sent to the LLM after packing retrieved chunks
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+# Most products a comparison question is split into for retrieval; 1 disables it
+RAG_MAX_SUBQUERIES = int(os.getenv("RAG_MAX_SUBQUERIES", "4"))
+# Directory of the precomputed similar-product table (scripts/build_neighbours.py)
+NEIGHBOUR_TABLE_PATH = os.getenv("NEIGHBOUR_TABLE_PATH", "datasets/neighbours")
+# Vector index backend: "pinecone", or "snapshot" to serve an exported snapshot
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "datasets/snapshot")
+# Check snapshot files against their checksums at startup
+SNAPSHOT_VERIFY = os.getenv("SNAPSHOT_VERIFY", "true").lower() in ("1", "true", "yes")
 # Service URLs
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+# Projection the index vectors were reduced with (scripts/fit_compression.py)
+EMBEDDING_PROJECTION_PATH = os.getenv("EMBEDDING_PROJECTION_PATH", "")
 PRODUCT_SEARCH_URL = os.getenv(
     "PRODUCT_SERVICE_URL", "http://product-service:8001/api/products"
 )
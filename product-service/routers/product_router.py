@@ -2,12 +2,18 @@
 Router for product-related endpoints
 """
 
+import json
 import logging
-from fastapi import APIRouter, Depends
+import os
+from functools import lru_cache
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
+from config import NEIGHBOUR_TABLE_PATH, RAG_ASYNC
+from services.neighbour_service import NeighbourService
 from services.product_service import ProductService
 
 # Configure logging
@@ -20,6 +26,12 @@ class ProductQueryRequest(BaseModel):
     messages: list[Dict[str, str]]
     metadata: Optional[Dict[str, Any]] = None
     customer_id: Optional[str] = None
+    # Include the query and full retrieved context in the response metadata
+    debug: bool = False
+
+
+class ProductBatchQueryRequest(BaseModel):
+    queries: list[str]
 
 
 class ProductQueryResponse(BaseModel):
@@ -27,11 +39,68 @@ class ProductQueryResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class SimilarProduct(BaseModel):
+    id: str
+    title: str
+    score: float
+
+
+class SimilarProductsResponse(BaseModel):
+    product_id: str
+    similar: list[SimilarProduct]
+
+
+@lru_cache(maxsize=1)
 def get_product_service():
-    """Dependency injection for product service"""
+    """Dependency injection for product service, shared across requests"""
     return ProductService()
 
 
+@lru_cache(maxsize=1)
+def get_neighbour_service() -> Optional[NeighbourService]:
+    """Dependency injection for the similar-product table, if one was built"""
+    if not NEIGHBOUR_TABLE_PATH or not os.path.isdir(NEIGHBOUR_TABLE_PATH):
+        logger.warning("No neighbour table found, similar products are disabled")
+        return None
+    return NeighbourService(NEIGHBOUR_TABLE_PATH)
+
+
+def extract_answer(response: Any) -> str:
+    """Pull the answer text out of the different RAG chain response formats"""
+    if not isinstance(response, dict):
+        return str(response)
+    answer = (
+        response.get("answer") or response.get("output") or response.get("response")
+    )
+    if answer:
+        return answer
+    # If no expected key, try to get the first string value
+    for value in response.values():
+        if isinstance(value, str):
+            return value
+    return "I'm sorry, I couldn't generate a proper response."
+
+
+def build_response_metadata(response: Any) -> Dict[str, Any]:
+    """Compact metadata: matched product IDs with scores and stage timings"""
+    if not isinstance(response, dict):
+        return {}
+    metadata = {
+        "products": [
+            {
+                "id": document.metadata.get("product_id")
+                or document.metadata.get("product_key"),
+                "score": document.metadata.get("score"),
+            }
+            for document in response.get("context", [])
+        ],
+        "timings": response.get("timings", {}),
+    }
+    if "metadata" in response:
+        metadata.update(response["metadata"])
+    return metadata
+
+
 @router.post("/query", response_model=ProductQueryResponse)
 async def handle_product_query(
     request: ProductQueryRequest,
@@ -43,34 +112,82 @@ async def handle_product_query(
     try:
         logger.info(f"Received query: {request.messages}")
 
-        response = await run_in_threadpool(
-            product_service.handle_query,
-            request.messages,
-            request.customer_id,
-            request.metadata,
-        )
+        if RAG_ASYNC:
+            response = await product_service.ahandle_query(
+                request.messages, request.customer_id, request.metadata
+            )
+        else:
+            response = await run_in_threadpool(
+                product_service.handle_query,
+                request.messages,
+                request.customer_id,
+                request.metadata,
+            )
 
         # Handle different response formats from the RAG chain
-        if isinstance(response, dict):
-            answer = response.get("answer") or response.get("output") or response.get("response")
-            if not answer:
-                # If no expected key, try to get the first string value
-                for value in response.values():
-                    if isinstance(value, str):
-                        answer = value
-                        break
-                else:
-                    answer = "I'm sorry, I couldn't generate a proper response."
-        else:
-            answer = str(response)
+        answer = extract_answer(response)
 
-        return ProductQueryResponse(
-            response=answer, 
-            metadata={"query": request.messages, "raw_response": response}
-        )
+        metadata = build_response_metadata(response)
+        if request.debug or (request.metadata or {}).get("debug"):
+            metadata.update({"query": request.messages, "raw_response": response})
+
+        return ProductQueryResponse(response=answer, metadata=metadata)
     except Exception as e:
         logger.error(f"Error handling product query: {str(e)}", exc_info=True)
         return ProductQueryResponse(
             response="I'm sorry, I encountered an issue while retrieving product information. Please try again later.",
             metadata={"error": str(e)},
         )
+
+
+@router.post("/query/batch")
+async def handle_product_query_batch(
+    request: ProductBatchQueryRequest,
+    product_service: ProductService = Depends(get_product_service),
+):
+    """
+    Answer many product questions in one request, streamed as NDJSON
+
+    Each line is a JSON object with the query `index`, the `query`, the
+    `response` text and compact `metadata`, emitted as soon as that answer is
+    ready.
+    """
+    logger.info(f"Received batch of {len(request.queries)} queries")
+
+    async def stream_results():
+        try:
+            async for result in product_service.ahandle_batch(request.queries):
+                response = result["response"]
+                line = {
+                    "index": result["index"],
+                    "query": result["query"],
+                    "response": extract_answer(response),
+                    "metadata": build_response_metadata(response),
+                }
+                yield json.dumps(line) + "\n"
+        except Exception as e:
+            logger.error(f"Error handling product batch: {str(e)}", exc_info=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/{product_id}/similar", response_model=SimilarProductsResponse)
+async def get_similar_products(
+    product_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    neighbour_service: Optional[NeighbourService] = Depends(get_neighbour_service),
+):
+    """
+    Return the products most similar to the given one, from the precomputed table
+    """
+    if neighbour_service is None:
+        raise HTTPException(
+            status_code=503, detail="Similar products are not available"
+        )
+    similar = neighbour_service.similar(product_id, limit)
+    if similar is None:
+        raise HTTPException(
+            status_code=404, detail=f"No product found with ID {product_id}"
+        )
+    return SimilarProductsResponse(product_id=product_id, similar=similar)
@@ -0,0 +1,67 @@
+"""
+Query-side embedding projection matching embeddings/compression.py
+"""
+
+import logging
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class VectorProjection:
+    """The dimensionality reduction of a compressor fitted at ingestion time"""
+
+    def __init__(self, path: str):
+        """
+        Load the projection
+
+        Args:
+            path: .npz written by VectorCompressor.save
+        """
+        with np.load(path) as data:
+            self.mean = data["mean"]
+            self.components = data["components"] if "components" in data else None
+            self.dimension = int(data["settings"][0])
+            self.name = "{}{}".format(str(data["methods"][0]), self.dimension)
+        logger.info(f"Loaded {self.name} embedding projection from {path}")
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Reduce embeddings the way the indexed vectors were reduced
+
+        Args:
+            vectors: (N, full dimension) embeddings
+
+        Returns:
+            (N, dimension) unit-length float32 vectors
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.components is not None:
+            vectors = (vectors - self.mean) @ self.components
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class ProjectedEmbeddings(Embeddings):
+    """Embeddings whose vectors are passed through a VectorProjection"""
+
+    def __init__(self, embeddings: Embeddings, projection: VectorProjection):
+        self.embeddings = embeddings
+        self.projection = projection
+
+    def _project(self, vectors: list[list[float]]) -> list[list[float]]:
+        return self.projection.project(vectors).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._project(self.embeddings.embed_documents(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._project([self.embeddings.embed_query(text)])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._project(await self.embeddings.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self._project([await self.embeddings.aembed_query(text)])[0]
@@ -0,0 +1,284 @@
+"""
+Service for packing retrieved chunks into a compact, token-budgeted context
+"""
+
+import itertools
+import logging
+import re
+from typing import Callable, Optional
+
+from langchain_core.documents import Document
+
+from config import LLM_MODEL, RAG_CONTEXT_TOKEN_BUDGET
+
+logger = logging.getLogger(__name__)
+
+_TITLE_PATTERN = re.compile(r"^Title: (.+)$", re.MULTILINE)
+
+
+def load_token_counter(model: str = LLM_MODEL) -> Callable[[str], int]:
+    """
+    Return a function counting the tokens of a string for the given model
+
+    Uses the local tiktoken encoding for the model. When the encoding files
+    are not available (e.g. offline without a tiktoken cache) it falls back
+    to the usual estimate of four characters per token.
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+        return lambda text: (len(text) + 3) // 4
+
+
+def _merge_overlapping(first: str, second: str, min_overlap: int) -> Optional[str]:
+    """
+    Merge two chunks when the end of `first` repeats the start of `second`
+
+    Returns the merged text, or None if the chunks do not overlap by at least
+    `min_overlap` characters.
+    """
+    if second in first:
+        return first
+    probe = second[:min_overlap]
+    if len(probe) < min_overlap:
+        return None
+    position = first.find(probe)
+    while position != -1:
+        if second.startswith(first[position:]):
+            return first[:position] + second
+        position = first.find(probe, position + 1)
+    return None
+
+
+class ContextPacker:
+    """Deduplicates, merges and budgets retrieved chunks before generation"""
+
+    def __init__(
+        self,
+        token_budget: int = RAG_CONTEXT_TOKEN_BUDGET,
+        min_overlap: int = 50,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Initialize the context packer
+
+        Args:
+            token_budget: Maximum number of context tokens passed to the LLM
+            min_overlap: Minimum repeated characters for two chunks to be merged
+            count_tokens: Optional token counting function
+        """
+        self.token_budget = token_budget
+        self.min_overlap = min_overlap
+        self.count_tokens = count_tokens or load_token_counter()
+
+    def _product_key(self, document: Document) -> Optional[str]:
+        """Identify the product a chunk belongs to, if the chunk says so"""
+        product_id = document.metadata.get("product_id")
+        if product_id:
+            return str(product_id)
+        match = _TITLE_PATTERN.search(document.page_content)
+        return match.group(1).strip() if match else None
+
+    def _find_overlapping_group(self, groups: dict, text: str) -> Optional[str]:
+        """Return the key of the first group with a chunk overlapping `text`"""
+        for key, group in groups.items():
+            for existing in group["texts"]:
+                if _merge_overlapping(
+                    existing, text, self.min_overlap
+                ) or _merge_overlapping(text, existing, self.min_overlap):
+                    return key
+        return None
+
+    def _merge_group(self, texts: list[str]) -> list[str]:
+        """Collapse the chunks of one product into as few texts as possible"""
+        merged: list[str] = []
+        for text in texts:
+            pending = text
+            changed = True
+            while changed:
+                changed = False
+                for index, existing in enumerate(merged):
+                    combined = _merge_overlapping(
+                        existing, pending, self.min_overlap
+                    ) or _merge_overlapping(pending, existing, self.min_overlap)
+                    if combined is not None:
+                        merged.pop(index)
+                        pending = combined
+                        changed = True
+                        break
+            merged.append(pending)
+        return merged
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut text on a line boundary so it fits in `max_tokens`
+
+        The first line that does not fit is cut at the last word that does,
+        so a long line is shortened rather than dropped.
+        """
+        kept: list[str] = []
+        used = 0
+        for line in text.splitlines(keepends=True):
+            tokens = self.count_tokens(line)
+            if used + tokens > max_tokens:
+                words = line.split(" ")
+                low, high = 0, len(words)
+                while low < high:
+                    middle = (low + high + 1) // 2
+                    prefix = " ".join(words[:middle])
+                    if used + self.count_tokens(prefix) <= max_tokens:
+                        low = middle
+                    else:
+                        high = middle - 1
+                kept.append(" ".join(words[:low]))
+                break
+            kept.append(line)
+            used += tokens
+        return "".join(kept).rstrip()
+
+    def _group(self, documents: list[Document]) -> list[tuple[str, dict]]:
+        """Group chunks by product, best scoring product first"""
+        keyed = [
+            (rank, self._product_key(document), document)
+            for rank, document in enumerate(documents)
+        ]
+        # Titled chunks first, so untitled fragments can find their product
+        keyed.sort(key=lambda item: item[1] is None)
+
+        groups: dict[str, dict] = {}
+        for rank, key, document in keyed:
+            score = document.metadata.get("score")
+            if score is None:
+                score = -rank
+            if key is None:
+                key = self._find_overlapping_group(groups, document.page_content)
+                key = key or f"chunk-{rank}"
+            group = groups.setdefault(
+                key, {"texts": [], "score": score, "metadata": document.metadata}
+            )
+            group["texts"].append(document.page_content)
+            group["score"] = max(group["score"], score)
+
+        return sorted(groups.items(), key=lambda item: item[1]["score"], reverse=True)
+
+    def _fill(
+        self, ordered: list[tuple[str, dict]], budget: Optional[int] = None
+    ) -> list[Document]:
+        """Build one document per group, in order, until the budget is spent"""
+        packed: list[Document] = []
+        budget = self.token_budget if budget is None else budget
+        remaining = budget
+        for key, group in ordered:
+            text = "\n".join(self._merge_group(group["texts"]))
+            tokens = self.count_tokens(text)
+            if tokens > remaining:
+                text = self._truncate(text, remaining)
+                if not text:
+                    break
+                tokens = self.count_tokens(text)
+            metadata = {
+                k: v for k, v in group["metadata"].items() if k not in ("score", "text")
+            }
+            metadata.update(
+                {
+                    "product_key": key,
+                    "score": group["score"],
+                    "chunks": len(group["texts"]),
+                }
+            )
+            packed.append(Document(page_content=text, metadata=metadata))
+            remaining -= tokens
+            if remaining <= 0:
+                break
+
+        logger.debug(
+            f"Packed {sum(len(group['texts']) for _, group in ordered)} chunks into "
+            f"{len(packed)} documents, {budget - remaining} tokens"
+        )
+        return packed
+
+    def pack(self, documents: list[Document]) -> list[Document]:
+        """
+        Pack retrieved chunks into one document per product
+
+        Chunks of the same product (by `product_id` metadata or title) and
+        chunks whose text overlaps are merged, products are ordered by their
+        best retrieval score and added until the token budget is spent.
+
+        Args:
+            documents: Retrieved chunks, best match first. A `score` in the
+                metadata is used for ordering when present.
+
+        Returns:
+            The packed documents
+        """
+        return self._fill(self._group(documents))
+
+    def _shares(self, needs: list[int]) -> list[int]:
+        """
+        Split the budget evenly, giving what one does not need to the others
+
+        Args:
+            needs: Tokens each part would use without a budget
+
+        Returns:
+            The tokens of each part
+        """
+        shares = [0] * len(needs)
+        remaining = self.token_budget
+        by_need = sorted(range(len(needs)), key=needs.__getitem__)
+        for position, index in enumerate(by_need):
+            shares[index] = min(needs[index], remaining // (len(needs) - position))
+            remaining -= shares[index]
+        return shares
+
+    def pack_many(self, results: list[list[Document]]) -> list[Document]:
+        """
+        Pack the chunks retrieved for several sub-queries into one context
+
+        Every sub-query gets an even share of the token budget, filled with
+        its products best first; the share a sub-query does not need goes to
+        the others. A product found by several sub-queries appears once,
+        counted against the first of them, and products are listed from the
+        sub-queries in turn, so every top product comes first.
+
+        Args:
+            results: Retrieved chunks per sub-query, each best match first
+
+        Returns:
+            The packed documents
+        """
+        merged: dict[str, dict] = {}
+        owned: list[list[str]] = [[] for _ in results]
+        for ordered in itertools.zip_longest(*map(self._group, results)):
+            for index, item in enumerate(ordered):
+                if item is None:
+                    continue
+                key, group = item
+                if key not in merged:
+                    merged[key] = {**group, "texts": list(group["texts"])}
+                    owned[index].append(key)
+                    continue
+                merged[key]["texts"].extend(group["texts"])
+                merged[key]["score"] = max(merged[key]["score"], group["score"])
+
+        needs = [
+            sum(
+                self.count_tokens("\n".join(self._merge_group(merged[key]["texts"])))
+                for key in keys
+            )
+            for keys in owned
+        ]
+        packed = {
+            document.metadata["product_key"]: document
+            for keys, share in zip(owned, self._shares(needs))
+            for document in self._fill([(key, merged[key]) for key in keys], share)
+        }
+        return [packed[key] for key in merged if key in packed]
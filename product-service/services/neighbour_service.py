@@ -0,0 +1,67 @@
+"""
+Service for similar-product lookups from the precomputed neighbour table
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class NeighbourService:
+    """Serves "similar items" from a table built by scripts/build_neighbours.py"""
+
+    def __init__(self, table_path: str):
+        """
+        Load the neighbour table
+
+        The neighbour and score arrays are memory-mapped, so start-up cost and
+        resident memory stay small however large the catalog is.
+
+        Args:
+            table_path: Directory holding neighbours.npy, scores.npy and
+                products.json
+        """
+        logger.info(f"Loading neighbour table from {table_path}...")
+        self.neighbours = np.load(
+            os.path.join(table_path, "neighbours.npy"), mmap_mode="r"
+        )
+        self.scores = np.load(os.path.join(table_path, "scores.npy"), mmap_mode="r")
+        with open(os.path.join(table_path, "products.json"), encoding="utf-8") as f:
+            products = json.load(f)
+        self.product_ids = products["ids"]
+        self.titles = products["titles"]
+        self.rows = {product_id: row for row, product_id in enumerate(self.product_ids)}
+        logger.info(f"Neighbour table loaded for {len(self.rows)} products")
+
+    def similar(
+        self, product_id: str, limit: int = 10
+    ) -> Optional[list[Dict[str, Any]]]:
+        """
+        Return the products most similar to `product_id`
+
+        Args:
+            product_id: The product to look up
+            limit: Maximum number of similar products
+
+        Returns:
+            List of similar products with their similarity score, best first,
+            or None if the product is not in the table
+        """
+        row = self.rows.get(product_id)
+        if row is None:
+            return None
+        neighbours = self.neighbours[row, :limit]
+        scores = self.scores[row, :limit]
+        return [
+            {
+                "id": self.product_ids[neighbour],
+                "title": self.titles[neighbour],
+                "score": round(float(score), 4),
+            }
+            for neighbour, score in zip(neighbours, scores)
+        ]
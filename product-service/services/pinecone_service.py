@@ -2,20 +2,83 @@
 Service for interacting with Pinecone vector database
 """
 
+import asyncio
 import logging
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
+from services.compression import ProjectedEmbeddings, VectorProjection
+from services.snapshot_service import SnapshotVectorStore
 from config import (
     PINECONE_API_KEY,
     OPENAI_API_KEY,
     PINECONE_INDEX_NAME,
     EMBEDDING_MODEL,
+    EMBEDDING_PROJECTION_PATH,
     RAG_TOP_K,
+    SNAPSHOT_PATH,
+    SNAPSHOT_VERIFY,
+    VECTOR_BACKEND,
 )
 
 logger = logging.getLogger(__name__)
 
 
+class ScoredRetriever(BaseRetriever):
+    """Retriever that records the similarity score in each document's metadata"""
+
+    vectorstore: VectorStore
+    k: int = RAG_TOP_K
+
+    def _with_scores(self, results: list[tuple[Document, float]]) -> list[Document]:
+        documents = []
+        for document, score in results:
+            document.metadata["score"] = float(score)
+            documents.append(document)
+        return documents
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._with_scores(
+            self.vectorstore.similarity_search_with_score(query, k=self.k)
+        )
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._with_scores(
+            await self.vectorstore.asimilarity_search_with_score(query, k=self.k)
+        )
+
+    async def abatch_retrieve(self, queries: list[str]) -> list[list[Document]]:
+        """
+        Retrieve documents for many queries with a single embedding request
+
+        Args:
+            queries: The query strings
+
+        Returns:
+            One list of scored documents per query, in query order
+        """
+        vectors = await self.vectorstore.embeddings.aembed_documents(queries)
+        results = await asyncio.gather(
+            *(
+                self.vectorstore.asimilarity_search_by_vector_with_score(
+                    vector, k=self.k
+                )
+                for vector in vectors
+            )
+        )
+        return [self._with_scores(result) for result in results]
+
+
 class PineconeService:
     """Service for interacting with Pinecone vector database"""
 
@@ -25,14 +88,30 @@ class PineconeService:
         self.embeddings = OpenAIEmbeddings(
             model=EMBEDDING_MODEL, openai_api_key=OPENAI_API_KEY
         )
+        if EMBEDDING_PROJECTION_PATH:
+            # The index holds reduced vectors, so queries must be reduced too
+            self.embeddings = ProjectedEmbeddings(
+                self.embeddings, VectorProjection(EMBEDDING_PROJECTION_PATH)
+            )
 
-        self.vectorstore = PineconeVectorStore(
-            index_name=PINECONE_INDEX_NAME,
-            embedding=self.embeddings,
-            pinecone_api_key=PINECONE_API_KEY,
-        )
+        if VECTOR_BACKEND == "snapshot":
+            # Serve a snapshot exported from the index instead of Pinecone
+            self.vectorstore = SnapshotVectorStore(
+                SNAPSHOT_PATH, self.embeddings, verify=SNAPSHOT_VERIFY
+            )
+            if self.vectorstore.manifest["model"].split("/")[0] != EMBEDDING_MODEL:
+                logger.warning(
+                    f"Snapshot was built with {self.vectorstore.manifest['model']}, "
+                    f"queries use {EMBEDDING_MODEL}"
+                )
+        else:
+            self.vectorstore = PineconeVectorStore(
+                index_name=PINECONE_INDEX_NAME,
+                embedding=self.embeddings,
+                pinecone_api_key=PINECONE_API_KEY,
+            )
 
-        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": RAG_TOP_K})
+        self.retriever = ScoredRetriever(vectorstore=self.vectorstore, k=RAG_TOP_K)
 
         logger.info("Pinecone service initialized successfully")
 
@@ -2,28 +2,86 @@
 Main product service that handles product-related queries
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import AsyncIterator, Dict, Any, Optional
 
 from services.rag_service import RAGService
 
 logger = logging.getLogger(__name__)
-from config import RAG_TOP_K
+from config import RAG_TOP_K, RAG_MAX_CONCURRENCY, RAG_BATCH_CONCURRENCY
 
 
 class ProductService:
     """Service for handling product-related queries"""
 
-    def __init__(self):
-        """Initialize the product service"""
+    def __init__(
+        self,
+        rag_service: Optional[RAGService] = None,
+        max_concurrency: int = RAG_MAX_CONCURRENCY,
+    ):
+        """
+        Initialize the product service
+
+        Args:
+            rag_service: Optional RAG service, one is created when omitted
+            max_concurrency: Maximum number of async RAG invocations in flight
+        """
         logger.info("Initializing Product service...")
 
         # Initialize RAG service to get chain
-        rag_service = RAGService()
+        if rag_service is None:
+            rag_service = RAGService()
+        self.rag_service = rag_service
         self.rag_chain = rag_service.get_chain()
+        self.retrieval = rag_service.get_retrieval()
+        self.document_chain = rag_service.get_document_chain()
+
+        # Bounds the async path; the threadpool path is bounded by AnyIO itself
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
         logger.info("Product service initialized successfully")
 
+    def _build_query(self, messages: list[Dict[str, str]]) -> str:
+        """Join the conversation messages into a single retrieval query"""
+        return " ".join([message["message"] for message in messages])
+
+    def _timed_response(
+        self,
+        query: str,
+        context: list,
+        answer: str,
+        start: float,
+        retrieved: float,
+        generation_start: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Assemble the chain output along with per-stage timings"""
+        finished = time.perf_counter()
+        if generation_start is None:
+            generation_start = retrieved
+        return {
+            "input": query,
+            "context": context,
+            "answer": answer,
+            "timings": {
+                "retrieval_ms": round((retrieved - start) * 1000, 2),
+                "generation_ms": round((finished - generation_start) * 1000, 2),
+                "total_ms": round((finished - start) * 1000, 2),
+            },
+        }
+
+    def _error_response(self, error: Exception) -> Dict[str, Any]:
+        """Fallback response returned when the RAG chain fails"""
+        logger.error(f"Error in RAG chain: {str(error)}")
+        return {
+            "answer": (
+                "I'm sorry, I encountered an issue while processing your query. "
+                "Our team has been notified."
+            ),
+            "metadata": {"error": str(error)},
+        }
+
     def handle_query(
         self,
         messages: list[Dict[str, str]],
@@ -42,25 +100,105 @@ class ProductService:
             Dict with response
         """
 
-        query = " ".join([message["message"] for message in messages])
-
-        lower_q = query.lower()
-
-        # Simple intent check - redirect user to include customer ID for order-related queries
+        query = self._build_query(messages)
 
         # Add debug logging
         logger.info(f"Invoking RAG chain with query: {query}")
         logger.info(f"RAG_TOP_K value and type: {RAG_TOP_K} ({type(RAG_TOP_K)})")
 
         try:
-            # Call the RAG chain
-            response = self.rag_chain.invoke({"input": query})
-            return response
+            # Call the RAG chain one stage at a time to time each of them
+            start = time.perf_counter()
+            context = self.retrieval.invoke({"input": query})
+            retrieved = time.perf_counter()
+            answer = self.document_chain.invoke({"input": query, "context": context})
+            return self._timed_response(query, context, answer, start, retrieved)
         except Exception as e:
-            logger.error(f"Error in RAG chain: {str(e)}")
-            # Try to identify variables involved in the comparison
-            # This is just a fallback response to avoid crashing
-            return {
-                "answer": "I'm sorry, I encountered an issue while processing your query. Our team has been notified.",
-                "metadata": {"error": str(e)},
-            }
+            return self._error_response(e)
+
+    async def ahandle_query(
+        self,
+        messages: list[Dict[str, str]],
+        customer_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Handle a product-related query without leaving the event loop
+
+        Embedding, vector search and generation all run through the chain's
+        native async implementations, so a request waiting on the network
+        does not hold a worker thread.
+
+        Args:
+            messages: The conversation messages
+            customer_id: Optional customer ID
+            metadata: Optional metadata
+
+        Returns:
+            Dict with response
+        """
+        query = self._build_query(messages)
+        logger.info(f"Invoking async RAG chain with query: {query}")
+
+        async with self._semaphore:
+            try:
+                start = time.perf_counter()
+                context = await self.retrieval.ainvoke({"input": query})
+                retrieved = time.perf_counter()
+                answer = await self.document_chain.ainvoke(
+                    {"input": query, "context": context}
+                )
+                return self._timed_response(query, context, answer, start, retrieved)
+            except Exception as e:
+                return self._error_response(e)
+
+    async def ahandle_batch(
+        self, queries: list[str], max_concurrency: int = RAG_BATCH_CONCURRENCY
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer many independent product questions
+
+        All queries are embedded in one request and retrieved concurrently,
+        then answers are generated with at most `max_concurrency` LLM calls in
+        flight for this batch. Results are yielded as soon as each one is
+        ready, so they may arrive out of order.
+
+        Args:
+            queries: The product questions
+            max_concurrency: Maximum concurrent generations for this batch
+
+        Yields:
+            Dict with the query index, query and response
+        """
+        start = time.perf_counter()
+        contexts = await self.rag_service.abatch_retrieve(queries)
+        retrieved = time.perf_counter()
+        logger.info(f"Retrieved context for {len(queries)} queries")
+
+        batch_limit = asyncio.Semaphore(max_concurrency)
+
+        async def answer(index: int, query: str, context: list):
+            async with batch_limit, self._semaphore:
+                generation_start = time.perf_counter()
+                try:
+                    answer = await self.document_chain.ainvoke(
+                        {"input": query, "context": context}
+                    )
+                    response = self._timed_response(
+                        query, context, answer, start, retrieved, generation_start
+                    )
+                except Exception as e:
+                    response = self._error_response(e)
+                return index, response
+
+        tasks = [
+            asyncio.ensure_future(answer(index, query, context))
+            for index, (query, context) in enumerate(zip(queries, contexts))
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, response = await next_done
+                yield {"index": index, "query": queries[index], "response": response}
+        finally:
+            for task in tasks:
+                task.cancel()
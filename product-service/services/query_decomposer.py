@@ -0,0 +1,93 @@
+"""
+Service for splitting comparison questions into one retrieval query per product
+"""
+
+import logging
+import re
+
+from config import RAG_MAX_SUBQUERIES
+
+logger = logging.getLogger(__name__)
+
+# Phrases that introduce a comparison, removed before splitting
+_LEAD_IN = re.compile(
+    r"^\s*(?:please\s+|can you\s+|could you\s+)*"
+    r"(?:compare|contrast|comparison of|"
+    r"what(?:'s| is| are) the differences? between|differences? between|"
+    r"which(?: one)? is better|which should i (?:buy|get)|should i (?:buy|get))"
+    r"[\s,:]+",
+    re.IGNORECASE,
+)
+# "vs" / "versus" mark a comparison even without a lead-in
+_VERSUS = re.compile(r"\s(?:vs\.?|versus)\s", re.IGNORECASE)
+_SEPARATOR = re.compile(
+    r"\s*,\s*(?:and|or)\s+|\s*,\s*|\s+(?:vs\.?|versus|and|or)\s+|\s*/\s*",
+    re.IGNORECASE,
+)
+# Trailing aspect shared by all compared products, e.g. "for beginners"
+_ASPECT = re.compile(
+    r"\s+((?:for|in terms of|regarding|when it comes to)\s+[^,]+?)$",
+    re.IGNORECASE,
+)
+_ARTICLE = re.compile(r"^(?:the|a|an)\s+", re.IGNORECASE)
+
+
+def _looks_like_product(part: str) -> bool:
+    """Product names carry a brand or model number: a capital or a digit"""
+    return any(char.isupper() or char.isdigit() for char in part)
+
+
+class QueryDecomposer:
+    """Splits multi-product comparison questions into per-product queries"""
+
+    def __init__(self, max_subqueries: int = RAG_MAX_SUBQUERIES):
+        """
+        Initialize the query decomposer
+
+        Args:
+            max_subqueries: Most sub-queries a question is split into;
+                1 disables decomposition
+        """
+        self.max_subqueries = max_subqueries
+
+    def decompose(self, query: str) -> list[str]:
+        """
+        Split a comparison question into one query per product
+
+        Only questions that read as a comparison ("compare ...", "... vs ...",
+        "difference between ...") are split, and only when every part looks
+        like a product name. A trailing aspect such as "for beginners" is kept
+        on every sub-query.
+
+        Args:
+            query: The user question
+
+        Returns:
+            The sub-queries, or `[query]` when it is not a comparison
+        """
+        if self.max_subqueries <= 1:
+            return [query]
+        text = query.strip().rstrip("?.! ")
+        lead_in = _LEAD_IN.match(text)
+        if lead_in:
+            text = text[lead_in.end() :]
+        elif not _VERSUS.search(text):
+            return [query]
+
+        aspect = _ASPECT.search(text)
+        suffix = ""
+        if aspect:
+            text = text[: aspect.start()]
+            suffix = f" {aspect.group(1)}"
+
+        parts = [_ARTICLE.sub("", part.strip()) for part in _SEPARATOR.split(text)]
+        parts = list(dict.fromkeys(part for part in parts if part))
+        if len(parts) < 2 or not all(map(_looks_like_product, parts)):
+            return [query]
+
+        if len(parts) > self.max_subqueries:
+            logger.debug(
+                f"Comparing {len(parts)} products, keeping the first "
+                f"{self.max_subqueries}"
+            )
+        return [f"{part}{suffix}" for part in parts[: self.max_subqueries]]
@@ -2,14 +2,18 @@
 Service for RAG (Retrieval-Augmented Generation) functionality
 """
 
+import asyncio
 import logging
 from langchain_openai import ChatOpenAI
 from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate
+from langchain_core.runnables import RunnableLambda
 
 from config import OPENAI_API_KEY, LLM_MODEL, LLM_TEMPERATURE
+from services.context_packer import ContextPacker
 from services.pinecone_service import PineconeService
+from services.query_decomposer import QueryDecomposer
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +21,37 @@ logger = logging.getLogger(__name__)
 class RAGService:
     """Service for RAG functionality"""
 
-    def __init__(self):
-        """Initialize the RAG service"""
+    def __init__(self, retriever=None, llm=None, context_packer=None, decomposer=None):
+        """
+        Initialize the RAG service
+
+        Args:
+            retriever: Optional retriever, defaults to the Pinecone retriever
+            llm: Optional chat model, defaults to the configured OpenAI model
+            context_packer: Optional packer applied to the retrieved chunks
+            decomposer: Optional splitter of comparison questions into
+                per-product sub-queries
+        """
         logger.info("Initializing RAG service...")
 
         # Initialize Pinecone service to get retriever
-        pinecone_service = PineconeService()
-        self.retriever = pinecone_service.get_retriever()
+        if retriever is None:
+            pinecone_service = PineconeService()
+            retriever = pinecone_service.get_retriever()
+        self.retriever = retriever
 
         # Initialize LLM
-        self.llm = ChatOpenAI(
-            model=LLM_MODEL, openai_api_key=OPENAI_API_KEY, temperature=LLM_TEMPERATURE
-        )
+        if llm is None:
+            llm = ChatOpenAI(
+                model=LLM_MODEL,
+                openai_api_key=OPENAI_API_KEY,
+                temperature=LLM_TEMPERATURE,
+            )
+        self.llm = llm
+
+        # Merges and budgets retrieved chunks before they reach the prompt
+        self.context_packer = context_packer or ContextPacker()
+        self.decomposer = decomposer or QueryDecomposer()
 
         # Create prompt templates
         self._create_prompts()
@@ -57,11 +80,75 @@ class RAGService:
         # Combine system + user
         self.prompt = system_template + user_template
 
+    def _pack(self, results):
+        """Pack the chunks retrieved for the sub-queries of one question"""
+        if len(results) == 1:
+            return self.context_packer.pack(results[0])
+        return self.context_packer.pack_many(results)
+
+    def _retrieve(self, inputs):
+        """
+        Retrieve chunks for the query and pack them into the context
+
+        Comparison questions are split into one sub-query per product,
+        retrieved concurrently, so each product is covered in the context.
+        """
+        queries = self.decomposer.decompose(inputs["input"])
+        if len(queries) == 1:
+            return self._pack([self.retriever.invoke(queries[0])])
+        return self._pack(self.retriever.batch(queries))
+
+    async def _aretrieve(self, inputs):
+        """Async variant of `_retrieve`"""
+        queries = self.decomposer.decompose(inputs["input"])
+        if len(queries) == 1:
+            return self._pack([await self.retriever.ainvoke(queries[0])])
+        return self._pack(await self._aretrieve_all(queries))
+
+    async def _aretrieve_all(self, queries):
+        """
+        Retrieve chunks for many queries
+
+        Uses the retriever's batched retrieval (one embedding request for all
+        queries) when it has one, otherwise retrieves concurrently.
+        """
+        if hasattr(self.retriever, "abatch_retrieve"):
+            return await self.retriever.abatch_retrieve(queries)
+        return await asyncio.gather(
+            *(self.retriever.ainvoke(query) for query in queries)
+        )
+
+    async def abatch_retrieve(self, queries):
+        """
+        Retrieve and pack the context for many queries at once
+
+        The sub-queries of all questions are retrieved together, see
+        `_aretrieve_all`.
+        """
+        decomposed = [self.decomposer.decompose(query) for query in queries]
+        results = await self._aretrieve_all(
+            [subquery for subqueries in decomposed for subquery in subqueries]
+        )
+        packed, start = [], 0
+        for subqueries in decomposed:
+            packed.append(self._pack(results[start : start + len(subqueries)]))
+            start += len(subqueries)
+        return packed
+
     def _create_chain(self):
         """Create the RAG chain"""
-        document_chain = create_stuff_documents_chain(self.llm, self.prompt)
-        self.rag_chain = create_retrieval_chain(self.retriever, document_chain)
+        self.document_chain = create_stuff_documents_chain(self.llm, self.prompt)
+        self.retrieval = RunnableLambda(self._retrieve, afunc=self._aretrieve)
+        self.rag_chain = create_retrieval_chain(self.retrieval, self.document_chain)
 
     def get_chain(self):
         """Return the configured RAG chain"""
         return self.rag_chain
+
+    def get_retrieval(self):
+        """Return the retrieval stage, mapping {"input"} to packed documents"""
+        return self.retrieval
+
+    def get_document_chain(self):
+        """Return the generation stage, mapping {"input", "context"} to an answer"""
+        return self.document_chain
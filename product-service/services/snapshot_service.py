@@ -0,0 +1,165 @@
+"""
+Local vector backend serving a product index snapshot (scripts/snapshot.py)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Newest snapshot format this service can read, see embeddings/snapshot.py
+SNAPSHOT_VERSION = 1
+
+
+def _file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotVectorStore(VectorStore):
+    """Exact cosine search over the memory-mapped vectors of a snapshot"""
+
+    def __init__(
+        self,
+        path: str,
+        embedding: Embeddings,
+        verify: bool = True,
+        block_size: int = 65536,
+    ):
+        """
+        Load a snapshot
+
+        Args:
+            path: Snapshot directory with manifest.json, vectors.npy and
+                records.json
+            embedding: Embeddings used for queries
+            verify: Check the files against the manifest checksums
+            block_size: Rows scored at a time, bounding memory per query
+        """
+        logger.info(f"Loading index snapshot from {path}...")
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest["version"] > SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Snapshot format version {self.manifest['version']} is not supported"
+            )
+        if verify:
+            for name, checksum in self.manifest["checksums"].items():
+                if _file_sha256(os.path.join(path, name)) != checksum:
+                    raise ValueError(
+                        f"Snapshot file {name} does not match its checksum"
+                    )
+
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(path, "records.json"), encoding="utf-8") as f:
+            records = json.load(f)
+        self.ids = records["ids"]
+        self.texts = records["texts"]
+        self.metadata = records["metadata"]
+        self.embedding = embedding
+        self.block_size = block_size
+        # Norms are computed once so queries only need a dot product
+        self.norms = np.concatenate(
+            [
+                np.linalg.norm(self.vectors[start : start + block_size], axis=1)
+                for start in range(0, len(self.ids), block_size)
+            ]
+            or [np.empty(0, dtype=np.float32)]
+        )
+        self.norms[self.norms == 0] = 1.0
+        logger.info(
+            f"Loaded {len(self.ids)} vectors ({self.manifest['model']}, "
+            f"{self.manifest['dimension']} dims)"
+        )
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def _document(self, row: int, score: float) -> tuple[Document, float]:
+        metadata = {
+            key: column[row]
+            for key, column in self.metadata.items()
+            if column[row] is not None
+        }
+        document = Document(page_content=self.texts[row], metadata=metadata)
+        document.id = self.ids[row]
+        return document, score
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """
+        Return the `k` most cosine-similar documents to a query vector
+
+        Args:
+            embedding: Query vector
+            k: Number of documents to return
+
+        Returns:
+            (document, score) pairs, best first
+        """
+        if not self.ids:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        scores = np.concatenate(
+            [
+                self.vectors[start : start + self.block_size] @ query
+                for start in range(0, len(self.ids), self.block_size)
+            ]
+        )
+        scores /= self.norms
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [self._document(int(row), float(scores[row])) for row in best]
+
+    async def asimilarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector_with_score, embedding, k
+        )
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(
+            self.embedding.embed_query(query), k
+        )
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        embedding = await self.embedding.aembed_query(query)
+        return await self.asimilarity_search_by_vector_with_score(embedding, k)
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k)]
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[list[dict]] = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        raise NotImplementedError("Snapshots are read-only")
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, **kwargs):
+        raise NotImplementedError("Snapshots are built by scripts/snapshot.py")
@@ -0,0 +1,53 @@
+from langchain_core.documents import Document
+
+from services.context_packer import ContextPacker
+
+
+def word_count(text):
+    return len(text.split())
+
+
+PIANO = (
+    "Category: Musical Instruments\n"
+    "Title: Yamaha P-45 Digital Piano\n"
+    "Features: 88 weighted keys, Graded Hammer Standard action, dual mode\n"
+    "Description: A compact digital piano with authentic grand piano sound.\n"
+    "Price: $499.99\n"
+)
+
+
+def test_pack_merges_overlapping_chunks_of_one_product():
+    first, second = PIANO[:140], PIANO[80:]
+    packer = ContextPacker(token_budget=1000, count_tokens=word_count)
+
+    packed = packer.pack(
+        [
+            Document(page_content=first, metadata={"score": 0.91}),
+            Document(page_content=second, metadata={"score": 0.87}),
+        ]
+    )
+
+    assert len(packed) == 1
+    assert packed[0].page_content == PIANO
+    assert packed[0].metadata["chunks"] == 2
+    assert packed[0].metadata["score"] == 0.91
+
+
+def test_pack_orders_by_score_and_enforces_budget():
+    packer = ContextPacker(token_budget=12, count_tokens=word_count)
+    documents = [
+        Document(
+            page_content="Title: Casio CDP-S110\nPrice: $429.99",
+            metadata={"score": 0.5},
+        ),
+        Document(
+            page_content="Title: Yamaha P-45\nPrice: $499.99\nDescription: "
+            + "a " * 50,
+            metadata={"score": 0.9},
+        ),
+    ]
+
+    packed = packer.pack(documents)
+
+    assert packed[0].metadata["product_key"] == "Yamaha P-45"
+    assert sum(word_count(document.page_content) for document in packed) <= 12
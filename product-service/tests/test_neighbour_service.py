@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app import app
+from routers.product_router import get_neighbour_service
+from services.neighbour_service import NeighbourService
+
+
+def write_table(path):
+    np.save(path / "neighbours.npy", np.array([[1, 2], [0, 2], [1, 0]], np.int32))
+    np.save(
+        path / "scores.npy", np.array([[0.9, 0.5], [0.9, 0.7], [0.7, 0.5]], np.float16)
+    )
+    (path / "products.json").write_text(
+        json.dumps(
+            {
+                "ids": ["P45", "CDP110", "FP10"],
+                "titles": ["Yamaha P-45", "Casio CDP-S110", "Roland FP-10"],
+            }
+        )
+    )
+
+
+def test_similar_products_endpoint(tmp_path):
+    write_table(tmp_path)
+    app.dependency_overrides[get_neighbour_service] = lambda: NeighbourService(
+        str(tmp_path)
+    )
+    client = TestClient(app)
+
+    response = client.get("/v1/api/products/CDP110/similar", params={"limit": 1})
+    missing = client.get("/v1/api/products/UNKNOWN/similar")
+    app.dependency_overrides.pop(get_neighbour_service)
+
+    assert response.status_code == 200
+    assert response.json()["similar"] == [
+        {"id": "P45", "title": "Yamaha P-45", "score": 0.8999}
+    ]
+    assert missing.status_code == 404
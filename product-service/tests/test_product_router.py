@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+
+from app import app
+from routers.product_router import get_product_service
+
+
+class StubProductService:
+    async def ahandle_query(self, messages, customer_id=None, metadata=None):
+        return {
+            "input": messages[0]["message"],
+            "context": [
+                Document(
+                    page_content="Title: Yamaha P-45\nPrice: $499.99",
+                    metadata={"product_id": "B00IKYDBI4", "score": 0.92},
+                )
+            ],
+            "answer": "The Yamaha P-45 costs $499.99.",
+            "timings": {"retrieval_ms": 1.0, "generation_ms": 2.0, "total_ms": 3.0},
+        }
+
+
+QUERY = {"messages": [{"role": "user", "message": "Price of the Yamaha P-45?"}]}
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_product_service] = StubProductService
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_product_service)
+
+
+def test_query_returns_compact_metadata_by_default(client):
+    response = client.post("/v1/api/products/query", json=QUERY)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"] == "The Yamaha P-45 costs $499.99."
+    assert body["metadata"]["products"] == [{"id": "B00IKYDBI4", "score": 0.92}]
+    assert body["metadata"]["timings"]["total_ms"] == 3.0
+    assert "raw_response" not in body["metadata"]
+
+
+def test_query_includes_raw_response_in_debug_mode(client):
+    response = client.post("/v1/api/products/query", json={**QUERY, "debug": True})
+
+    raw_response = response.json()["metadata"]["raw_response"]
+    assert raw_response["context"][0]["page_content"].startswith("Title: Yamaha")
@@ -0,0 +1,88 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+
+from services.product_service import ProductService
+from services.rag_service import RAGService
+
+
+class StaticRetriever(BaseRetriever):
+    documents: list[Document] = []
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return self.documents
+
+
+def make_service(llm, max_concurrency=8):
+    retriever = StaticRetriever(
+        documents=[Document(page_content="Title: Yamaha P-45\nPrice: $499.99")]
+    )
+    rag_service = RAGService(retriever=retriever, llm=llm)
+    return ProductService(rag_service=rag_service, max_concurrency=max_concurrency)
+
+
+def test_ahandle_query_matches_sync_path():
+    llm = RunnableLambda(lambda prompt: AIMessage(content="The P-45 costs $499.99."))
+    service = make_service(llm)
+    messages = [{"role": "user", "message": "How much is the Yamaha P-45?"}]
+
+    sync_response = service.handle_query(messages)
+    async_response = asyncio.run(service.ahandle_query(messages))
+
+    assert async_response["answer"] == sync_response["answer"]
+    assert async_response["context"][0].page_content.startswith("Title: Yamaha")
+
+
+def test_ahandle_query_respects_concurrency_limit():
+    in_flight = 0
+    peak = 0
+
+    async def generate(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return AIMessage(content="ok")
+
+    service = make_service(RunnableLambda(lambda p: None, afunc=generate), 3)
+    messages = [{"role": "user", "message": "Any digital pianos?"}]
+
+    async def run():
+        return await asyncio.gather(
+            *(service.ahandle_query(messages) for _ in range(10))
+        )
+
+    responses = asyncio.run(run())
+
+    assert all(response["answer"] == "ok" for response in responses)
+    assert peak == 3
+
+
+class BatchRetriever(StaticRetriever):
+    batch_calls: list = []
+
+    async def abatch_retrieve(self, queries):
+        self.batch_calls.append(list(queries))
+        return [self.documents for _ in queries]
+
+
+def test_ahandle_batch_retrieves_once_and_answers_every_query():
+    retriever = BatchRetriever(
+        documents=[Document(page_content="Title: Casio CDP-S110")], batch_calls=[]
+    )
+    llm = RunnableLambda(lambda prompt: AIMessage(content="answer"))
+    service = ProductService(rag_service=RAGService(retriever=retriever, llm=llm))
+    queries = ["Is the Casio weighted?", "Does it have speakers?", "Price?"]
+
+    async def run():
+        return [result async for result in service.ahandle_batch(queries, 2)]
+
+    results = asyncio.run(run())
+
+    assert retriever.batch_calls == [queries]
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+    assert all(result["response"]["answer"] == "answer" for result in results)
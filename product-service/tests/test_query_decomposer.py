@@ -0,0 +1,73 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+
+from services.context_packer import ContextPacker
+from services.query_decomposer import QueryDecomposer
+from services.rag_service import RAGService
+
+
+def test_decompose_splits_comparisons_only():
+    decomposer = QueryDecomposer(max_subqueries=3)
+
+    assert decomposer.decompose("Compare the Yamaha P-45 and the Casio CDP-S110") == [
+        "Yamaha P-45",
+        "Casio CDP-S110",
+    ]
+    assert decomposer.decompose("Yamaha P-45 vs Roland FP-10 for beginners?") == [
+        "Yamaha P-45 for beginners",
+        "Roland FP-10 for beginners",
+    ]
+    assert decomposer.decompose(
+        "Which is better, the Casio CT-S1, Yamaha PSR-E373, Roland GO:KEYS or Korg B2?"
+    ) == ["Casio CT-S1", "Yamaha PSR-E373", "Roland GO:KEYS"]
+    for query in (
+        "Do you have headphones and speakers?",
+        "Compare pianos and keyboards",
+        "Is the Yamaha P-45 good?",
+    ):
+        assert decomposer.decompose(query) == [query]
+
+
+class CatalogRetriever(BaseRetriever):
+    """Returns the two chunks of every product named in the query"""
+
+    catalog: dict[str, str] = {}
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return [
+            Document(
+                page_content=f"Title: {name}\n{text} part {part}",
+                metadata={"product_id": name, "score": 0.9 - part / 10},
+            )
+            for name, text in self.catalog.items()
+            if name.split()[0].lower() in query.lower()
+            for part in range(2)
+        ]
+
+
+def test_comparison_context_covers_every_product_within_budget():
+    words = " ".join(["word"] * 40)
+    retriever = CatalogRetriever(
+        catalog={"Yamaha P-45": words, "Casio CDP-S110": words}
+    )
+    packer = ContextPacker(token_budget=60, count_tokens=lambda text: len(text.split()))
+    llm = RunnableLambda(lambda prompt: AIMessage(content="ok"))
+    rag_service = RAGService(retriever=retriever, llm=llm, context_packer=packer)
+    question = {"input": "Compare the Yamaha P-45 and the Casio CDP-S110"}
+
+    packed = rag_service.get_retrieval().invoke(question)
+    apacked = asyncio.run(rag_service.get_retrieval().ainvoke(question))
+
+    for documents in (packed, apacked):
+        assert [document.metadata["product_key"] for document in documents] == [
+            "Yamaha P-45",
+            "Casio CDP-S110",
+        ]
+        assert sum(len(d.page_content.split()) for d in documents) <= 60
+        # Each product gets its share of the budget, not only its title
+        for document in documents:
+            assert document.page_content.count("word") >= 20
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from services.pinecone_service import ScoredRetriever
+from services.snapshot_service import SnapshotVectorStore
+
+
+def write_snapshot(path, embedding, texts):
+    np.save(
+        path / "vectors.npy", np.array(embedding.embed_documents(texts), np.float32)
+    )
+    records = {
+        "ids": [f"chunk-{i}" for i in range(len(texts))],
+        "texts": texts,
+        "metadata": {"product_id": [f"P{i}" for i in range(len(texts))]},
+    }
+    (path / "records.json").write_text(json.dumps(records))
+    checksums = {
+        name: hashlib.sha256((path / name).read_bytes()).hexdigest()
+        for name in ("vectors.npy", "records.json")
+    }
+    manifest = {
+        "version": 1,
+        "model": "fake",
+        "dimension": embedding.size,
+        "count": len(texts),
+        "checksums": checksums,
+    }
+    (path / "manifest.json").write_text(json.dumps(manifest))
+
+
+def test_snapshot_backend_serves_scored_documents(tmp_path):
+    embedding = DeterministicFakeEmbedding(size=16)
+    texts = ["Title: Yamaha P-45", "Title: Casio CDP-S110", "Title: Roland FP-10"]
+    write_snapshot(tmp_path, embedding, texts)
+
+    store = SnapshotVectorStore(str(tmp_path), embedding, block_size=2)
+    documents = ScoredRetriever(vectorstore=store, k=2).invoke("Title: Casio CDP-S110")
+
+    assert documents[0].page_content == "Title: Casio CDP-S110"
+    assert documents[0].metadata["product_id"] == "P1"
+    assert documents[0].metadata["score"] == pytest.approx(1.0, abs=1e-5)
+    assert len(documents) == 2
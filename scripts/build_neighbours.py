@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Set project root (parent of 'scripts') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import EMBEDDING_MODEL
+from embeddings.cleaner import load_products
+from embeddings.embedder import get_embeddings
+from embeddings.neighbours import compute_neighbours, save_neighbour_table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompute the similar-product table served by product-service"
+    )
+    parser.add_argument("--csv", default="datasets/Product_Information_Dataset.csv")
+    parser.add_argument("--output", default="product-service/datasets/neighbours")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--row-block", type=int, default=1024)
+    parser.add_argument("--column-block", type=int, default=16384)
+    parser.add_argument(
+        "--vectors",
+        help="Existing .npy of product embeddings (one row per cleaned product) "
+        "to use instead of calling the embedding model",
+    )
+    args = parser.parse_args()
+
+    products = load_products(args.csv)
+    print(f"Loaded {len(products)} products")
+
+    if args.vectors:
+        vectors = np.load(args.vectors, mmap_mode="r")
+    else:
+        vectors = np.asarray(
+            get_embeddings().embed_documents(products["document"].tolist()),
+            dtype=np.float32,
+        )
+    print(f"Embeddings ready: {vectors.shape}")
+
+    start = time.perf_counter()
+    indices, scores = compute_neighbours(
+        vectors, args.top_n, args.row_block, args.column_block
+    )
+    print(f"Neighbours computed in {time.perf_counter() - start:.1f}s")
+
+    save_neighbour_table(
+        args.output,
+        products["product_id"].tolist(),
+        products["title"].tolist(),
+        indices,
+        scores,
+        model=EMBEDDING_MODEL,
+    )
+    print(f"✅ Neighbour table written to {args.output}")
@@ -0,0 +1,86 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Set project root (parent of 'scripts') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from embeddings.compression import QUANTIZATIONS, REDUCTIONS, VectorCompressor
+from fit_compression import add_source_arguments, load_vectors
+
+
+def synthetic_vectors(rows: int, dimension: int = 1536, rank: int = 64, seed: int = 0):
+    """Unit vectors with a low intrinsic dimension, like text embeddings"""
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dimension)).astype(np.float32)
+    vectors = rng.standard_normal((rows, rank)).astype(np.float32) @ basis
+    vectors += 0.1 * np.abs(vectors).mean() * rng.standard_normal(vectors.shape)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def evaluate(compressor, base, queries, truth, k):
+    """recall@k against exact search, index bytes and ms per query"""
+    codes = compressor.encode(base)
+    started = time.perf_counter()
+    found = [compressor.search(codes, query, k)[0] for query in queries]
+    latency = (time.perf_counter() - started) / len(queries) * 1000
+    recall = np.mean(
+        [len(np.intersect1d(rows, exact)) / k for rows, exact in zip(found, truth)]
+    )
+    return recall, codes.nbytes, latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recall, memory and latency of vector compression settings"
+    )
+    add_source_arguments(parser)
+    parser.add_argument(
+        "--synthetic", type=int, help="Evaluate on this many synthetic vectors"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dims", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument(
+        "--reductions", nargs="+", choices=REDUCTIONS, default=["pca", "random"]
+    )
+    parser.add_argument(
+        "--quantizations", nargs="+", choices=QUANTIZATIONS, default=QUANTIZATIONS
+    )
+    parser.add_argument("--pq-subvectors", type=int, default=16)
+    parser.add_argument("--sample", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+    else:
+        vectors = np.asarray(load_vectors(args), dtype=np.float32)
+    if len(vectors) <= args.queries:
+        sys.exit("Not enough vectors; pass --synthetic N or --vectors")
+    # Held-out vectors serve as queries
+    queries, base = vectors[: args.queries], vectors[args.queries :]
+    base_norms = np.linalg.norm(base, axis=1)
+    truth = [np.argsort(-(base @ query) / base_norms)[: args.k] for query in queries]
+    print(f"{len(base)} vectors of {base.shape[1]} dims, {len(queries)} queries")
+
+    settings = [("none", base.shape[1], "none")]
+    settings += [
+        (reduction, dimension, quantization)
+        for reduction in args.reductions
+        for dimension in args.dims
+        for quantization in args.quantizations
+        if quantization != "pq" or dimension % args.pq_subvectors == 0
+    ]
+    print(f"{'setting':<18} {'recall@' + str(args.k):>10} {'MB':>9} {'ms/query':>9}")
+    for reduction, dimension, quantization in settings:
+        compressor = VectorCompressor(
+            dimension, reduction, quantization, args.pq_subvectors
+        ).fit(base, sample=args.sample)
+        recall, size, latency = evaluate(compressor, base, queries, truth, args.k)
+        print(
+            f"{compressor.name:<18} {recall:>10.3f} {size / 2**20:>9.1f} "
+            f"{latency:>9.2f}"
+        )
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Set project root (parent of 'scripts') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import EMBEDDING_STORE_PATH
+from embeddings.compression import QUANTIZATIONS, REDUCTIONS, VectorCompressor
+from embeddings.embedding_store import EmbeddingStore
+
+
+def load_vectors(args) -> np.ndarray:
+    """Training/evaluation vectors from --vectors or the embedding store"""
+    if args.vectors:
+        return np.load(args.vectors, mmap_mode="r")
+    return EmbeddingStore(args.embedding_store).vectors()
+
+
+def add_source_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--vectors", help=".npy of embeddings (default: the embedding store)"
+    )
+    parser.add_argument("--embedding-store", default=EMBEDDING_STORE_PATH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fit a vector compressor for load_data.py --compression"
+    )
+    add_source_arguments(parser)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--reduction", choices=REDUCTIONS, default="pca")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="none")
+    parser.add_argument("--pq-subvectors", type=int, default=16)
+    parser.add_argument("--sample", type=int, default=50_000)
+    parser.add_argument("--output", default="datasets/compression.npz")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    if not len(vectors):
+        sys.exit("No vectors to fit on; run load_data.py first or pass --vectors")
+    print(f"Fitting on {min(len(vectors), args.sample)} of {len(vectors)} vectors")
+
+    compressor = VectorCompressor(
+        args.dimension, args.reduction, args.quantization, args.pq_subvectors
+    ).fit(vectors, sample=args.sample)
+    compressor.save(args.output)
+    print(
+        f"✅ Saved {compressor.name} compressor ({compressor.bytes_per_vector} "
+        f"bytes/vector) to {args.output}"
+    )
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import numpy as np
@@ -14,16 +15,101 @@ with warnings.catch_warnings():
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
-from embeddings.cleaner import load_and_clean_data
-from embeddings.splitter import split_documents
-from embeddings.embedder import embed_and_store_in_pinecone
+from config import EMBEDDING_STORE_PATH
+from embeddings.cleaner import iter_products
+from embeddings.compression import VectorCompressor
+from embeddings.embedder import embed_and_store_products
+from embeddings.splitter import SPLITTERS
 from init_pinecone import initialize_index
 
 if __name__ == "__main__":
-    initialize_index()
-    raw_docs = load_and_clean_data("datasets/Product_Information_Dataset.csv")
-    print("Raw docs created")
-    processed_chunks = split_documents(raw_docs)
-    print("Chunks processed")
-    embed_and_store_in_pinecone(processed_chunks)
+    parser = argparse.ArgumentParser(
+        description="Load the product catalog into Pinecone"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="Chunks per embedding request"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Concurrent embedding requests"
+    )
+    parser.add_argument(
+        "--upsert-workers",
+        type=int,
+        default=None,
+        help="Concurrent upserts (defaults to --workers)",
+    )
+    parser.add_argument(
+        "--clean-chunksize",
+        type=int,
+        default=50_000,
+        help="CSV rows read and cleaned at a time",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=10_000,
+        help="Products/chunks buffered between the clean, split and embed stages",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default="datasets/ingest.checkpoint.json",
+        help="Progress file; rerunning after a failure resumes from it",
+    )
+    parser.add_argument(
+        "--manifest",
+        default="datasets/index_manifest.json",
+        help="Record of indexed products and their vector IDs",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Only embed new or changed products and delete removed ones",
+    )
+    parser.add_argument(
+        "--splitter",
+        choices=sorted(SPLITTERS),
+        default="product",
+        help="product: keep short products whole and split long ones on field "
+        "boundaries; recursive: fixed 1000-character chunks",
+    )
+    parser.add_argument(
+        "--split-workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Processes used to split product documents",
+    )
+    parser.add_argument(
+        "--compression",
+        help="VectorCompressor (.npz from scripts/fit_compression.py) to reduce "
+        "vectors with; the index is created with its dimension",
+    )
+    parser.add_argument(
+        "--embedding-store",
+        default=EMBEDDING_STORE_PATH,
+        help="Reuse embeddings of already embedded text from this store "
+        "(empty to disable)",
+    )
+    args = parser.parse_args()
+
+    dimension = 1536
+    if args.compression:
+        dimension = VectorCompressor.load(args.compression).dimension
+    initialize_index(dimension=dimension)
+    products = iter_products(
+        "datasets/Product_Information_Dataset.csv", chunksize=args.clean_chunksize
+    )
+    embed_and_store_products(
+        products,
+        args.manifest,
+        delta=args.delta,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        embedding_store_path=args.embedding_store,
+        split=SPLITTERS[args.splitter],
+        split_workers=args.split_workers,
+        upsert_workers=args.upsert_workers,
+        queue_size=args.queue_size,
+        compression_path=args.compression,
+    )
     print("✅ Data loading and embedding completed successfully.")
@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+# Set project root (parent of 'scripts') in sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import EMBEDDING_MODEL, PINECONE_INDEX_NAME
+from embeddings.embedder import PineconeUpserter
+from embeddings.snapshot import Snapshot, write_snapshot
+from init_pinecone import initialize_index
+
+
+def export_snapshot(args):
+    start = time.perf_counter()
+    upserter = PineconeUpserter(args.index_name)
+    manifest = write_snapshot(
+        args.snapshot, upserter.records(args.batch_size), args.model
+    )
+    print(
+        f"✅ Exported {manifest['count']} vectors ({manifest['dimension']} dims) "
+        f"from '{args.index_name}' to {args.snapshot} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def import_snapshot(args):
+    start = time.perf_counter()
+    snapshot = Snapshot(args.snapshot)
+    initialize_index(args.index_name, dimension=snapshot.manifest["dimension"])
+    upserter = PineconeUpserter(args.index_name)
+
+    def upsert(batch):
+        ids, vectors, texts, metadatas = zip(*batch)
+        upserter.upsert(list(ids), list(vectors), list(texts), list(metadatas))
+        return len(batch)
+
+    records = snapshot.records()
+    batches = iter(lambda: list(islice(records, args.batch_size)), [])
+    count = 0
+    # At most two batches per worker are read ahead, so memory use does not
+    # grow with the snapshot (pool.map would read every batch up front)
+    with ThreadPoolExecutor(args.workers) as pool:
+        pending = set()
+        for batch in batches:
+            if len(pending) >= args.workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                count += sum(future.result() for future in done)
+            pending.add(pool.submit(upsert, batch))
+        count += sum(future.result() for future in pending)
+    print(
+        f"✅ Imported {count} vectors ({snapshot.model}) from {args.snapshot} "
+        f"into '{args.index_name}' in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the product index to a portable snapshot, or import one"
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--snapshot", default="datasets/snapshot")
+    parser.add_argument("--index-name", default=PINECONE_INDEX_NAME)
+    parser.add_argument(
+        "--model",
+        default=EMBEDDING_MODEL,
+        help="Embedding model recorded in an exported snapshot",
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args)
+    else:
+        import_snapshot(args)
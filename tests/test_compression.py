@@ -0,0 +1,34 @@
+import numpy as np
+
+from embeddings.compression import VectorCompressor
+
+
+def low_rank_vectors(rows, dimension=256, rank=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, rank)) @ rng.standard_normal((rank, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_compressed_search_recall_and_round_trip(tmp_path):
+    vectors = low_rank_vectors(2000)
+    queries, base = vectors[:20], vectors[20:]
+
+    for quantization, size in (("int8", 32), ("pq", 8)):
+        compressor = VectorCompressor(32, "pca", quantization, pq_subvectors=8)
+        codes = compressor.fit(base).encode(base)
+        assert (
+            codes.nbytes == len(base) * size == len(base) * compressor.bytes_per_vector
+        )
+
+        path = str(tmp_path / f"{quantization}.npz")
+        compressor.save(path)
+        loaded = VectorCompressor.load(path)
+        np.testing.assert_allclose(
+            loaded.scores(codes, queries[0]), compressor.scores(codes, queries[0])
+        )
+
+        hits = 0
+        for query in queries:
+            exact = np.argsort(-(base @ query))[:5]
+            hits += len(np.intersect1d(loaded.search(codes, query, 5)[0], exact))
+        assert hits / (5 * len(queries)) > (0.8 if quantization == "int8" else 0.3)
@@ -0,0 +1,52 @@
+import asyncio
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from embeddings.delta import IndexManifest, ingest_delta
+from embeddings.ingest import IngestionEngine
+from embeddings.local_store import LocalVectorStore
+
+
+def split_lines(document):
+    return document.splitlines()
+
+
+def run(products, store, manifest_path):
+    engine = IngestionEngine(DeterministicFakeEmbedding(size=8), store, batch_size=4)
+    return asyncio.run(
+        ingest_delta(products, engine, manifest_path, "fake-model", split=split_lines)
+    )
+
+
+def test_delta_only_touches_changed_products(tmp_path):
+    manifest_path = str(tmp_path / "index_manifest.json")
+    store = LocalVectorStore()
+    catalog = {
+        "a": "Title: A\nPrice: $1",
+        "b": "Title: B\nPrice: $2",
+        "c": "Title: C\nPrice: $3",
+    }
+
+    first = run(catalog.items(), store, manifest_path)
+    assert first["added"] == 3 and first["chunks"] == 6
+    ids_before = set(store.ids)
+
+    catalog["b"] = "Title: B\nPrice: $5"
+    del catalog["c"]
+    second = run(catalog.items(), store, manifest_path)
+
+    assert second["unchanged"] == 1
+    assert second["changed"] == 1 and second["removed"] == 1
+    # Only B's price line is new; B's old price and both of C's chunks go
+    assert second["chunks"] == 1
+    assert second["deleted_vectors"] == 3
+    assert len(store) == 4
+    assert {m["product_id"] for m in store.metadatas} == {"a", "b"}
+    assert ids_before - set(store.ids) and len(set(store.ids) - ids_before) == 1
+
+    manifest = IndexManifest(manifest_path)
+    assert set(manifest.products) == {"a", "b"}
+    assert manifest.model == "fake-model"
+
+    third = run(catalog.items(), store, manifest_path)
+    assert third["chunks"] == 0 and third["unchanged"] == 2
@@ -0,0 +1,34 @@
+import asyncio
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from embeddings.embedding_store import CachedEmbeddings, EmbeddingStore
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_store_reuses_embeddings_across_runs(tmp_path):
+    fake = CountingEmbedding(size=8)
+    first = CachedEmbeddings(fake, EmbeddingStore(str(tmp_path)), "model-a")
+    vectors = first.embed_documents(["a", "b", "a"])
+    assert fake.embedded == 2
+
+    # A new process opening the same store only embeds unseen text
+    second = CachedEmbeddings(fake, EmbeddingStore(str(tmp_path)), "model-a")
+    again = asyncio.run(second.aembed_documents(["b", "c", "a"]))
+    assert fake.embedded == 3
+    assert (second.hits, second.misses) == (2, 1)
+    np.testing.assert_allclose(again[2], vectors[0], rtol=1e-6)
+
+    # The model is part of the key
+    other = CachedEmbeddings(fake, EmbeddingStore(str(tmp_path)), "model-b")
+    other.embed_documents(["a"])
+    assert fake.embedded == 4
+    assert len(EmbeddingStore(str(tmp_path))) == 4
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from embeddings.ingest import IngestionEngine, Stage
+from embeddings.local_store import LocalVectorStore
+
+
+class FailingStore(LocalVectorStore):
+    """Local store whose upserts fail for the first `failures` calls"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def upsert(self, ids, vectors, texts, metadatas):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("upsert failed")
+        super().upsert(ids, vectors, texts, metadatas)
+
+
+def chunks(count):
+    return [f"Title: Product {i}\nPrice: ${i}.99" for i in range(count)]
+
+
+def test_engine_batches_and_retries():
+    store = FailingStore(failures=2)
+    engine = IngestionEngine(
+        DeterministicFakeEmbedding(size=8),
+        store,
+        batch_size=10,
+        workers=3,
+        base_delay=0,
+    )
+
+    stats = asyncio.run(engine.run(iter(chunks(95))))
+
+    assert len(store) == 95
+    assert stats["batches"] == 10
+    assert stats["retries"] == 2
+    assert stats["chunks_per_sec"] > 0
+
+
+def test_engine_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "ingest.checkpoint.json")
+    ids = [f"chunk-{i}" for i in range(50)]
+    embeddings = DeterministicFakeEmbedding(size=8)
+    store = LocalVectorStore()
+
+    class StopAfter(LocalVectorStore):
+        def upsert(self, ids, vectors, texts, metadatas):
+            if len(store) >= 20:
+                raise RuntimeError("process killed")
+            store.upsert(ids, vectors, texts, metadatas)
+
+    interrupted = IngestionEngine(
+        embeddings,
+        StopAfter(),
+        batch_size=10,
+        workers=1,
+        max_retries=0,
+        checkpoint_path=checkpoint,
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(interrupted.run(chunks(50), ids))
+
+    resumed = IngestionEngine(
+        embeddings, store, batch_size=10, workers=2, checkpoint_path=checkpoint
+    )
+    stats = asyncio.run(resumed.run(chunks(50), ids))
+
+    assert stats["skipped_batches"] == 2
+    assert stats["chunks"] == 30
+    assert sorted(store.ids) == sorted(ids)
+    assert not (tmp_path / "ingest.checkpoint.json").exists()
+
+
+def test_engine_reads_through_bounded_stage():
+    def source():
+        yield from enumerate(chunks(30))
+        raise ValueError("bad row")
+
+    stage = Stage("split", source(), maxsize=4)
+    items = ((str(i), text, {}) for i, text in stage)
+    engine = IngestionEngine(DeterministicFakeEmbedding(size=8), LocalVectorStore())
+
+    with pytest.raises(ValueError, match="bad row"):
+        asyncio.run(engine.run_items(items, stages=[stage]))
+    assert stage.count == 30
+    assert "queue 0/4" in stage.report()
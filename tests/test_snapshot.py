@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+import pytest
+
+from embeddings.local_store import LocalVectorStore
+from embeddings.snapshot import Snapshot, write_snapshot
+
+
+def test_snapshot_round_trip_and_checksums(tmp_path):
+    store = LocalVectorStore()
+    vectors = np.random.default_rng(0).random((5, 8), dtype=np.float32)
+    store.upsert(
+        [f"chunk-{i}" for i in range(5)],
+        vectors,
+        [f"Title: Product {i}" for i in range(5)],
+        [{"product_id": f"P{i}"} if i != 2 else {} for i in range(5)],
+    )
+
+    manifest = write_snapshot(str(tmp_path), store.records(), "fake-model")
+    snapshot = Snapshot(str(tmp_path))
+
+    assert manifest["count"] == 5 and manifest["dimension"] == 8
+    assert snapshot.model == "fake-model"
+    np.testing.assert_array_equal(snapshot.vectors, vectors)
+    restored = LocalVectorStore()
+    for record in snapshot.records():
+        restored.upsert(*([value] for value in record))
+    assert restored.ids == store.ids and restored.metadatas == store.metadatas
+
+    records = json.loads((tmp_path / "records.json").read_text())
+    records["texts"][0] = "tampered"
+    (tmp_path / "records.json").write_text(json.dumps(records))
+    with pytest.raises(ValueError, match="checksum"):
+        Snapshot(str(tmp_path))
@@ -0,0 +1,34 @@
+from embeddings.splitter import split_product, split_products, split_text
+
+HEADER = "Category: Musical Instruments\nTitle: Yamaha P-45 Digital Piano\n"
+
+
+def product(description):
+    return (
+        f"{HEADER}Features: ['88 weighted keys', 'Dual mode']\n"
+        f"Description: {description}\nPrice: $499.99\nAverage Rating: 4.6\n"
+    )
+
+
+def test_product_split_keeps_short_docs_and_repeats_header():
+    short = product("Compact digital piano.")
+    assert split_product(short) == [short]
+
+    words = [f"word{i}" for i in range(400)]
+    chunks = split_product(product(" ".join(words)))
+
+    assert len(chunks) < len(split_text(product(" ".join(words))))
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert all(chunk.startswith(HEADER) for chunk in chunks)
+    text = " ".join(chunks)
+    assert all(word in text for word in words)
+    assert "Price: $499.99\n" in chunks[-1]
+
+
+def test_split_products_in_process_pool_keeps_order():
+    products = [(f"p{i}", product("word " * (i * 40))) for i in range(50)]
+
+    parallel = list(split_products(products, processes=2, block_size=16))
+
+    assert [item[0] for item in parallel] == [pid for pid, _ in products]
+    assert parallel == list(split_products(products))